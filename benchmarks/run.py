@@ -0,0 +1,268 @@
+"""Benchmarks for parsing, polling and commands against local simulators.
+
+Run with `python -m benchmarks.run --output results.json` from the repository
+root, then compare two runs with `--compare old.json new.json`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Sequence
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any
+
+from scrapli.response import Response
+
+from pywattbox.base import Commands
+from pywattbox.driver import PipelinedReplies, process_response
+from pywattbox.http_wattbox import (
+    HttpWattBox,
+    async_create_http_wattbox,
+    parse_info_xml,
+)
+from pywattbox.ip_wattbox import (
+    INITIAL_REQUESTS,
+    REQUEST_MESSAGES,
+    UPDATE_BASE_REQUESTS,
+    InitialResponses,
+    IpWattBox,
+    UpdateBaseResponses,
+    async_create_ip_wattbox,
+)
+from pywattbox.simulator import SimulatedWattBox, WattBoxSimulator, start_simulators
+
+USER = PASSWORD = "wattbox"
+DEVICE_COUNTS = (1, 10, 100, 1000)
+
+
+def summarize(name: str, unit: str, samples: Sequence[float]) -> dict[str, Any]:
+    ordered = sorted(samples)
+    mean = statistics.fmean(ordered)
+    return {
+        "name": name,
+        "unit": unit,
+        "samples": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": mean,
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+        "per_second": 1 / mean if mean else None,
+    }
+
+
+def bench_parse(
+    name: str, func: Callable[[], Any], repeat: int = 20, number: int = 1000
+) -> dict[str, Any]:
+    """Seconds per call of `func`, averaged over `number` calls per sample."""
+    samples: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return summarize(name, "s/op", samples)
+
+
+async def bench_async(
+    name: str, func: Callable[[], Awaitable[Any]], repeat: int
+) -> dict[str, Any]:
+    samples: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+    return summarize(name, "s", samples)
+
+
+def _responses(simulated: SimulatedWattBox, requests: Iterable[Any]) -> list[Response]:
+    """Responses as the driver would build them from the simulator replies."""
+    responses: list[Response] = []
+    for request in requests:
+        response = Response(host="localhost", channel_input=request.value)
+        reply = simulated.answer(request.value).encode()
+        response.record_response(process_response(request.value, reply).tobytes())
+        responses.append(response)
+    return responses
+
+
+def parse_benchmarks() -> list[dict[str, Any]]:
+    simulated = SimulatedWattBox(outlets=12, has_ups=True, seed=0)
+    xml = simulated.info_xml()
+    info = parse_info_xml(xml)
+
+    http = HttpWattBox("localhost", USER, PASSWORD)
+    http.parse_initial(info)
+
+    ip = IpWattBox("localhost", USER, PASSWORD, transport="telnet")
+    ip.parse_initial(InitialResponses(*_responses(simulated, INITIAL_REQUESTS)))
+    base = UpdateBaseResponses(*_responses(simulated, UPDATE_BASE_REQUESTS))
+    (ups,) = _responses(simulated, (REQUEST_MESSAGES.UPS_STATUS,))
+
+    command = REQUEST_MESSAGES.OUTLET_STATUS.value
+    raw = f"{command}\n{simulated.answer(command)}\n~OutletStatus=1,1\n".encode()
+
+    def driver_response() -> memoryview:
+        replies = PipelinedReplies((command,))
+        replies.feed(raw)
+        return process_response(command, replies.lines[0] or b"")
+
+    results = [
+        bench_parse("parse.http.info_xml", lambda: parse_info_xml(xml)),
+        bench_parse("parse.http.parse_update", lambda: http.parse_update(info)),
+        bench_parse("parse.ip.parse_update_base", lambda: ip.parse_update_base(base)),
+        bench_parse("parse.ip.parse_ups_status", lambda: ip.parse_ups_status(ups)),
+        bench_parse("parse.driver.response", driver_response),
+    ]
+    http.close()
+    return results
+
+
+async def _create(
+    simulators: Iterable[WattBoxSimulator], transport: str, concurrency: int = 64
+) -> list[HttpWattBox | IpWattBox]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(simulator: WattBoxSimulator) -> HttpWattBox | IpWattBox:
+        async with semaphore:
+            if transport == "http":
+                return await async_create_http_wattbox(
+                    simulator.host, USER, PASSWORD, simulator.http_port
+                )
+            return await async_create_ip_wattbox(
+                simulator.host,
+                USER,
+                PASSWORD,
+                simulator.ssh_port if transport == "ssh" else simulator.telnet_port,
+                transport=transport,
+                pipelined=True,
+            )
+
+    return list(await asyncio.gather(*(create(s) for s in simulators)))
+
+
+async def update_benchmarks(
+    counts: Iterable[int], transports: Iterable[str], repeat: int
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    for count in counts:
+        simulators = await start_simulators(count, ssh="ssh" in transports)
+        try:
+            for transport in transports:
+                wattboxes = await _create(simulators, transport)
+
+                async def update_all(
+                    wattboxes: list[HttpWattBox | IpWattBox] = wattboxes,
+                ) -> None:
+                    await asyncio.gather(*(w.async_update() for w in wattboxes))
+
+                result = await bench_async(
+                    f"update.{transport}.devices_{count}", update_all, repeat
+                )
+                result["devices"] = count
+                results.append(result)
+                await asyncio.gather(*(w.async_close() for w in wattboxes))
+        finally:
+            await asyncio.gather(*(s.stop() for s in simulators))
+    return results
+
+
+async def command_benchmarks(
+    transports: Iterable[str], repeat: int
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    async with WattBoxSimulator(ssh="ssh" in transports) as simulator:
+        for transport in transports:
+            (wattbox,) = await _create((simulator,), transport)
+            commands = iter([Commands.OFF, Commands.ON] * repeat)
+
+            async def send(
+                wattbox: HttpWattBox | IpWattBox = wattbox,
+                commands: Iterator[Commands] = commands,
+            ) -> None:
+                await wattbox.async_send_command(1, next(commands))
+
+            results.append(await bench_async(f"command.{transport}", send, repeat))
+            await wattbox.async_close()
+    return results
+
+
+def metadata() -> dict[str, Any]:
+    try:
+        package_version = version("pywattbox")
+    except PackageNotFoundError:
+        package_version = None
+    return {
+        "pywattbox": package_version,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+    }
+
+
+def compare(old_path: str, new_path: str) -> None:
+    with open(old_path) as old_file, open(new_path) as new_file:
+        old = {r["name"]: r for r in json.load(old_file)["results"]}
+        new = {r["name"]: r for r in json.load(new_file)["results"]}
+    print(f"{'benchmark':40} {'old':>12} {'new':>12} {'change':>8}")
+    for name in sorted(old.keys() & new.keys()):
+        before, after = old[name]["median"], new[name]["median"]
+        change = (after - before) / before * 100 if before else float("nan")
+        print(f"{name:40} {before:12.3e} {after:12.3e} {change:+7.1f}%")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pywattbox.")
+    parser.add_argument("--output", help="Write the JSON results to this file.")
+    parser.add_argument(
+        "--devices",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=list(DEVICE_COUNTS),
+        help="Comma separated device counts for the update benchmark.",
+    )
+    parser.add_argument(
+        "--transports",
+        type=lambda value: value.split(","),
+        default=["http", "telnet", "ssh"],
+        help="Comma separated transports: http, telnet and ssh.",
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--skip", action="append", default=[], choices=["parse", "update", "command"]
+    )
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    logging.basicConfig(level=logging.WARNING)
+    results: list[dict[str, Any]] = []
+    if "parse" not in args.skip:
+        results.extend(parse_benchmarks())
+    if "update" not in args.skip:
+        results.extend(
+            asyncio.run(update_benchmarks(args.devices, args.transports, args.repeat))
+        )
+    if "command" not in args.skip:
+        results.extend(asyncio.run(command_benchmarks(args.transports, args.repeat)))
+
+    output = json.dumps({"metadata": metadata(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Python wrapper for WattBox APIs.
+
+Only the base types are imported up front. The HTTP and IP WattBoxes, and the
+optional dependencies they need, are imported the first time they are used.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Final
+
+from .base import (
+    BaseWattBox,
+    Change,
+    Commands,
+    MissingExtraError,
+    Outlet,
+    UpdateCache,
+    UpdateCategory,
+    WattBoxDelta,
+)
+
+if TYPE_CHECKING:
+    from .cache import DeviceInfo, DeviceInfoCache, StaleDeviceInfoError
+    from .driver.connection import (
+        ConnectionBackoffError,
+        ConnectionSettings,
+        ConnectionState,
+    )
+    from .energy import EnergyCheckpoint, EnergyMeter, Integration
+    from .exporter import WattBoxExporter
+    from .fleet import DeviceConfig, FleetResult, SyncWattBoxFleet, WattBoxFleet
+    from .history import PowerHistory, Tier
+    from .http_wattbox import (
+        HttpWattBox,
+        async_create_http_wattbox,
+        create_http_wattbox,
+    )
+    from .hybrid_wattbox import (
+        HybridWattBox,
+        async_create_hybrid_wattbox,
+        create_hybrid_wattbox,
+    )
+    from .ip_wattbox import (
+        DriverUnavailableError,
+        IpWattBox,
+        PowerSampling,
+        Refresh,
+        WattBoxEvent,
+        async_create_ip_wattbox,
+        create_ip_wattbox,
+    )
+    from .metrics import InMemoryMetrics, MetricsSink
+    from .resilience import (
+        CircuitOpenError,
+        CircuitState,
+        DeadlineExceededError,
+        ResilienceSettings,
+    )
+    from .scheduler import PollScheduler
+
+# Name to the module it is loaded from on first access.
+_LAZY: Final[dict[str, str]] = {
+    "DeviceInfo": ".cache",
+    "DeviceInfoCache": ".cache",
+    "StaleDeviceInfoError": ".cache",
+    "ConnectionBackoffError": ".driver.connection",
+    "ConnectionSettings": ".driver.connection",
+    "ConnectionState": ".driver.connection",
+    "EnergyCheckpoint": ".energy",
+    "EnergyMeter": ".energy",
+    "Integration": ".energy",
+    "WattBoxExporter": ".exporter",
+    "DeviceConfig": ".fleet",
+    "FleetResult": ".fleet",
+    "SyncWattBoxFleet": ".fleet",
+    "WattBoxFleet": ".fleet",
+    "PowerHistory": ".history",
+    "Tier": ".history",
+    "HttpWattBox": ".http_wattbox",
+    "async_create_http_wattbox": ".http_wattbox",
+    "create_http_wattbox": ".http_wattbox",
+    "HybridWattBox": ".hybrid_wattbox",
+    "async_create_hybrid_wattbox": ".hybrid_wattbox",
+    "create_hybrid_wattbox": ".hybrid_wattbox",
+    "DriverUnavailableError": ".ip_wattbox",
+    "IpWattBox": ".ip_wattbox",
+    "PowerSampling": ".ip_wattbox",
+    "Refresh": ".ip_wattbox",
+    "WattBoxEvent": ".ip_wattbox",
+    "async_create_ip_wattbox": ".ip_wattbox",
+    "create_ip_wattbox": ".ip_wattbox",
+    "InMemoryMetrics": ".metrics",
+    "MetricsSink": ".metrics",
+    "CircuitOpenError": ".resilience",
+    "CircuitState": ".resilience",
+    "DeadlineExceededError": ".resilience",
+    "ResilienceSettings": ".resilience",
+    "PollScheduler": ".scheduler",
+}
+
+__all__ = [
+    "BaseWattBox",
+    "Change",
+    "Commands",
+    "MissingExtraError",
+    "Outlet",
+    "UpdateCache",
+    "UpdateCategory",
+    "WattBoxDelta",
+    "DeviceInfo",
+    "DeviceInfoCache",
+    "StaleDeviceInfoError",
+    "ConnectionBackoffError",
+    "ConnectionSettings",
+    "ConnectionState",
+    "EnergyCheckpoint",
+    "EnergyMeter",
+    "Integration",
+    "WattBoxExporter",
+    "DeviceConfig",
+    "FleetResult",
+    "SyncWattBoxFleet",
+    "WattBoxFleet",
+    "PowerHistory",
+    "Tier",
+    "HttpWattBox",
+    "async_create_http_wattbox",
+    "create_http_wattbox",
+    "HybridWattBox",
+    "async_create_hybrid_wattbox",
+    "create_hybrid_wattbox",
+    "DriverUnavailableError",
+    "IpWattBox",
+    "PowerSampling",
+    "Refresh",
+    "WattBoxEvent",
+    "async_create_ip_wattbox",
+    "create_ip_wattbox",
+    "InMemoryMetrics",
+    "MetricsSink",
+    "CircuitOpenError",
+    "CircuitState",
+    "DeadlineExceededError",
+    "ResilienceSettings",
+    "PollScheduler",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _LAZY.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    # Cache it so this is only called once per name.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(__all__)
@@ -1,13 +1,64 @@
 from __future__ import annotations
 
 import logging
+import time
 from abc import ABC, abstractmethod
-from enum import IntEnum
-from typing import TypeVar
+from array import array
+from collections.abc import (
+    Awaitable,
+    Callable,
+    Collection,
+    Coroutine,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from enum import Enum, IntEnum
+from functools import wraps
+from types import TracebackType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Concatenate,
+    Final,
+    NamedTuple,
+    ParamSpec,
+    TypeVar,
+)
+
+from .cache import DeviceInfo, DeviceInfoCache, StaleDeviceInfoError
+from .energy import EnergyCheckpoint, EnergyMeter, Integration
+from .history import DEFAULT_TIERS, PowerHistory, Tier
+from .metrics import NULL_METRICS, MetricsSink
+from .resilience import (
+    CircuitBreaker,
+    CircuitState,
+    Deadline,
+    DeadlineExceededError,
+    ResilienceSettings,
+    current_deadline,
+)
+
+# asyncio is slow to import, so it is only imported once async code runs.
+if TYPE_CHECKING:
+    import asyncio
 
 logger = logging.getLogger("pywattbox")
 
 
+class MissingExtraError(ImportError):
+    """An optional dependency is not installed."""
+
+    def __init__(self, extra: str, module: str) -> None:
+        super().__init__(
+            f"`{module}` is not installed, install it with the `{extra}` extra:"
+            f" `pip install pywattbox[{extra}]`",
+            name=module,
+        )
+        self.extra: str = extra
+
+
 class Commands(IntEnum):
     """Commands Enum for Convenience.
 
@@ -25,10 +76,365 @@ class Commands(IntEnum):
     TOGGLE = 6
 
 
+class UpdateCategory(Enum):
+    """Groups of values that can be updated independently of each other."""
+
+    # Total and per outlet power, current and voltage.
+    POWER = "power"
+    # Outlet on / off status and auto reboot.
+    STATUS = "status"
+    # Outlet names.
+    NAMES = "names"
+    # Battery and power lost values.
+    UPS = "ups"
+
+
+# Values tracked for changes on the WattBox and on each Outlet, set with `_set`.
+DEVICE_FIELDS: Final[frozenset[str]] = frozenset(
+    (
+        "hardware_version",
+        "firmware_version",
+        "has_ups",
+        "hostname",
+        "number_outlets",
+        "serial_number",
+        "audible_alarm",
+        "auto_reboot",
+        "cloud_status",
+        "mute",
+        "power_lost",
+        "current_value",
+        "power_value",
+        "safe_voltage_status",
+        "voltage_value",
+        "battery_charge",
+        "battery_health",
+        "battery_load",
+        "battery_test",
+        "est_run_time",
+    )
+)
+OUTLET_FIELDS: Final[frozenset[str]] = frozenset(
+    ("method", "name", "status", "current_value", "power_value", "voltage_value")
+)
+
+
+class Change(NamedTuple):
+    field: str
+    old: Any
+    new: Any
+    # Index of the outlet, `None` for the WattBox itself.
+    outlet: int | None = None
+
+
+class WattBoxDelta(NamedTuple):
+    """Values that changed during an update, keyed by field name."""
+
+    device: dict[str, Change]
+    outlets: dict[int, dict[str, Change]]
+
+    def __bool__(self) -> bool:
+        return bool(self.device or self.outlets)
+
+    def changes(self) -> Iterator[Change]:
+        yield from self.device.values()
+        for outlet in self.outlets.values():
+            yield from outlet.values()
+
+
+class _Subscription(NamedTuple):
+    callback: Callable[[Change], None]
+    outlets: frozenset[int] | None
+
+
+def _record(pending: dict[str, Change], change: Change) -> None:
+    if (previous := pending.get(change.field)) is not None:
+        if previous.old == change.new:
+            # Changed back before it was published.
+            del pending[change.field]
+            return
+        change = change._replace(old=previous.old)
+    pending[change.field] = change
+
+
+class UpdateCache(NamedTuple):
+    """When `async_update` returns without sending a request."""
+
+    # Seconds the last update is served for without another.
+    ttl: float
+    # Seconds after `ttl` the last update is still served, while a new one
+    # runs in the background.
+    stale_while_revalidate: float = 0.0
+
+
+_T_WattBox = TypeVar("_T_WattBox", bound="BaseWattBox")
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+
+def publishes_changes(
+    func: Callable[Concatenate[_T_WattBox, _P], _R],
+) -> Callable[Concatenate[_T_WattBox, _P], _R]:
+    """Publish the changes made by an update method once it returns.
+
+    Nested calls, such as a command that runs an update, publish once when
+    the outermost call returns.
+    """
+
+    @wraps(func)
+    def wrapper(self: _T_WattBox, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+        self._publish_depth += 1
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self._publish_depth -= 1
+            if not self._publish_depth:
+                self.publish_changes()
+
+    return wrapper
+
+
+def async_publishes_changes(
+    func: Callable[Concatenate[_T_WattBox, _P], Awaitable[_R]],
+) -> Callable[Concatenate[_T_WattBox, _P], Coroutine[Any, Any, _R]]:
+    @wraps(func)
+    async def wrapper(self: _T_WattBox, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+        self._publish_depth += 1
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            self._publish_depth -= 1
+            if not self._publish_depth:
+                self.publish_changes()
+
+    return wrapper
+
+
+def _budget(wattbox: BaseWattBox, budget: str) -> float | None:
+    """Seconds of `budget`, None to not guard a nested call."""
+    if wattbox.resilience is None or current_deadline.get() is not None:
+        return None
+    seconds: float | None = getattr(wattbox.resilience, budget)
+    return float("inf") if seconds is None else seconds
+
+
+def guarded(
+    budget: str,
+) -> Callable[
+    [Callable[Concatenate[_T_WattBox, _P], _R]],
+    Callable[Concatenate[_T_WattBox, _P], _R],
+]:
+    """Run an update or command through the circuit breaker, within a budget.
+
+    `budget` is the `ResilienceSettings` field to use. Every request made
+    during the call shares its deadline, including those of nested calls,
+    such as the refresh after a command. Does nothing without `resilience`.
+    """
+
+    def decorator(
+        func: Callable[Concatenate[_T_WattBox, _P], _R],
+    ) -> Callable[Concatenate[_T_WattBox, _P], _R]:
+        @wraps(func)
+        def wrapper(self: _T_WattBox, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+            if (seconds := _budget(self, budget)) is None:
+                return func(self, *args, **kwargs)
+            self.breaker.allow()
+            token = current_deadline.set(Deadline(seconds))
+            try:
+                result = func(self, *args, **kwargs)
+            except ValueError:
+                # The WattBox answered, only not as expected.
+                self.breaker.succeeded()
+                raise
+            except BaseException as err:
+                # Anything else counts as a failure, so that a probe is never
+                # left in flight, however it was interrupted.
+                self.breaker.failed(err)
+                raise
+            finally:
+                current_deadline.reset(token)
+            self.breaker.succeeded()
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def async_guarded(
+    budget: str,
+) -> Callable[
+    [Callable[Concatenate[_T_WattBox, _P], Awaitable[_R]]],
+    Callable[Concatenate[_T_WattBox, _P], Coroutine[Any, Any, _R]],
+]:
+    """Like `guarded`, also cancelling the call once the budget runs out."""
+
+    def decorator(
+        func: Callable[Concatenate[_T_WattBox, _P], Awaitable[_R]],
+    ) -> Callable[Concatenate[_T_WattBox, _P], Coroutine[Any, Any, _R]]:
+        @wraps(func)
+        async def wrapper(self: _T_WattBox, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+            if (seconds := _budget(self, budget)) is None:
+                return await func(self, *args, **kwargs)
+            import asyncio
+
+            self.breaker.allow()
+            token = current_deadline.set(Deadline(seconds))
+            try:
+                result = await asyncio.wait_for(
+                    func(self, *args, **kwargs),
+                    None if seconds == float("inf") else seconds,
+                )
+            except ValueError:
+                self.breaker.succeeded()
+                raise
+            except asyncio.TimeoutError as err:
+                error = DeadlineExceededError(
+                    f"{self.host}: {func.__name__} took over {seconds}s."
+                )
+                self.breaker.failed(error)
+                raise error from err
+            except BaseException as err:
+                # Including cancellation, e.g. by an outer `wait_for`.
+                self.breaker.failed(err)
+                raise
+            finally:
+                current_deadline.reset(token)
+            self.breaker.succeeded()
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def coalesces_updates(
+    func: Callable[[_T_WattBox], Awaitable[None]],
+) -> Callable[[_T_WattBox], Coroutine[Any, Any, None]]:
+    """Share a single in flight `async_update` between concurrent callers.
+
+    With an `UpdateCache`, callers within its `ttl` of the last update return
+    straight away, and within `stale_while_revalidate` after that they return
+    while an update runs in the background.
+    """
+
+    def start(self: _T_WattBox) -> asyncio.Task[None]:
+        import asyncio
+
+        generation = self._update_generation
+        started = time.monotonic()
+
+        async def run() -> None:
+            await func(self)
+            # Commands sent meanwhile may not be reflected, so not fresh.
+            if self._update_generation == generation:
+                self.updated_at = started
+
+        def done(task: asyncio.Task[None]) -> None:
+            if self._update_task is task:
+                self._update_task = None
+            # Retrieve it so a background update failing is not reported as
+            # never retrieved, callers awaiting it still get it raised.
+            if not task.cancelled() and (err := task.exception()) is not None:
+                logger.debug("%s: Update failed: %r", self.host, err)
+
+        task = self._update_task = asyncio.ensure_future(run())
+        task.add_done_callback(done)
+        return task
+
+    @wraps(func)
+    async def wrapper(self: _T_WattBox) -> None:
+        import asyncio
+
+        if (task := self._update_task) is None:
+            cache = self.update_cache
+            if cache is not None and self.updated_at is not None:
+                age = time.monotonic() - self.updated_at
+                if age < cache.ttl:
+                    self.metrics.coalesced(self.host)
+                    return
+                if age < cache.ttl + cache.stale_while_revalidate:
+                    self.metrics.coalesced(self.host)
+                    start(self)
+                    return
+            task = start(self)
+        else:
+            self.metrics.coalesced(self.host)
+        # Shielded so one caller being cancelled does not cancel the others.
+        await asyncio.shield(task)
+
+    return wrapper
+
+
 class BaseWattBox(ABC):
     """Base WattBox that defines the"""
 
-    def __init__(self, host: str, user: str, password: str, port: int) -> None:
+    # Slotted to keep large fleets compact, subclasses must declare their own.
+    __slots__ = (
+        "__weakref__",
+        "_pending_device",
+        "_pending_outlets",
+        "_publish_depth",
+        "_subscriptions",
+        "last_delta",
+        "host",
+        "port",
+        "user",
+        "password",
+        "hardware_version",
+        "firmware_version",
+        "has_ups",
+        "hostname",
+        "number_outlets",
+        "serial_number",
+        "audible_alarm",
+        "auto_reboot",
+        "cloud_status",
+        "mute",
+        "power_lost",
+        "current_value",
+        "power_value",
+        "safe_voltage_status",
+        "voltage_value",
+        "battery_charge",
+        "battery_health",
+        "battery_load",
+        "battery_test",
+        "est_run_time",
+        "outlet_store",
+        "outlets",
+        "master_outlet",
+        "history",
+        "energy",
+        "_power_fresh",
+        "metrics",
+        "update_cache",
+        "updated_at",
+        "_update_task",
+        "_update_generation",
+        "_unverified_info",
+        "resilience",
+        "request_timeout",
+        "breaker",
+    )
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        port: int,
+        metrics: MetricsSink | None = None,
+        update_cache: UpdateCache | None = None,
+        resilience: ResilienceSettings | None = None,
+    ) -> None:
+        # Changes recorded by `_set`, published by `publish_changes`.
+        self._pending_device: dict[str, Change] = {}
+        self._pending_outlets: dict[int, dict[str, Change]] = {}
+        self._publish_depth: int = 0
+        self._subscriptions: dict[str | None, list[_Subscription]] = {}
+        self.last_delta: WattBoxDelta = WattBoxDelta({}, {})
+
         self.host: str = host
         self.port: int | None = port
         self.user: str = user
@@ -64,8 +470,228 @@ class BaseWattBox(ABC):
 
         # Outlets list
         self.outlets: dict[int, Outlet] = {}
+        # Optional columnar store of the outlet values, see `enable_outlet_store`.
+        self.outlet_store: OutletStore | None = None
         self.master_outlet: Outlet | None = None
 
+        # Optional history of power readings, see `enable_history`.
+        self.history: PowerHistory | None = None
+        # Optional energy totals, see `enable_energy`.
+        self.energy: EnergyMeter | None = None
+        self._power_fresh: bool = False
+
+        # Request, error and parse time hooks, see `MetricsSink`.
+        self.metrics: MetricsSink = metrics or NULL_METRICS
+
+        # Coalescing and caching of `async_update`, see `coalesces_updates`.
+        self.update_cache: UpdateCache | None = update_cache
+        # `time.monotonic` when the last complete `async_update` was sent.
+        self.updated_at: float | None = None
+        self._update_task: asyncio.Task[None] | None = None
+        # Bumped by `invalidate`, updates started before are not fresh.
+        self._update_generation: int = 0
+
+        # Built from cached `DeviceInfo` and not yet checked by an update.
+        self._unverified_info: bool = False
+
+        # Deadline budgets and circuit breaking, see `guarded`.
+        self.resilience: ResilienceSettings | None = resilience
+        # Seconds each request may take.
+        self.request_timeout: float = (
+            5.0
+            if resilience is None or resilience.request_timeout is None
+            else resilience.request_timeout
+        )
+        self.breaker: CircuitBreaker = CircuitBreaker(
+            host, resilience or ResilienceSettings()
+        )
+
+    def _set(self, field: str, value: Any) -> None:
+        """Set one of `DEVICE_FIELDS`, recording a change if it differs."""
+        old = getattr(self, field)
+        if old != value:
+            _record(self._pending_device, Change(field, old, value))
+            setattr(self, field, value)
+
+    @property
+    def stale(self) -> bool:
+        """Whether the state is stale, as requests are failing."""
+        return self.breaker.state is not CircuitState.CLOSED
+
+    def device_info(self) -> DeviceInfo:
+        """The static info read by `get_initial`, to be cached."""
+        return DeviceInfo(
+            self.host,
+            self.serial_number,
+            self.hardware_version,
+            self.firmware_version,
+            self.has_ups,
+            self.hostname,
+            self.number_outlets,
+        )
+
+    @publishes_changes
+    def apply_device_info(self, info: DeviceInfo) -> None:
+        """Set up from cached info instead of `get_initial`.
+
+        The serial number and outlet count are checked on the next update,
+        which raises `StaleDeviceInfoError` if they differ.
+        """
+        logger.debug("Apply Device Info")
+        self._set("hardware_version", info.hardware_version)
+        self._set("firmware_version", info.firmware_version)
+        self._set("has_ups", info.has_ups)
+        self._set("hostname", info.hostname)
+        self._set("serial_number", info.serial_number)
+        self._set("number_outlets", info.number_outlets)
+        self.outlets = self._create_outlets()
+        self._unverified_info = True
+
+    def verify_device_info(
+        self, serial_number: str | None, number_outlets: int | None
+    ) -> None:
+        """Check cached info against values from an update, once.
+
+        Either value is skipped if the update does not include it.
+        """
+        if not self._unverified_info:
+            return
+        self._unverified_info = False
+        for field, actual in (
+            ("serial_number", serial_number),
+            ("number_outlets", number_outlets),
+        ):
+            if actual is not None and actual != (cached := getattr(self, field)):
+                raise StaleDeviceInfoError(self.host, field, cached, actual)
+
+    def invalidate(self) -> None:
+        """Make the next `async_update` send a request.
+
+        Called after each command, as the last update no longer reflects it.
+        """
+        self.updated_at = None
+        self._update_task = None
+        self._update_generation += 1
+
+    def _record_outlet_change(self, change: Change) -> None:
+        assert change.outlet is not None
+        _record(self._pending_outlets.setdefault(change.outlet, {}), change)
+
+    def publish_changes(self) -> WattBoxDelta:
+        """Collect the changes since the last publish and notify subscribers.
+
+        Called automatically at the end of each update. The result is also
+        kept as `last_delta`.
+        """
+        delta = WattBoxDelta(
+            self._pending_device,
+            {
+                index: fields
+                for index, fields in self._pending_outlets.items()
+                if fields
+            },
+        )
+        self._pending_device = {}
+        self._pending_outlets = {}
+        self.last_delta = delta
+        if self._power_fresh:
+            self._power_fresh = False
+            if self.history is not None:
+                self.history.record_wattbox(self)
+            if self.energy is not None:
+                self.energy.record_wattbox(self)
+        if delta and self._subscriptions:
+            for change in delta.changes():
+                self._notify(change)
+        return delta
+
+    def _notify(self, change: Change) -> None:
+        for key in (change.field, None):
+            for subscription in self._subscriptions.get(key, ()):
+                if subscription.outlets is not None and (
+                    change.outlet not in subscription.outlets
+                ):
+                    continue
+                try:
+                    subscription.callback(change)
+                except Exception:
+                    logger.exception("Error in subscriber for %s", change)
+
+    def _create_outlets(self) -> dict[int, Outlet]:
+        """Outlets 1 to `number_outlets`, none of their values read yet."""
+        if self.outlet_store is None:
+            return {i: Outlet(i, self) for i in range(1, self.number_outlets + 1)}
+        # A new store, so nothing is left over from the previous outlets.
+        self.outlet_store = OutletStore()
+        return {i: StoredOutlet(i, self) for i in range(1, self.number_outlets + 1)}
+
+    def enable_outlet_store(self) -> OutletStore:
+        """Hold the values of the outlets in a columnar `OutletStore`.
+
+        Compact for large fleets and read a column at a time by `PowerHistory`
+        and `EnergyMeter`, at the cost of slower attribute access. The current
+        values are moved into it.
+        """
+        outlets = self.outlets
+        self.outlet_store = OutletStore()
+        self.outlets = self._create_outlets()
+        for index, outlet in outlets.items():
+            stored = self.outlets[index]
+            for field in (*_STORED_FIELDS, "name"):
+                setattr(stored, field, getattr(outlet, field))
+        return self.outlet_store
+
+    def enable_history(
+        self, capacity: int = 3600, tiers: Sequence[Tier] = DEFAULT_TIERS
+    ) -> PowerHistory:
+        """Keep the last `capacity` power readings, downsampled into `tiers`.
+
+        Sized for the current outlets, so call it after `get_initial`.
+        """
+        self.history = PowerHistory(self.number_outlets, capacity, tiers)
+        return self.history
+
+    def enable_energy(
+        self,
+        method: Integration = Integration.TRAPEZOID,
+        max_gap: float | None = 300.0,
+        checkpoint: EnergyCheckpoint | None = None,
+    ) -> EnergyMeter:
+        """Integrate the power readings into watt hours, see `EnergyMeter`.
+
+        Sized for the current outlets, so call it after `get_initial`.
+        """
+        self.energy = EnergyMeter(
+            self.host, self.number_outlets, method, max_gap, checkpoint
+        )
+        return self.energy
+
+    def subscribe(
+        self,
+        callback: Callable[[Change], None],
+        fields: Iterable[str] | None = None,
+        outlets: Iterable[int] | None = None,
+    ) -> Callable[[], None]:
+        """Call `callback` with each published change.
+
+        `fields` limits it to those field names. `outlets` limits it to
+        changes on those outlets, leaving out the WattBox itself. Returns a
+        function that removes the subscription.
+        """
+        subscription = _Subscription(
+            callback, None if outlets is None else frozenset(outlets)
+        )
+        keys: list[str | None] = [None] if fields is None else list(fields)
+        for key in keys:
+            self._subscriptions.setdefault(key, []).append(subscription)
+
+        def unsubscribe() -> None:
+            for key in keys:
+                if subscription in (subscriptions := self._subscriptions.get(key, [])):
+                    subscriptions.remove(subscription)
+
+        return unsubscribe
+
     @abstractmethod
     def get_initial(self) -> None:
         raise NotImplementedError()
@@ -90,29 +716,216 @@ class BaseWattBox(ABC):
     async def async_send_command(self, outlet: int, command: Commands) -> None:
         raise NotImplementedError()
 
+    # Update only some categories, where the API allows it. By default the
+    # whole WattBox is updated.
+    def update_categories(self, categories: Collection[UpdateCategory]) -> None:
+        self.update()
+
+    async def async_update_categories(
+        self, categories: Collection[UpdateCategory]
+    ) -> None:
+        await self.async_update()
+
+    # Send a command to each outlet in the mapping, then refresh the state once.
+    @abstractmethod
+    def send_commands(self, commands: Mapping[int, Commands]) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def async_send_commands(self, commands: Mapping[int, Commands]) -> None:
+        raise NotImplementedError()
+
+    # Connection lifecycle, nothing to release by default.
+    def close(self) -> None:  # noqa: B027
+        pass
+
+    async def async_close(self) -> None:
+        self.close()
+
+    def __enter__(self: _T_WattBox) -> _T_WattBox:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    async def __aenter__(self: _T_WattBox) -> _T_WattBox:
+        return self
 
-_T_WattBox = TypeVar("_T_WattBox", bound=BaseWattBox)
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.async_close()
 
 
 def _create_wattbox(
-    type_: type[_T_WattBox], host: str, user: str, password: str, port: int
+    type_: type[_T_WattBox],
+    host: str,
+    user: str,
+    password: str,
+    port: int,
+    info_cache: DeviceInfoCache | None = None,
+    **kwargs: Any,
 ) -> _T_WattBox:
-    wattbox = type_(host=host, user=user, password=password, port=port)
+    wattbox = type_(host=host, user=user, password=password, port=port, **kwargs)
+    try:
+        _initialize(wattbox, info_cache)
+    except BaseException:
+        # Never leave the sessions of a device that failed to be created open.
+        _close_failed(wattbox)
+        raise
+    return wattbox
+
+
+def _initialize(wattbox: BaseWattBox, info_cache: DeviceInfoCache | None) -> None:
+    if info_cache is not None and (info := info_cache.get(wattbox.host)) is not None:
+        wattbox.apply_device_info(info)
+        try:
+            wattbox.update()
+            return
+        except StaleDeviceInfoError as err:
+            logger.info("%s Reading it again.", err)
     wattbox.get_initial()
     wattbox.update()
-    return wattbox
+    if info_cache is not None:
+        info_cache.put(wattbox.device_info())
+
+
+def _close_failed(wattbox: BaseWattBox) -> None:
+    try:
+        wattbox.close()
+    except Exception as err:
+        logger.debug("%s: Close failed: %r", wattbox.host, err)
 
 
 async def _async_create_wattbox(
-    type_: type[_T_WattBox], host: str, user: str, password: str, port: int
+    type_: type[_T_WattBox],
+    host: str,
+    user: str,
+    password: str,
+    port: int,
+    info_cache: DeviceInfoCache | None = None,
+    **kwargs: Any,
 ) -> _T_WattBox:
-    wattbox = type_(host=host, user=user, password=password, port=port)
+    wattbox = type_(host=host, user=user, password=password, port=port, **kwargs)
+    try:
+        await _async_initialize(wattbox, info_cache)
+    except BaseException:
+        # Also when cancelled, such as by a timeout around the creation.
+        await _async_close_failed(wattbox)
+        raise
+    return wattbox
+
+
+async def _async_initialize(
+    wattbox: BaseWattBox, info_cache: DeviceInfoCache | None
+) -> None:
+    if info_cache is not None and (info := info_cache.get(wattbox.host)) is not None:
+        wattbox.apply_device_info(info)
+        try:
+            await wattbox.async_update()
+            return
+        except StaleDeviceInfoError as err:
+            logger.info("%s Reading it again.", err)
     await wattbox.async_get_initial()
     await wattbox.async_update()
-    return wattbox
+    if info_cache is not None:
+        info_cache.put(wattbox.device_info())
+
+
+async def _async_close_failed(wattbox: BaseWattBox) -> None:
+    try:
+        await wattbox.async_close()
+    except Exception as err:
+        logger.debug("%s: Close failed: %r", wattbox.host, err)
+
+
+_NONE_BOOL: Final[int] = -1
+_NONE_FLOAT: Final[float] = float("nan")
+
+
+# Outlet values held by an `OutletStore`, one array each.
+_STORED_FIELDS: Final[tuple[str, ...]] = (
+    "method",
+    "status",
+    "current_value",
+    "power_value",
+    "voltage_value",
+    "power_read_at",
+)
+
+
+class OutletStore:
+    """Values of all the outlets on a WattBox in contiguous arrays.
+
+    Arrays are indexed by outlet index, so index 0 is the master switch. A
+    `None` value is stored as -1 for booleans and NaN for floats.
+    """
+
+    __slots__ = _STORED_FIELDS
+
+    def __init__(self) -> None:
+        self.method: array[int] = array("b")
+        self.status: array[int] = array("b")
+        self.current_value: array[float] = array("d")  # In Amps
+        self.power_value: array[float] = array("d")  # In watts
+        self.voltage_value: array[float] = array("d")  # In volts
+        # `time.monotonic()` the power values were last read at.
+        self.power_read_at: array[float] = array("d")
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    def ensure(self, index: int) -> None:
+        """Grow the arrays to hold `index`."""
+        if (missing := index + 1 - len(self.status)) > 0:
+            self.method.extend([_NONE_BOOL] * missing)
+            self.status.extend([_NONE_BOOL] * missing)
+            self.current_value.extend([_NONE_FLOAT] * missing)
+            self.power_value.extend([_NONE_FLOAT] * missing)
+            self.voltage_value.extend([_NONE_FLOAT] * missing)
+            self.power_read_at.extend([_NONE_FLOAT] * missing)
+
+
+def _to_bool(value: int) -> bool | None:
+    return None if value == _NONE_BOOL else value == 1
+
+
+def _from_bool(value: bool | None) -> int:
+    return _NONE_BOOL if value is None else int(value)
+
+
+def _to_float(value: float) -> float | None:
+    # NaN is the only value not equal to itself.
+    return None if value != value else value
+
+
+def _from_float(value: float | None) -> float:
+    return _NONE_FLOAT if value is None else value
 
 
 class Outlet:
+    """A single outlet."""
+
+    __slots__ = (
+        "index",
+        "method",
+        "name",
+        "status",
+        "current_value",
+        "power_value",
+        "voltage_value",
+        "power_read_at",
+        "wattbox",
+    )
+
     def __init__(self, index: int, wattbox: BaseWattBox) -> None:
         self.index: int = index
         self.method: bool | None = None
@@ -122,9 +935,18 @@ class Outlet:
         self.current_value: float | None = None  # In Amps
         self.power_value: float | None = None  # In watts
         self.voltage_value: float | None = None  # In volts
+        # `time.monotonic()` the power values were last read at.
+        self.power_read_at: float | None = None
         # The WattBox
         self.wattbox: BaseWattBox = wattbox
 
+    @property
+    def power_age(self) -> float | None:
+        """Seconds since the power values were read, None if never."""
+        if (read_at := self.power_read_at) is None:
+            return None
+        return time.monotonic() - read_at
+
     def turn_on(self) -> None:
         self.wattbox.send_command(self.index, Commands.ON)
 
@@ -143,5 +965,75 @@ class Outlet:
     async def async_reset(self) -> None:
         await self.wattbox.async_send_command(self.index, Commands.RESET)
 
+    def _set(self, field: str, value: Any) -> None:
+        """Set one of `OUTLET_FIELDS`, recording a change if it differs."""
+        old = getattr(self, field)
+        if old != value:
+            self.wattbox._record_outlet_change(Change(field, old, value, self.index))
+            setattr(self, field, value)
+
     def __str__(self) -> str:
         return f"{self.name} ({self.index}): {self.status}"
+
+
+class StoredOutlet(Outlet):
+    """An outlet whose values are a view into the `OutletStore` of its WattBox.
+
+    The properties shadow the value slots of `Outlet`, which stay unused.
+    """
+
+    __slots__ = ("_store",)
+
+    def __init__(self, index: int, wattbox: BaseWattBox) -> None:
+        assert wattbox.outlet_store is not None
+        self._store: OutletStore = wattbox.outlet_store
+        self._store.ensure(index)
+        super().__init__(index, wattbox)
+
+    @property
+    def method(self) -> bool | None:
+        return _to_bool(self._store.method[self.index])
+
+    @method.setter
+    def method(self, value: bool | None) -> None:
+        self._store.method[self.index] = _from_bool(value)
+
+    @property
+    def status(self) -> bool | None:
+        return _to_bool(self._store.status[self.index])
+
+    @status.setter
+    def status(self, value: bool | None) -> None:
+        self._store.status[self.index] = _from_bool(value)
+
+    @property
+    def current_value(self) -> float | None:
+        return _to_float(self._store.current_value[self.index])
+
+    @current_value.setter
+    def current_value(self, value: float | None) -> None:
+        self._store.current_value[self.index] = _from_float(value)
+
+    @property
+    def power_value(self) -> float | None:
+        return _to_float(self._store.power_value[self.index])
+
+    @power_value.setter
+    def power_value(self, value: float | None) -> None:
+        self._store.power_value[self.index] = _from_float(value)
+
+    @property
+    def voltage_value(self) -> float | None:
+        return _to_float(self._store.voltage_value[self.index])
+
+    @voltage_value.setter
+    def voltage_value(self, value: float | None) -> None:
+        self._store.voltage_value[self.index] = _from_float(value)
+
+    @property
+    def power_read_at(self) -> float | None:
+        return _to_float(self._store.power_read_at[self.index])
+
+    @power_read_at.setter
+    def power_read_at(self, value: float | None) -> None:
+        self._store.power_read_at[self.index] = _from_float(value)
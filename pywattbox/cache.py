@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Final, NamedTuple
+
+logger = logging.getLogger("pywattbox.cache")
+
+# Bumped whenever `DeviceInfo` changes, older files are ignored.
+CACHE_VERSION: Final[int] = 1
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Write `data` to `path` as JSON, replacing the file atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(data, file, indent=1)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class DeviceInfo(NamedTuple):
+    """Static info read by `get_initial`, enough to build a WattBox without it."""
+
+    host: str
+    serial_number: str
+    hardware_version: str | None
+    firmware_version: str | None
+    has_ups: bool
+    hostname: str
+    number_outlets: int
+
+
+class StaleDeviceInfoError(Exception):
+    """The cached info does not match what the WattBox reports."""
+
+    def __init__(self, host: str, field: str, cached: Any, actual: Any) -> None:
+        super().__init__(
+            f"{host}: Cached {field} ({cached!r}) does not match the WattBox"
+            f" ({actual!r})."
+        )
+        self.host: str = host
+        self.field: str = field
+
+
+class DeviceInfoCache:
+    """`DeviceInfo` of each host, kept in a JSON file at `path`.
+
+    Entries are checked against the serial number and outlet count on the
+    first update of a WattBox built from them. With `autosave`, every change
+    is written straight away, otherwise call `save`. Safe to share between
+    threads.
+    """
+
+    __slots__ = ("path", "autosave", "_lock", "_devices", "_dirty")
+
+    def __init__(self, path: str | os.PathLike[str], autosave: bool = True) -> None:
+        self.path: str = os.fspath(path)
+        self.autosave: bool = autosave
+        self._lock: threading.Lock = threading.Lock()
+        self._devices: dict[str, DeviceInfo] = self._load()
+        self._dirty: bool = False
+
+    def _load(self) -> dict[str, DeviceInfo]:
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            logger.warning(
+                "Ignoring unreadable device info cache %s: %r", self.path, err
+            )
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            logger.debug("Ignoring device info cache %s of another version", self.path)
+            return {}
+        devices: dict[str, DeviceInfo] = {}
+        for host, fields in data.get("devices", {}).items():
+            try:
+                devices[host] = DeviceInfo(**fields)
+            except TypeError:
+                logger.debug("Ignoring invalid cached device info for %s", host)
+        return devices
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def get(self, host: str) -> DeviceInfo | None:
+        return self._devices.get(host)
+
+    def put(self, info: DeviceInfo) -> None:
+        with self._lock:
+            if self._devices.get(info.host) == info:
+                return
+            self._devices[info.host] = info
+            self._dirty = True
+        if self.autosave:
+            self.save()
+
+    def remove(self, host: str) -> None:
+        with self._lock:
+            if self._devices.pop(host, None) is None:
+                return
+            self._dirty = True
+        if self.autosave:
+            self.save()
+
+    def save(self) -> None:
+        """Write the file if anything changed, replacing it atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": CACHE_VERSION,
+                "devices": {
+                    host: info._asdict() for host, info in self._devices.items()
+                },
+            }
+            _write_json(self.path, data)
+            self._dirty = False
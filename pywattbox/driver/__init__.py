@@ -1,3 +1,5 @@
+import time
+from collections.abc import Iterable, Sequence
 from typing import Final
 
 PROMPTS: Final[str] = (
@@ -8,3 +10,152 @@ PROMPTS: Final[str] = (
     r"(#Error)"  # Error Message
     r"\n$"  # Newline / End of String
 )
+
+# Banner the WattBox sends once logged in.
+LOGGED_IN: Final[bytes] = b"Successfully Logged In!"
+OK: Final[bytes] = b"OK"
+ERROR: Final[bytes] = b"#Error"
+# Prefix of unsolicited status lines, e.g. `~OutletStatus=1,0,1`
+NOTIFICATION: Final[bytes] = b"~"
+
+
+# Byte values `bytes.strip` removes by default.
+_WHITESPACE: Final[frozenset[int]] = frozenset(b" \t\n\r\x0b\x0c")
+
+
+def _strip(view: memoryview) -> memoryview:
+    start, end = 0, len(view)
+    while start < end and view[start] in _WHITESPACE:
+        start += 1
+    while end > start and view[end - 1] in _WHITESPACE:
+        end -= 1
+    return view[start:end]
+
+
+class LineReader:
+    """Split channel reads into lines as they arrive.
+
+    Only the newly read bytes are scanned for line ends. Each line is a
+    stripped memoryview into the read it arrived in, so nothing is copied
+    unless a line is split across reads.
+    """
+
+    __slots__ = ("_partial",)
+
+    def __init__(self) -> None:
+        self._partial: bytearray = bytearray()
+
+    @property
+    def partial(self) -> bool:
+        """Whether a line is part read, so the next line is split across reads."""
+        return bool(self._partial)
+
+    def feed(self, data: bytes) -> list[memoryview]:
+        view = memoryview(data)
+        lines: list[memoryview] = []
+        start = 0
+        while (end := data.find(b"\n", start)) != -1:
+            if self._partial:
+                self._partial += view[start:end]
+                lines.append(_strip(memoryview(bytes(self._partial))))
+                self._partial.clear()
+            else:
+                lines.append(_strip(view[start:end]))
+            start = end + 1
+        if start < len(data):
+            self._partial += view[start:]
+        return lines
+
+
+def process_response(command: str, line: bytes | memoryview) -> memoryview:
+    """Extract the result from the reply line to `command`.
+
+    The result of a `?` request follows the `?Name=` prefix, which is the
+    command up to its own `=`.
+    """
+    view = memoryview(line)
+    if command.startswith("?"):
+        prefix = len(command.partition("=")[0])
+        if (
+            view[:prefix] == command[:prefix].encode()
+            and view[prefix : prefix + 1] == b"="
+        ):
+            return view[prefix + 1 :]
+    return view
+
+
+class PipelinedReplies:
+    """Match the replies to commands written in one go, as they are read.
+
+    The WattBox answers in order, but a `?` reply is still matched on its
+    echoed `?Command=` prefix so stray lines are never taken as a result.
+    `OK` and `#Error` belong to the oldest command still waiting on a reply.
+    Each reply records when it was read, so commands are timed on their own.
+    """
+
+    def __init__(self, commands: Sequence[str]) -> None:
+        self.commands: tuple[bytes, ...] = tuple(c.encode() for c in commands)
+        self.lines: list[memoryview | None] = [None] * len(commands)
+        # Every line matched to each command, including its echo.
+        self.raw_lines: list[list[memoryview]] = [[] for _ in commands]
+        self.notifications: list[bytes] = []
+        # `time.perf_counter` of the read that completed each reply.
+        self.read_at: list[float | None] = [None] * len(commands)
+        # Whether each reply was split across reads, so had to be read again.
+        self.split: list[bool] = [False] * len(commands)
+        self.reads: int = 0
+        self._pending: list[int] = list(range(len(commands)))
+        self._reader: LineReader = LineReader()
+
+    @property
+    def done(self) -> bool:
+        return not self._pending
+
+    @property
+    def pending(self) -> tuple[int, ...]:
+        """Indexes of the commands still waiting on a reply."""
+        return tuple(self._pending)
+
+    def feed(self, data: bytes) -> None:
+        self.reads += 1
+        # Only the first line of this read can complete a part read line.
+        split = self._reader.partial
+        self._match(self._reader.feed(data), time.perf_counter(), split)
+
+    def raw(self, index: int) -> bytes:
+        return b"\n".join(self.raw_lines[index])
+
+    def bytes_read(self, index: int) -> int:
+        """Bytes of the lines matched to a command, including its echo."""
+        return sum(len(line) + 1 for line in self.raw_lines[index])
+
+    def _match(self, lines: Iterable[memoryview], now: float, split: bool) -> None:
+        for position, line in enumerate(lines):
+            if line[:1] == NOTIFICATION:
+                self.notifications.append(line.tobytes())
+                continue
+            if not line or not self._pending:
+                continue
+            index = self._find(line)
+            if index is None:
+                continue
+            self.raw_lines[index].append(line)
+            if line == self.commands[index]:
+                # Echo of the command, the reply is still to come.
+                continue
+            self.lines[index] = line
+            self.read_at[index] = now
+            self.split[index] = split and position == 0
+            self._pending.remove(index)
+
+    def _find(self, line: memoryview) -> int | None:
+        if line == OK or line == ERROR:
+            return self._pending[0]
+        for index in self._pending:
+            command = self.commands[index]
+            if line == command:
+                return index
+            if command.startswith(b"?") and line[: len(command)] == command:
+                if line[len(command) : len(command) + 1] in (b"=", b","):
+                    return index
+        return None
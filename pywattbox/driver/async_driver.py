@@ -1,24 +1,72 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from collections.abc import Callable
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
 from io import BytesIO
 from typing import Any
 
-from scrapli.decorators import timeout_modifier
-from scrapli.driver import AsyncDriver
-from scrapli.exceptions import ScrapliConnectionNotOpened
-from scrapli.response import Response
+from ..base import MissingExtraError
+from ..metrics import NULL_METRICS, MetricsSink
+from ..resilience import request_timeout
+from . import (
+    ERROR,
+    LOGGED_IN,
+    NOTIFICATION,
+    PROMPTS,
+    LineReader,
+    PipelinedReplies,
+    process_response,
+)
+from .connection import ConnectionManager
 
-from . import PROMPTS
+try:
+    from scrapli.channel import AsyncChannel
+    from scrapli.decorators import timeout_modifier
+    from scrapli.driver import AsyncDriver
+    from scrapli.exceptions import (
+        ScrapliConnectionError,
+        ScrapliConnectionNotOpened,
+        ScrapliTimeout,
+    )
+    from scrapli.response import Response
+except ImportError as err:
+    raise MissingExtraError("ip", "scrapli") from err
 
 logger = logging.getLogger("pywattbox.async_driver")
 
 
 async def on_open(driver: WattBoxAsyncDriver) -> None:
-    # if driver.transport_name not in ("telnet", "asynctelnet"):
     logger.debug("On Open")
-    await driver.channel._read_until_prompt()
+    # The telnet login reads up to a prompt, usually the banner already.
+    if not driver.channel.logged_in:
+        await driver.channel._read_until_prompt()
+
+
+class WattBoxAsyncChannel(AsyncChannel):
+    """Channel that notes whether the login banner has been read."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.logged_in: bool = False
+        self._login_buf: bytes = b""
+
+    def open(self) -> None:
+        super().open()
+        self.logged_in = False
+        self._login_buf = b""
+
+    async def read(self) -> bytes:
+        buf = await super().read()
+        if not self.logged_in:
+            # Kept until the banner is seen, as it may be split across reads.
+            self._login_buf += buf
+            if LOGGED_IN in self._login_buf:
+                self.logged_in = True
+                self._login_buf = b""
+        return buf
 
 
 async def on_close(driver: WattBoxAsyncDriver) -> None:
@@ -56,6 +104,8 @@ class WattBoxAsyncDriver(AsyncDriver):
         channel_log_mode: str = "write",
         channel_lock: bool = True,
         logging_uid: str = "",
+        metrics: MetricsSink | None = None,
+        connection: ConnectionManager | None = None,
     ) -> None:
         super().__init__(
             host=host,
@@ -83,10 +133,58 @@ class WattBoxAsyncDriver(AsyncDriver):
             channel_lock=channel_lock,
             logging_uid=logging_uid,
         )
+        self.channel: WattBoxAsyncChannel = WattBoxAsyncChannel(
+            transport=self.transport, base_channel_args=self._base_channel_args
+        )
+        self.metrics: MetricsSink = metrics or NULL_METRICS
+        # Set after the first open, so any later open is a reconnect.
+        self._opened: bool = False
+        self.connection: ConnectionManager = connection or ConnectionManager(host)
+        # Unsolicited `~` status lines, oldest first, waiting to be consumed.
+        self.notifications: deque[bytes] = deque(maxlen=1024)
+        self._notification_reader: LineReader = LineReader()
 
     async def _open(self, force: bool = False) -> None:
-        if force or not self.transport.isalive():
-            await self.open()
+        connection = self.connection
+        if force or not connection.connected or not self.transport.isalive():
+            # Fail fast while backing off from an unreachable WattBox.
+            connection.check()
+            if self._opened:
+                self.metrics.reconnect(self._base_transport_args.host)
+            connection.connecting()
+            try:
+                await self.open()
+            except Exception as err:
+                connection.failed(err)
+                raise
+            self._opened = True
+            connection.opened()
+        connection.used()
+
+    async def _read_notifications(self, timeout: float) -> list[bytes]:
+        """Wait up to `timeout` for unsolicited `~` status lines.
+
+        Lines that arrived during earlier commands are returned first. The
+        channel lock is only held for the duration of a single read, so this
+        can be called in a loop without starving commands. Raises
+        `ScrapliConnectionError` if the WattBox closed the session.
+        """
+        if not self.notifications:
+            self._check_alive()
+            await self._open()
+            async with self.channel._channel_lock():
+                try:
+                    data = await asyncio.wait_for(self.channel.read(), timeout)
+                except asyncio.TimeoutError:
+                    data = b""
+            if not data:
+                self._check_alive()
+            for line in self._notification_reader.feed(data):
+                if line[:1] == NOTIFICATION:
+                    self.notifications.append(line.tobytes())
+        notifications = list(self.notifications)
+        self.notifications.clear()
+        return notifications
 
     @timeout_modifier
     async def _send_command(
@@ -95,65 +193,111 @@ class WattBoxAsyncDriver(AsyncDriver):
     ) -> Response:
         """Send a command.
 
-        Based on:
-            scrapli.driver.generic.async_driver.GenericDriver: send_command and _send_command
-            scrapli.channel.async_channel.Channel: send_input
+        Normally handled in the channel `send_input`, but WattBox is special and
+        doesn't work with that function, see `_exchange`.
 
         Args:
             command: string to send to device in privilege exec mode
-            failed_when_contains: string or list of strings indicating failure if found in response
 
         Returns:
             Response: Scrapli Response object
         """
-        await self._open()
+        (response,) = await self._exchange((command,))
+        return response
 
-        response = Response(
-            host=self._base_transport_args.host,
-            channel_input=command,
-            failed_when_contains="#Error",
-        )
+    @timeout_modifier
+    async def _send_commands(self, commands: Sequence[str]) -> list[Response]:
+        """Send a batch of commands without waiting on each reply.
+
+        All commands are written at once and the replies are matched back to
+        them as they arrive, so the batch costs about one round trip.
 
-        logger.debug("Sending Command: %s", command)
+        Args:
+            commands: strings to send to the device, in order
 
-        # Normally handled in the channel `send_input`, but WattBox is special and doesn't work
-        # with that function. Pulled it all into the Driver for simplicity.
+        Returns:
+            list[Response]: Scrapli Response objects, in the order of `commands`
+        """
+        return await self._exchange(commands)
+
+    async def _exchange(self, commands: Sequence[str]) -> list[Response]:
+        """Write `commands` and read until each has its reply.
+
+        Rather than matching the prompt pattern against the whole buffer after
+        every read, each read is scanned once for complete lines which are
+        matched to the commands as they arrive.
+        """
+        await self._open()
+        start = time.perf_counter()
+        host = self._base_transport_args.host
+        # No longer than what is left of the budget of the update or command.
+        timeout = request_timeout(self.timeout_ops)
+
+        logger.debug("Sending Commands: %s", commands)
+
+        replies = PipelinedReplies(commands)
         async with self.channel._channel_lock():
-            self.channel.write(command)
+            self.channel.write(self.comms_return_char.join(commands))
             self.channel.send_return()
-            raw_response = await self.channel._read_until_prompt()
-
-            logger.debug("raw_response: %s", raw_response)
-            split_response = raw_response.strip().splitlines()
-            logger.debug("split_response: %s", split_response)
-            if (
-                self.transport not in ("telnet", "asynctelnet")
-                and len(split_response) < 2
-            ):
-                logger.debug("Not enough lines: %s. Getting more", len(split_response))
-                raw_response += await self.channel._read_until_prompt()
-                logger.debug("raw_response: %s", raw_response)
-                split_response = raw_response.strip().splitlines()
-                logger.debug("split_response: %s", split_response)
-
-        if (
-            self.transport not in ("telnet", "asynctelnet")
-            and split_response[0] != command.encode()
+            try:
+                await asyncio.wait_for(self._read_replies(replies), timeout)
+            except asyncio.TimeoutError as err:
+                for index in replies.pending:
+                    self.metrics.error(host, commands[index])
+                self._drop()
+                raise ScrapliTimeout(
+                    f"Timed out waiting on replies to: {commands}"
+                ) from err
+            except BaseException:
+                # Cancelled, or the read failed, with replies still to come.
+                self._drop()
+                raise
+
+        if replies.notifications:
+            logger.debug("notifications: %s", replies.notifications)
+            self.notifications.extend(replies.notifications)
+
+        responses: list[Response] = []
+        for index, (command, line, read_at) in enumerate(
+            zip(commands, replies.lines, replies.read_at, strict=True)
         ):
-            logger.error("Doesn't match command: %s - %s", command, split_response[0])
-
-        if command.startswith("?"):
-            if not split_response[-1].startswith(command.encode()):
-                logger.error(
-                    "Expected response to start with: %s, Got %s",
-                    command,
-                    split_response[-1],
-                )
-            processed_response = split_response[1].split(b"=")[-1]
-        else:
-            processed_response = split_response[-1]
-
-        logger.debug("processed_response: %s", processed_response)
-        response.record_response(processed_response)
-        response.raw_result = raw_response
-        return response
+            # Timed up to its own reply, even within a pipelined batch.
+            seconds = (read_at or start) - start
+            self.metrics.request(host, command, seconds, replies.bytes_read(index))
+            if replies.split[index]:
+                self.metrics.reread(host, command)
+            response = Response(
+                host=host,
+                channel_input=command,
+                failed_when_contains="#Error",
+            )
+            processed_response = process_response(command, line or b"")
+            if processed_response == ERROR:
+                self.metrics.error(host, command)
+            logger.debug("processed_response: %s", processed_response)
+            # Scrapli decodes the result, which needs `bytes`.
+            response.record_response(processed_response.tobytes())
+            response.raw_result = replies.raw(index)
+            responses.append(response)
+        return responses
+
+    async def _read_replies(self, replies: PipelinedReplies) -> None:
+        while not replies.done:
+            replies.feed(await self.channel.read())
+
+    def _check_alive(self) -> None:
+        """Raise `ScrapliConnectionError` if an open session was closed."""
+        if self.connection.connected and not self.transport.isalive():
+            self._drop()
+            raise ScrapliConnectionError("Session closed by the WattBox.")
+
+    def _drop(self) -> None:
+        """Close a session that has commands without a reply.
+
+        Their replies may still arrive and would be taken as the replies to the
+        next commands, so those are sent on a new session instead.
+        """
+        logger.debug("Dropping session with unanswered commands")
+        self.transport.close()
+        self.channel.close()
+        self.connection.dropped()
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from collections.abc import Callable
+from enum import Enum
+from typing import TYPE_CHECKING, Final, NamedTuple
+
+if TYPE_CHECKING:
+    from .async_driver import WattBoxAsyncDriver
+    from .sync_driver import WattBoxDriver
+
+logger = logging.getLogger("pywattbox.connection")
+
+# Cheapest request with a short reply, used to keep a session warm.
+KEEPALIVE: Final[str] = "?Firmware"
+
+
+class ConnectionState(Enum):
+    DISCONNECTED = "disconnected"
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    # Closed by `close` or after being idle, reopened by the next command.
+    CLOSED = "closed"
+    # Opening failed, waiting out the backoff before trying again.
+    BACKOFF = "backoff"
+
+
+class ConnectionSettings(NamedTuple):
+    # Seconds without any traffic before a keepalive is sent, None for never.
+    keepalive_interval: float | None = None
+    # Seconds without a command before the session is closed, None for never.
+    idle_timeout: float | None = None
+    # Seconds to wait after the first failed open, doubled after each failure.
+    backoff_initial: float = 1.0
+    backoff_max: float = 60.0
+    backoff_multiplier: float = 2.0
+    # Fraction of each backoff randomly added or removed.
+    backoff_jitter: float = 0.2
+
+
+def backoff_delay(settings: ConnectionSettings, failures: int) -> float:
+    """Seconds to wait after `failures` consecutive failures."""
+    delay = min(
+        settings.backoff_max,
+        settings.backoff_initial * settings.backoff_multiplier ** max(0, failures - 1),
+    )
+    return delay * (1 + random.uniform(-1, 1) * settings.backoff_jitter)
+
+
+class ConnectionBackoffError(ConnectionError):
+    """Not opening a session, the last attempt failed too recently."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"{host}: Not connecting, retrying in {retry_in:.1f}s.")
+        self.retry_in: float = retry_in
+
+
+class ConnectionManager:
+    """Track and maintain the session of a single driver.
+
+    The driver reports each open, failure and command to it. Opening is
+    refused until the backoff after a failure has passed, so an unreachable
+    WattBox fails fast instead of timing out on every command. `maintain`, or
+    `async_maintain`, sends keepalives, closes idle sessions and reopens
+    dropped ones and should be called periodically.
+    """
+
+    __slots__ = (
+        "host",
+        "settings",
+        "clock",
+        "state",
+        "failures",
+        "retry_at",
+        "last_used",
+        "last_traffic",
+        "_listeners",
+    )
+
+    def __init__(
+        self,
+        host: str,
+        settings: ConnectionSettings | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host: str = host
+        self.settings: ConnectionSettings = settings or ConnectionSettings()
+        self.clock: Callable[[], float] = clock
+
+        self.state: ConnectionState = ConnectionState.DISCONNECTED
+        # Consecutive failed opens.
+        self.failures: int = 0
+        self.retry_at: float = float("-inf")
+        # Last command sent by the WattBox, and last of any traffic.
+        self.last_used: float = clock()
+        self.last_traffic: float = clock()
+        self._listeners: list[Callable[[ConnectionState], None]] = []
+
+    @property
+    def connected(self) -> bool:
+        return self.state is ConnectionState.CONNECTED
+
+    def add_listener(
+        self, callback: Callable[[ConnectionState], None]
+    ) -> Callable[[], None]:
+        """Call `callback` with each new state. Returns a function removing it."""
+        self._listeners.append(callback)
+
+        def remove() -> None:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+        return remove
+
+    def _set_state(self, state: ConnectionState) -> None:
+        if state is self.state:
+            return
+        logger.debug("%s: %s -> %s", self.host, self.state.value, state.value)
+        self.state = state
+        for listener in list(self._listeners):
+            listener(state)
+
+    def backoff(self) -> float:
+        """Seconds to wait after the current number of failures."""
+        return backoff_delay(self.settings, self.failures)
+
+    def check(self) -> None:
+        """Raise `ConnectionBackoffError` if opening is not allowed yet."""
+        if (retry_in := self.retry_at - self.clock()) > 0:
+            raise ConnectionBackoffError(self.host, retry_in)
+
+    def connecting(self) -> None:
+        self._set_state(ConnectionState.CONNECTING)
+
+    def opened(self) -> None:
+        self.failures = 0
+        self.retry_at = float("-inf")
+        self.last_traffic = self.clock()
+        self._set_state(ConnectionState.CONNECTED)
+
+    def failed(self, err: BaseException) -> None:
+        self.failures += 1
+        delay = self.backoff()
+        self.retry_at = self.clock() + delay
+        logger.debug("%s: Open failed (%r), retrying in %.1fs", self.host, err, delay)
+        self._set_state(ConnectionState.BACKOFF)
+
+    def dropped(self) -> None:
+        self._set_state(ConnectionState.DISCONNECTED)
+
+    def closed(self) -> None:
+        self._set_state(ConnectionState.CLOSED)
+
+    def used(self) -> None:
+        self.last_used = self.last_traffic = self.clock()
+
+    def _action(self, alive: bool) -> str | None:
+        """What `maintain` needs to do next, if anything."""
+        now = self.clock()
+        settings = self.settings
+        if self.state is ConnectionState.CONNECTED and not alive:
+            self.dropped()
+        if self.state is ConnectionState.CONNECTED:
+            if (
+                settings.idle_timeout is not None
+                and now - self.last_used >= settings.idle_timeout
+            ):
+                return "close"
+            if (
+                settings.keepalive_interval is not None
+                and now - self.last_traffic >= settings.keepalive_interval
+            ):
+                return "keepalive"
+            return None
+        # Keep a session warm only while it has not been closed on purpose.
+        if (
+            self.state in (ConnectionState.DISCONNECTED, ConnectionState.BACKOFF)
+            and settings.keepalive_interval is not None
+            and now >= self.retry_at
+        ):
+            return "open"
+        return None
+
+    def seconds_until_due(self) -> float:
+        """Seconds until `maintain` may next have something to do."""
+        now = self.clock()
+        settings = self.settings
+        due: list[float] = []
+        if self.state is ConnectionState.CONNECTED:
+            if settings.idle_timeout is not None:
+                due.append(self.last_used + settings.idle_timeout)
+            if settings.keepalive_interval is not None:
+                due.append(self.last_traffic + settings.keepalive_interval)
+        elif self.state is ConnectionState.BACKOFF:
+            due.append(self.retry_at)
+        if settings.keepalive_interval is not None:
+            # Also notice dropped sessions in a timely manner.
+            due.append(now + settings.keepalive_interval)
+        return max(0.0, min(due, default=now + 60.0) - now)
+
+    def maintain(self, driver: WattBoxDriver) -> None:
+        action = self._action(driver.isalive())
+        # Keepalives and reopens are not uses, so never hold off the idle close.
+        last_used = self.last_used
+        try:
+            if action == "close":
+                logger.debug("%s: Closing idle session", self.host)
+                self.closed()
+                driver.close()
+            elif action == "keepalive":
+                driver._send_command(KEEPALIVE)
+            elif action == "open":
+                driver._open()
+        except Exception as err:
+            logger.debug("%s: Maintain failed: %r", self.host, err)
+            if action == "keepalive":
+                try:
+                    driver.close()
+                except Exception:
+                    pass
+                self.dropped()
+        self.last_used = last_used
+
+    async def async_maintain(self, driver: WattBoxAsyncDriver) -> None:
+        action = self._action(driver.isalive())
+        last_used = self.last_used
+        try:
+            if action == "close":
+                logger.debug("%s: Closing idle session", self.host)
+                self.closed()
+                await driver.close()
+            elif action == "keepalive":
+                await driver._send_command(KEEPALIVE)
+            elif action == "open":
+                await driver._open()
+        except Exception as err:
+            logger.debug("%s: Maintain failed: %r", self.host, err)
+            if action == "keepalive":
+                try:
+                    await driver.close()
+                except Exception:
+                    pass
+                self.dropped()
+        self.last_used = last_used
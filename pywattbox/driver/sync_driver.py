@@ -1,16 +1,29 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Sequence
 from io import BytesIO
 from typing import Any
 
-from scrapli.decorators import timeout_modifier
-from scrapli.driver import Driver
-from scrapli.exceptions import ScrapliConnectionNotOpened
-from scrapli.response import Response
-
-from . import PROMPTS
+from ..base import MissingExtraError
+from ..metrics import NULL_METRICS, MetricsSink
+from ..resilience import request_timeout
+from . import (
+    ERROR,
+    PROMPTS,
+    PipelinedReplies,
+    process_response,
+)
+from .connection import ConnectionManager
+
+try:
+    from scrapli.decorators import timeout_modifier
+    from scrapli.driver import Driver
+    from scrapli.exceptions import ScrapliConnectionNotOpened, ScrapliTimeout
+    from scrapli.response import Response
+except ImportError as err:
+    raise MissingExtraError("ip", "scrapli") from err
 
 logger = logging.getLogger("pywattbox.sync_driver")
 
@@ -55,6 +68,8 @@ class WattBoxDriver(Driver):
         channel_log_mode: str = "write",
         channel_lock: bool = True,
         logging_uid: str = "",
+        metrics: MetricsSink | None = None,
+        connection: ConnectionManager | None = None,
     ) -> None:
         super().__init__(
             host=host,
@@ -82,10 +97,27 @@ class WattBoxDriver(Driver):
             channel_lock=channel_lock,
             logging_uid=logging_uid,
         )
+        self.metrics: MetricsSink = metrics or NULL_METRICS
+        # Set after the first open, so any later open is a reconnect.
+        self._opened: bool = False
+        self.connection: ConnectionManager = connection or ConnectionManager(host)
 
     def _open(self, force: bool = False) -> None:
-        if force or not self.transport.isalive():
-            self.open()
+        connection = self.connection
+        if force or not connection.connected or not self.transport.isalive():
+            # Fail fast while backing off from an unreachable WattBox.
+            connection.check()
+            if self._opened:
+                self.metrics.reconnect(self._base_transport_args.host)
+            connection.connecting()
+            try:
+                self.open()
+            except Exception as err:
+                connection.failed(err)
+                raise
+            self._opened = True
+            connection.opened()
+        connection.used()
 
     @timeout_modifier
     def _send_command(
@@ -94,63 +126,105 @@ class WattBoxDriver(Driver):
     ) -> Response:
         """Send a command.
 
-        Based on:
-            scrapli.driver.generic.sync_driver.GenericDriver: send_command and _send_command
-            scrapli.channel.sync_channel.Channel: send_input
+        Normally handled in the channel `send_input`, but WattBox is special and
+        doesn't work with that function, see `_exchange`.
 
         Args:
             command: string to send to device in privilege exec mode
-            failed_when_contains: string or list of strings indicating failure if found in response
 
         Returns:
             Response: Scrapli Response object
         """
+        (response,) = self._exchange((command,))
+        return response
+
+    @timeout_modifier
+    def _send_commands(self, commands: Sequence[str]) -> list[Response]:
+        """Send a batch of commands without waiting on each reply.
+
+        All commands are written at once and the replies are matched back to
+        them as they arrive, so the batch costs about one round trip.
+
+        Args:
+            commands: strings to send to the device, in order
+
+        Returns:
+            list[Response]: Scrapli Response objects, in the order of `commands`
+        """
+        return self._exchange(commands)
+
+    def _exchange(self, commands: Sequence[str]) -> list[Response]:
+        """Write `commands` and read until each has its reply.
+
+        Rather than matching the prompt pattern against the whole buffer after
+        every read, each read is scanned once for complete lines which are
+        matched to the commands as they arrive.
+        """
         self._open()
+        start = time.perf_counter()
+        host = self._base_transport_args.host
+        # No longer than what is left of the budget of the update or command.
+        # Each read is bounded by the transport, so checked between reads.
+        expires = start + request_timeout(self.timeout_ops)
 
-        response = Response(
-            host=self._base_transport_args.host,
-            channel_input=command,
-            failed_when_contains="#Error",
-        )
+        logger.debug("Sending Commands: %s", commands)
 
-        # Normally handled in the channel `send_input`, but WattBox is special and doesn't work
-        # with that function. Pulled it all into the Driver for simplicity.
+        replies = PipelinedReplies(commands)
         with self.channel._channel_lock():
-            self.channel.write(command)
+            self.channel.write(self.comms_return_char.join(commands))
             self.channel.send_return()
-            raw_response = self.channel._read_until_prompt()
-
-            logger.debug("raw_response: %s", raw_response)
-            split_response = raw_response.strip().splitlines()
-            logger.debug("split_response: %s", split_response)
-            if (
-                self.transport not in ("telnet", "asynctelnet")
-                and len(split_response) < 2
-            ):
-                logger.error("Not enough lines: %s. Getting more", len(split_response))
-                raw_response += self.channel._read_until_prompt()
-                logger.debug("raw_response: %s", raw_response)
-                split_response = raw_response.strip().splitlines()
-                logger.debug("split_response: %s", split_response)
-
-        if (
-            self.transport not in ("telnet", "asynctelnet")
-            and split_response[0] != command.encode()
+            try:
+                while not replies.done:
+                    if time.perf_counter() > expires:
+                        raise TimeoutError
+                    replies.feed(self.channel.read())
+            except (TimeoutError, ScrapliTimeout) as err:
+                # Also the socket timing out within the read of the transport.
+                for index in replies.pending:
+                    self.metrics.error(host, commands[index])
+                self._drop()
+                raise ScrapliTimeout(
+                    f"Timed out waiting on replies to: {commands}"
+                ) from err
+            except BaseException:
+                self._drop()
+                raise
+
+        if replies.notifications:
+            # Nothing listens on the sync driver, so these are only logged.
+            logger.debug("Ignoring notifications: %s", replies.notifications)
+
+        responses: list[Response] = []
+        for index, (command, line, read_at) in enumerate(
+            zip(commands, replies.lines, replies.read_at, strict=True)
         ):
-            logger.error("Doesn't match command: %s - %s", command, split_response[0])
-
-        if command.startswith("?"):
-            if not split_response[-1].startswith(command.encode()):
-                logger.error(
-                    "Expected response to start with: %s, Got %s",
-                    command,
-                    split_response[-1],
-                )
-            processed_response = split_response[1].split(b"=")[-1]
-        else:
-            processed_response = split_response[-1]
-
-        logger.debug("processed_response: %s", processed_response)
-        response.record_response(processed_response)
-        response.raw_result = raw_response
-        return response
+            # Timed up to its own reply, even within a pipelined batch.
+            seconds = (read_at or start) - start
+            self.metrics.request(host, command, seconds, replies.bytes_read(index))
+            if replies.split[index]:
+                self.metrics.reread(host, command)
+            response = Response(
+                host=host,
+                channel_input=command,
+                failed_when_contains="#Error",
+            )
+            processed_response = process_response(command, line or b"")
+            if processed_response == ERROR:
+                self.metrics.error(host, command)
+            logger.debug("processed_response: %s", processed_response)
+            # Scrapli decodes the result, which needs `bytes`.
+            response.record_response(processed_response.tobytes())
+            response.raw_result = replies.raw(index)
+            responses.append(response)
+        return responses
+
+    def _drop(self) -> None:
+        """Close a session that has commands without a reply.
+
+        Their replies may still arrive and would be taken as the replies to the
+        next commands, so those are sent on a new session instead.
+        """
+        logger.debug("Dropping session with unanswered commands")
+        self.transport.close()
+        self.channel.close()
+        self.connection.dropped()
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+from enum import Enum
+from typing import TYPE_CHECKING, Final
+
+from .cache import _write_json
+
+if TYPE_CHECKING:
+    from .base import BaseWattBox
+
+logger = logging.getLogger("pywattbox.energy")
+
+# Bumped whenever the checkpoint format changes, older files are ignored.
+CHECKPOINT_VERSION: Final[int] = 1
+
+_NAN: Final[float] = float("nan")
+
+
+class Integration(Enum):
+    """How the power between two readings is integrated."""
+
+    # Each reading is held until the next one.
+    LEFT = "left"
+    # The power changes linearly from one reading to the next.
+    TRAPEZOID = "trapezoid"
+
+
+class EnergyCheckpoint:
+    """Energy totals of each host, kept in a JSON file at `path`.
+
+    Totals are written at most every `interval` seconds, so at most that much
+    energy is lost if the process dies, and on `save`. Safe to share between
+    threads and meters.
+    """
+
+    __slots__ = ("path", "interval", "_lock", "_totals", "_dirty", "_saved_at")
+
+    def __init__(self, path: str | os.PathLike[str], interval: float = 60.0) -> None:
+        self.path: str = os.fspath(path)
+        self.interval: float = interval
+        self._lock: threading.Lock = threading.Lock()
+        self._totals: dict[str, list[float]] = self._load()
+        self._dirty: bool = False
+        self._saved_at: float = time.monotonic()
+
+    def _load(self) -> dict[str, list[float]]:
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            logger.warning(
+                "Ignoring unreadable energy checkpoint %s: %r", self.path, err
+            )
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CHECKPOINT_VERSION:
+            logger.debug("Ignoring energy checkpoint %s of another version", self.path)
+            return {}
+        totals: dict[str, list[float]] = {}
+        for host, wh in data.get("devices", {}).items():
+            try:
+                totals[host] = [float(value) for value in wh]
+            except (TypeError, ValueError):
+                logger.debug("Ignoring invalid energy checkpoint for %s", host)
+        return totals
+
+    def get(self, host: str) -> list[float] | None:
+        """Watt hours of `host`, the WattBox total first, then each outlet."""
+        return self._totals.get(host)
+
+    def put(self, host: str, wh: Sequence[float]) -> None:
+        with self._lock:
+            self._totals[host] = list(wh)
+            self._dirty = True
+            due = time.monotonic() - self._saved_at >= self.interval
+        if due:
+            self.save()
+
+    def save(self) -> None:
+        """Write the file if anything changed, replacing it atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            _write_json(
+                self.path, {"version": CHECKPOINT_VERSION, "devices": self._totals}
+            )
+            self._dirty = False
+            self._saved_at = time.monotonic()
+
+
+class EnergyMeter:
+    """Energy used by a WattBox and each of its outlets, in watt hours.
+
+    Integrated from each power reading as it is parsed. Column 0 is the
+    WattBox total and each outlet uses its own index, like `PowerHistory`.
+    Outlets are integrated by the time each of them was read, so outlets read
+    less often by `PowerSampling` are still accurate. Readings more than
+    `max_gap` seconds apart are not integrated, so an outage is not filled
+    in, and are counted in `gaps`. With a `checkpoint` the totals are restored
+    from it and written back to it.
+    """
+
+    __slots__ = (
+        "host",
+        "outlets",
+        "method",
+        "max_gap",
+        "checkpoint",
+        "wh",
+        "gaps",
+        "_at",
+        "_power",
+    )
+
+    def __init__(
+        self,
+        host: str,
+        number_outlets: int,
+        method: Integration = Integration.TRAPEZOID,
+        max_gap: float | None = 300.0,
+        checkpoint: EnergyCheckpoint | None = None,
+    ) -> None:
+        self.host: str = host
+        self.outlets: int = number_outlets
+        self.method: Integration = method
+        self.max_gap: float | None = max_gap
+        self.checkpoint: EnergyCheckpoint | None = checkpoint
+        columns = number_outlets + 1
+        self.wh: array[float] = array("d", [0.0]) * columns
+        if checkpoint is not None and (saved := checkpoint.get(host)) is not None:
+            self.wh[: min(columns, len(saved))] = array("d", saved[:columns])
+        # Gaps longer than `max_gap` left out of each column.
+        self.gaps: array[int] = array("L", [0]) * columns
+        # Time and value of the last reading of each column.
+        self._at: array[float] = array("d", [_NAN]) * columns
+        self._power: array[float] = array("d", [_NAN]) * columns
+
+    def add(self, column: int, at: float, power: float) -> None:
+        """Integrate a reading of `power` watts taken at `at` seconds."""
+        last_at = self._at[column]
+        if at == last_at:
+            # Not read again since the last update.
+            return
+        if power != power:
+            # A missing reading, NaN is not equal to itself.
+            self._at[column] = _NAN
+            return
+        # NaN when there is no previous reading to integrate from.
+        if last_at == last_at:
+            elapsed = at - last_at
+            if self.max_gap is not None and elapsed > self.max_gap:
+                self.gaps[column] += 1
+            elif elapsed > 0:
+                last = self._power[column]
+                watts = last if self.method is Integration.LEFT else (last + power) / 2
+                self.wh[column] += watts * elapsed / 3600
+        self._at[column] = at
+        self._power[column] = power
+
+    def record_wattbox(self, wattbox: BaseWattBox, at: float | None = None) -> None:
+        """Integrate the current readings, the total as read at `at`."""
+        self.add(
+            0,
+            time.monotonic() if at is None else at,
+            _NAN if wattbox.power_value is None else float(wattbox.power_value),
+        )
+        store = wattbox.outlet_store
+        if store is not None:
+            for column in range(1, min(self.outlets + 1, len(store))):
+                self.add(column, store.power_read_at[column], store.power_value[column])
+        else:
+            for index, outlet in wattbox.outlets.items():
+                if index <= self.outlets:
+                    self.add(
+                        index,
+                        _NAN if outlet.power_read_at is None else outlet.power_read_at,
+                        _NAN if outlet.power_value is None else outlet.power_value,
+                    )
+        if self.checkpoint is not None:
+            self.checkpoint.put(self.host, self.wh)
+
+    def total(self, outlet: int = 0) -> float:
+        """Watt hours used, outlet 0 being the WattBox total."""
+        if not 0 <= outlet <= self.outlets:
+            raise KeyError(f"Outlet ({outlet}) is not metered.")
+        return self.wh[outlet]
+
+    def totals(self) -> dict[int, float]:
+        """Watt hours used by each outlet, by index."""
+        return {outlet: self.wh[outlet] for outlet in range(1, self.outlets + 1)}
+
+    def reset(self, outlet: int | None = None) -> None:
+        """Zero the total of `outlet`, or of every column."""
+        columns: Sequence[int] = (
+            range(self.outlets + 1) if outlet is None else (outlet,)
+        )
+        for column in columns:
+            self.wh[column] = 0.0
+            self.gaps[column] = 0
+        if self.checkpoint is not None:
+            self.checkpoint.put(self.host, self.wh)
@@ -0,0 +1,432 @@
+"""Prometheus exporter serving the state of many WattBoxes.
+
+A single background loop polls every WattBox, and scrapes are answered from
+the last rendered text, so scraping never reaches the devices. Run it with
+`python -m pywattbox.exporter --config devices.json`, where the file holds a
+list of objects with `host`, `user`, `password` and optionally `port`,
+`type` (`http` or `ip`) and `transport`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import time
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, Final, NamedTuple
+
+from .base import BaseWattBox, Change
+from .cache import DeviceInfoCache
+from .fleet import DeviceConfig, DeviceKey, FleetResult, WattBoxFleet, device_key
+
+logger = logging.getLogger("pywattbox.exporter")
+
+CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds a scrape may take to send its request, and the most it may send.
+HEADER_TIMEOUT: Final[float] = 10.0
+MAX_HEADER_BYTES: Final[int] = 8192
+
+
+class Family(NamedTuple):
+    name: str
+    help: str
+    # The WattBox or outlet field it is read from, None if set by the exporter.
+    field: str | None
+    # Only exported for WattBoxes with a UPS.
+    ups: bool = False
+
+
+UP: Final[Family] = Family("wattbox_up", "Whether the last poll succeeded.", None)
+STALE: Final[Family] = Family(
+    "wattbox_stale", "Whether polling is backing off after failures.", None
+)
+
+DEVICE_FAMILIES: Final[tuple[Family, ...]] = (
+    Family("wattbox_power_watts", "Total power draw.", "power_value"),
+    Family("wattbox_current_amps", "Total current draw.", "current_value"),
+    Family("wattbox_voltage_volts", "Input voltage.", "voltage_value"),
+    Family(
+        "wattbox_safe_voltage", "Whether the voltage is safe.", "safe_voltage_status"
+    ),
+    Family("wattbox_power_lost", "Whether input power is lost.", "power_lost"),
+    Family("wattbox_auto_reboot", "Whether auto reboot is enabled.", "auto_reboot"),
+    Family("wattbox_audible_alarm", "Whether the alarm is sounding.", "audible_alarm"),
+    Family(
+        "wattbox_battery_charge_percent", "UPS battery charge.", "battery_charge", True
+    ),
+    Family("wattbox_battery_load_percent", "UPS load.", "battery_load", True),
+    Family(
+        "wattbox_battery_healthy",
+        "Whether the battery is healthy.",
+        "battery_health",
+        True,
+    ),
+    Family(
+        "wattbox_battery_runtime_minutes",
+        "Estimated UPS run time.",
+        "est_run_time",
+        True,
+    ),
+)
+
+OUTLET_FAMILIES: Final[tuple[Family, ...]] = (
+    Family("wattbox_outlet_on", "Whether the outlet is on.", "status"),
+    Family("wattbox_outlet_power_watts", "Outlet power draw.", "power_value"),
+    Family("wattbox_outlet_current_amps", "Outlet current draw.", "current_value"),
+    Family("wattbox_outlet_voltage_volts", "Outlet voltage.", "voltage_value"),
+)
+
+_DEVICE_BY_FIELD: Final[dict[str, Family]] = {
+    family.field: family for family in DEVICE_FAMILIES if family.field is not None
+}
+_OUTLET_BY_FIELD: Final[dict[str, Family]] = {
+    family.field: family for family in OUTLET_FAMILIES if family.field is not None
+}
+
+# Series are keyed by WattBox and outlet, 0 for the WattBox itself.
+_SeriesKey = tuple[DeviceKey, int]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: Any) -> str | None:
+    """The sample value, None to leave the series out."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    value = float(value)
+    if math.isnan(value):
+        return None
+    return repr(value) if not value.is_integer() else str(int(value))
+
+
+class Exposition:
+    """Text exposition kept up to date one series at a time.
+
+    Each series line is only formatted when its value changes, each family is
+    only joined again when one of its series changed, and the whole text is
+    only joined again when a family changed.
+    """
+
+    __slots__ = ("families", "_series", "_text", "_dirty", "_body")
+
+    def __init__(self, families: Iterable[Family]) -> None:
+        self.families: tuple[Family, ...] = tuple(families)
+        self._series: dict[str, dict[_SeriesKey, str]] = {
+            family.name: {} for family in self.families
+        }
+        self._text: dict[str, str] = {}
+        self._dirty: set[str] = {family.name for family in self.families}
+        self._body: bytes | None = None
+
+    def set(self, family: Family, key: _SeriesKey, labels: str, value: Any) -> None:
+        series = self._series[family.name]
+        if (sample := _format(value)) is None:
+            if series.pop(key, None) is not None:
+                self._dirty.add(family.name)
+            return
+        line = f"{family.name}{{{labels}}} {sample}\n"
+        if series.get(key) != line:
+            series[key] = line
+            self._dirty.add(family.name)
+
+    def remove(self, device: DeviceKey) -> None:
+        for name, series in self._series.items():
+            for key in [key for key in series if key[0] == device]:
+                del series[key]
+                self._dirty.add(name)
+
+    def render(self) -> bytes:
+        if self._dirty:
+            for family in self.families:
+                if family.name not in self._dirty:
+                    continue
+                if series := self._series[family.name]:
+                    self._text[family.name] = (
+                        f"# HELP {family.name} {family.help}\n"
+                        f"# TYPE {family.name} gauge\n" + "".join(series.values())
+                    )
+                else:
+                    self._text.pop(family.name, None)
+            self._dirty.clear()
+            self._body = None
+        if self._body is None:
+            self._body = "".join(
+                self._text[family.name]
+                for family in self.families
+                if family.name in self._text
+            ).encode()
+        return self._body
+
+
+class WattBoxExporter:
+    """Poll many WattBoxes in the background and serve their state.
+
+    Every `interval` seconds all WattBoxes are updated through a
+    `WattBoxFleet`. Only the changes each update publishes are rendered,
+    and scrapes return the last rendering as is.
+    """
+
+    def __init__(
+        self,
+        wattboxes: Iterable[BaseWattBox] = (),
+        interval: float = 10.0,
+        concurrency: int = 32,
+        timeout: float | None = 10.0,
+    ) -> None:
+        self.interval: float = interval
+        self.fleet: WattBoxFleet = WattBoxFleet(
+            concurrency=concurrency, timeout=timeout
+        )
+        self.exposition: Exposition = Exposition(
+            (UP, STALE, *DEVICE_FAMILIES, *OUTLET_FAMILIES)
+        )
+        self._unsubscribe: dict[DeviceKey, Callable[[], None]] = {}
+        for wattbox in wattboxes:
+            self.add(wattbox)
+
+    def add(self, wattbox: BaseWattBox) -> None:
+        """Export `wattbox`, raising `ValueError` if its host and port are taken."""
+        self.fleet.add(wattbox)
+        key = device_key(wattbox)
+        self._unsubscribe[key] = wattbox.subscribe(
+            lambda change: self._changed(wattbox, change)
+        )
+        self._render_device(wattbox)
+        self.exposition.set(UP, (key, 0), _labels(wattbox), True)
+
+    def remove(self, key: DeviceKey) -> None:
+        if (unsubscribe := self._unsubscribe.pop(key, None)) is not None:
+            unsubscribe()
+        self.fleet.remove(key)
+        self.exposition.remove(key)
+
+    def render(self) -> bytes:
+        return self.exposition.render()
+
+    def _render_device(self, wattbox: BaseWattBox) -> None:
+        labels = _labels(wattbox)
+        for family in DEVICE_FAMILIES:
+            assert family.field is not None
+            value = getattr(wattbox, family.field)
+            if family.ups and not wattbox.has_ups:
+                value = None
+            self.exposition.set(family, (device_key(wattbox), 0), labels, value)
+        for outlet in wattbox.outlets.values():
+            self._render_outlet(wattbox, outlet.index, OUTLET_FAMILIES)
+
+    def _render_outlet(
+        self, wattbox: BaseWattBox, index: int, families: Iterable[Family]
+    ) -> None:
+        outlet = wattbox.outlets[index]
+        labels = (
+            f'{_labels(wattbox)},outlet="{index}",name="{_escape(outlet.name or "")}"'
+        )
+        for family in families:
+            assert family.field is not None
+            self.exposition.set(
+                family,
+                (device_key(wattbox), index),
+                labels,
+                getattr(outlet, family.field),
+            )
+
+    def _changed(self, wattbox: BaseWattBox, change: Change) -> None:
+        if change.outlet is not None:
+            if change.outlet not in wattbox.outlets:
+                return
+            if change.field == "name":
+                # Part of the labels of every series of the outlet.
+                self._render_outlet(wattbox, change.outlet, OUTLET_FAMILIES)
+            elif (family := _OUTLET_BY_FIELD.get(change.field)) is not None:
+                self._render_outlet(wattbox, change.outlet, (family,))
+        elif change.field in ("has_ups", "number_outlets"):
+            # Series may come and go, so render the WattBox from scratch.
+            key = device_key(wattbox)
+            self.exposition.remove(key)
+            self._render_device(wattbox)
+            self.exposition.set(UP, (key, 0), _labels(wattbox), True)
+        elif (family := _DEVICE_BY_FIELD.get(change.field)) is not None:
+            value = change.new if wattbox.has_ups or not family.ups else None
+            self.exposition.set(
+                family, (device_key(wattbox), 0), _labels(wattbox), value
+            )
+
+    async def poll(self) -> dict[DeviceKey, FleetResult]:
+        """Update every WattBox once."""
+        start = time.perf_counter()
+        results = await self.fleet.async_update()
+        for key, result in results.items():
+            if result.wattbox is not None:
+                labels = _labels(result.wattbox)
+                self.exposition.set(UP, (key, 0), labels, result.ok)
+                self.exposition.set(STALE, (key, 0), labels, result.wattbox.stale)
+        logger.debug(
+            "Polled %d WattBoxes in %.3fs", len(results), time.perf_counter() - start
+        )
+        return results
+
+    async def run(self, stop: asyncio.Event | None = None) -> None:
+        """Poll every `interval` seconds until `stop` is set."""
+        stop = stop or asyncio.Event()
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            started = loop.time()
+            await self.poll()
+            try:
+                await asyncio.wait_for(
+                    stop.wait(), max(0.0, started + self.interval - loop.time())
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def async_close(self) -> None:
+        """Close every WattBox."""
+        await self.fleet.async_close()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            try:
+                request_line = await asyncio.wait_for(
+                    _read_request(reader), HEADER_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                logger.debug("Closing a scrape that sent no request in time")
+                return
+            parts = (request_line or b"").decode(errors="replace").split(" ")
+            if request_line is None:
+                status, body = "431 Request Header Fields Too Large", b""
+            elif len(parts) < 2 or parts[0] != "GET":
+                status, body = "405 Method Not Allowed", b""
+            elif parts[1].split("?")[0] in ("/", "/metrics"):
+                status, body = "200 OK", self.render()
+            else:
+                status, body = "404 Not Found", b""
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start_server(self, host: str = "", port: int = 9101) -> asyncio.Server:
+        """Serve the metrics over HTTP at `/metrics`."""
+        return await asyncio.start_server(self._handle, host or None, port)
+
+
+async def _read_request(reader: asyncio.StreamReader) -> bytes | None:
+    """The request line, after reading the headers. None if they are too large."""
+    try:
+        request_line = await reader.readline()
+        size = len(request_line)
+        line = request_line
+        while line not in (b"\r\n", b"\n", b""):
+            if size > MAX_HEADER_BYTES:
+                return None
+            line = await reader.readline()
+            size += len(line)
+    except ValueError:
+        # A single line longer than the limit of the reader.
+        return None
+    return request_line
+
+
+def _labels(wattbox: BaseWattBox) -> str:
+    if wattbox.port is None:
+        return f'host="{_escape(wattbox.host)}"'
+    return f'host="{_escape(wattbox.host)}",port="{wattbox.port}"'
+
+
+async def _create(
+    exporter: WattBoxExporter,
+    devices: Sequence[dict[str, Any]],
+    info_cache: DeviceInfoCache | None,
+) -> None:
+    from .http_wattbox import HttpWattBox
+    from .ip_wattbox import IpWattBox
+
+    async def create(device: dict[str, Any]) -> dict[DeviceKey, FleetResult]:
+        device = dict(device)
+        type_ = IpWattBox if device.pop("type", "http") == "ip" else HttpWattBox
+        config = DeviceConfig(
+            device.pop("host"),
+            device.pop("user"),
+            device.pop("password"),
+            device.pop("port", 22 if type_ is IpWattBox else 80),
+        )
+        # Created in a fleet of its own, as each device has its own options.
+        fleet = WattBoxFleet(timeout=exporter.fleet.timeout)
+        return await fleet.async_create(
+            type_, (config,), info_cache=info_cache, **device
+        )
+
+    semaphore = asyncio.Semaphore(exporter.fleet.concurrency)
+
+    async def limited(device: dict[str, Any]) -> dict[DeviceKey, FleetResult]:
+        async with semaphore:
+            return await create(device)
+
+    for results in await asyncio.gather(*(limited(device) for device in devices)):
+        for (host, port), result in results.items():
+            if not result.ok or result.wattbox is None:
+                logger.warning(
+                    "%s:%s: Not exported, creating failed: %r", host, port, result.error
+                )
+                continue
+            try:
+                exporter.add(result.wattbox)
+            except ValueError:
+                logger.warning("%s:%s: Not exported, listed twice", host, port)
+                await result.wattbox.async_close()
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    with open(args.config) as file:
+        devices = json.load(file)
+    exporter = WattBoxExporter(
+        interval=args.interval, concurrency=args.concurrency, timeout=args.timeout
+    )
+    info_cache = DeviceInfoCache(args.info_cache) if args.info_cache else None
+    try:
+        await _create(exporter, devices, info_cache)
+        server = await exporter.start_server(args.listen, args.port)
+        logger.info("Exporting %d WattBoxes on port %d", len(exporter.fleet), args.port)
+        async with server:
+            await exporter.run()
+    finally:
+        await exporter.async_close()
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Export WattBoxes to Prometheus.")
+    parser.add_argument("--config", required=True, help="JSON list of devices.")
+    parser.add_argument("--listen", default="", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=9101)
+    parser.add_argument("--interval", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--info-cache", help="File to cache device info in.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Awaitable, Callable, Coroutine, Iterable, Mapping
+from concurrent.futures import Future
+from types import TracebackType
+from typing import Any, NamedTuple, TypeVar
+
+from .base import BaseWattBox, Commands, _async_create_wattbox
+
+logger = logging.getLogger("pywattbox.fleet")
+
+# WattBoxes are told apart by host and port, as many may share a host.
+DeviceKey = tuple[str, int | None]
+
+
+def device_key(wattbox: BaseWattBox) -> DeviceKey:
+    return wattbox.host, wattbox.port
+
+
+class DeviceConfig(NamedTuple):
+    host: str
+    user: str
+    password: str
+    port: int
+
+
+class FleetResult(NamedTuple):
+    """Outcome of a single device within a fleet operation.
+
+    `wattbox` is set whenever the device exists, even if the operation failed,
+    so callers can still inspect the last known state.
+    """
+
+    host: str
+    port: int | None
+    wattbox: BaseWattBox | None
+    error: BaseException | None = None
+
+    @property
+    def key(self) -> DeviceKey:
+        return self.host, self.port
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+_Job = tuple[DeviceKey, Callable[[], Awaitable[BaseWattBox]]]
+_R = TypeVar("_R")
+
+
+class WattBoxFleet:
+    """Drive many WattBoxes concurrently.
+
+    Every operation runs against all devices at once, limited by `concurrency`
+    and bounded by `timeout` seconds per device. A device that fails or times
+    out is reported in its `FleetResult` and never holds up the others.
+    Devices and results are keyed by `(host, port)`.
+    """
+
+    def __init__(
+        self,
+        wattboxes: Iterable[BaseWattBox] = (),
+        concurrency: int = 32,
+        timeout: float | None = 10.0,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+        self.concurrency: int = concurrency
+        self.timeout: float | None = timeout
+        self.wattboxes: dict[DeviceKey, BaseWattBox] = {}
+        for wattbox in wattboxes:
+            self.add(wattbox)
+
+    def _check_new(self, key: DeviceKey) -> None:
+        if key in self.wattboxes:
+            raise ValueError(f"{key[0]}:{key[1]} is already in the fleet.")
+
+    def add(self, wattbox: BaseWattBox) -> None:
+        """Add `wattbox`, raising `ValueError` if its host and port are taken."""
+        key = device_key(wattbox)
+        self._check_new(key)
+        self.wattboxes[key] = wattbox
+
+    def remove(self, key: DeviceKey) -> BaseWattBox | None:
+        return self.wattboxes.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self.wattboxes)
+
+    def _select(self, keys: Iterable[DeviceKey] | None) -> list[BaseWattBox]:
+        if keys is None:
+            return list(self.wattboxes.values())
+        return [self.wattboxes[key] for key in keys]
+
+    async def _run(
+        self,
+        semaphore: asyncio.Semaphore,
+        key: DeviceKey,
+        func: Callable[[], Awaitable[BaseWattBox]],
+    ) -> FleetResult:
+        async with semaphore:
+            try:
+                wattbox = await asyncio.wait_for(func(), self.timeout)
+            except Exception as err:
+                logger.debug("%s:%s failed: %r", *key, err)
+                return FleetResult(*key, self.wattboxes.get(key), err)
+        return FleetResult(*key, wattbox)
+
+    async def _gather(self, jobs: Iterable[_Job]) -> dict[DeviceKey, FleetResult]:
+        # Created per call so it is always bound to the running loop.
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self._run(semaphore, key, func) for key, func in jobs)
+        )
+        return {result.key: result for result in results}
+
+    async def async_create(
+        self,
+        type_: type[BaseWattBox],
+        devices: Iterable[DeviceConfig],
+        **kwargs: Any,
+    ) -> dict[DeviceKey, FleetResult]:
+        """Create and initialize each device, adding the ones that succeed.
+
+        `kwargs` are passed to every WattBox, such as `transport` or `metrics`.
+        Raises `ValueError`, before creating any, if a device is listed twice
+        or is already in the fleet.
+        """
+        logger.debug("Async Create")
+        devices = list(devices)
+        keys: set[DeviceKey] = set()
+        for device in devices:
+            key = (device.host, device.port)
+            self._check_new(key)
+            if key in keys:
+                raise ValueError(f"{device.host}:{device.port} is listed twice.")
+            keys.add(key)
+
+        def job(device: DeviceConfig) -> _Job:
+            return (device.host, device.port), lambda: _async_create_wattbox(
+                type_, *device, **kwargs
+            )
+
+        results = await self._gather(job(device) for device in devices)
+        for result in results.values():
+            if result.ok and result.wattbox is not None:
+                self.add(result.wattbox)
+        return results
+
+    async def async_close(self) -> None:
+        """Close every device, concurrently."""
+        logger.debug("Async Close")
+        results = await asyncio.gather(
+            *(wattbox.async_close() for wattbox in self.wattboxes.values()),
+            return_exceptions=True,
+        )
+        for wattbox, result in zip(self.wattboxes.values(), results, strict=True):
+            if isinstance(result, BaseException):
+                logger.debug("%s:%s: Close failed: %r", *device_key(wattbox), result)
+
+    async def async_update(
+        self, keys: Iterable[DeviceKey] | None = None
+    ) -> dict[DeviceKey, FleetResult]:
+        """Update every device, or only those with `keys`, concurrently."""
+        logger.debug("Async Update")
+
+        def job(wattbox: BaseWattBox) -> _Job:
+            async def update() -> BaseWattBox:
+                await wattbox.async_update()
+                return wattbox
+
+            return device_key(wattbox), update
+
+        return await self._gather(job(wattbox) for wattbox in self._select(keys))
+
+
+class SyncWattBoxFleet:
+    """Blocking facade over a `WattBoxFleet` driven by a background loop.
+
+    A single thread runs an event loop for the async drivers, so bulk calls
+    such as `update_all` reach every device concurrently while the caller
+    blocks. Commands return futures. The WattBoxes belong to that loop, so
+    only drive them through this facade, reading their state is fine.
+    """
+
+    def __init__(self, concurrency: int = 32, timeout: float | None = 10.0) -> None:
+        self.fleet: WattBoxFleet = WattBoxFleet(
+            concurrency=concurrency, timeout=timeout
+        )
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self._thread: threading.Thread = threading.Thread(
+            target=self.loop.run_forever, name="pywattbox-fleet", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def wattboxes(self) -> dict[DeviceKey, BaseWattBox]:
+        return self.fleet.wattboxes
+
+    def __len__(self) -> int:
+        return len(self.fleet)
+
+    def submit(self, coro: Coroutine[Any, Any, _R]) -> Future[_R]:
+        """Run `coro` on the background loop."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def create(
+        self,
+        type_: type[BaseWattBox],
+        devices: Iterable[DeviceConfig],
+        **kwargs: Any,
+    ) -> dict[DeviceKey, FleetResult]:
+        """Create and initialize each device, see `WattBoxFleet.async_create`."""
+        return self.submit(self.fleet.async_create(type_, devices, **kwargs)).result()
+
+    def update_all(
+        self, keys: Iterable[DeviceKey] | None = None
+    ) -> dict[DeviceKey, FleetResult]:
+        """Update every device, or only those with `keys`, concurrently."""
+        return self.submit(self.fleet.async_update(keys)).result()
+
+    def send_command(
+        self, key: DeviceKey, outlet: int, command: Commands
+    ) -> Future[None]:
+        wattbox = self.fleet.wattboxes[key]
+        return self.submit(
+            asyncio.wait_for(
+                wattbox.async_send_command(outlet, command), self.fleet.timeout
+            )
+        )
+
+    def send_commands(
+        self, key: DeviceKey, commands: Mapping[int, Commands]
+    ) -> Future[None]:
+        wattbox = self.fleet.wattboxes[key]
+        return self.submit(
+            asyncio.wait_for(wattbox.async_send_commands(commands), self.fleet.timeout)
+        )
+
+    async def _async_close(self) -> None:
+        results = await asyncio.gather(
+            *(wattbox.async_close() for wattbox in self.fleet.wattboxes.values()),
+            return_exceptions=True,
+        )
+        for key, result in zip(self.fleet.wattboxes, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.debug("%s:%s failed to close: %r", *key, result)
+
+    def close(self) -> None:
+        """Close every WattBox, then stop the loop and its thread."""
+        if self.loop.is_closed():
+            return
+        self.submit(self._async_close()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def __enter__(self) -> SyncWattBoxFleet:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
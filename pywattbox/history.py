@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import time
+from array import array
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Final, NamedTuple
+
+if TYPE_CHECKING:
+    from .base import BaseWattBox, Outlet
+
+# Values kept for every column. Column 0 is the WattBox total, like the master
+# switch taking index 0, and each outlet uses its own index.
+METRICS: Final[tuple[str, ...]] = ("power", "current", "voltage")
+
+_NAN: Final[float] = float("nan")
+
+
+def _outlet_value(outlet: Outlet | None, field: str) -> float:
+    value = None if outlet is None else getattr(outlet, field)
+    return _NAN if value is None else float(value)
+
+
+class Tier(NamedTuple):
+    # Width of each bucket in seconds.
+    resolution: float
+    # Number of buckets kept.
+    capacity: int
+
+
+# A minute of buckets for the last day and an hour of buckets for a month.
+DEFAULT_TIERS: Final[tuple[Tier, ...]] = (Tier(60.0, 1440), Tier(3600.0, 744))
+
+
+class Sample(NamedTuple):
+    timestamp: float
+    value: float
+
+
+class Bucket(NamedTuple):
+    start: float
+    min: float
+    max: float
+    mean: float
+
+
+class _Ring:
+    """Fixed size ring of timestamps with a block of values for each."""
+
+    __slots__ = ("capacity", "width", "timestamps", "values", "count", "head")
+
+    def __init__(self, capacity: int, width: int) -> None:
+        self.capacity: int = capacity
+        self.width: int = width
+        self.timestamps: array[float] = array("d", [_NAN]) * capacity
+        self.values: array[float] = array("d", [_NAN]) * (capacity * width)
+        self.count: int = 0
+        # Slot the next entry is written to.
+        self.head: int = 0
+
+    def append(self, timestamp: float, values: Sequence[float]) -> int:
+        """Write a new entry, returning its slot."""
+        slot = self.head
+        self.write(slot, timestamp, values)
+        self.head = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return slot
+
+    def write(self, slot: int, timestamp: float, values: Sequence[float]) -> None:
+        self.timestamps[slot] = timestamp
+        offset = slot * self.width
+        self.values[offset : offset + self.width] = array("d", values)
+
+    def slots(self, since: float | None) -> list[int]:
+        """Slots holding entries, oldest first, at or after `since`."""
+        start = (self.head - self.count) % self.capacity
+        slots = [(start + i) % self.capacity for i in range(self.count)]
+        if since is None:
+            return slots
+        return [slot for slot in slots if self.timestamps[slot] >= since]
+
+
+class _TierBuffer:
+    """A tier of min / max / mean buckets, filled from the raw samples."""
+
+    __slots__ = (
+        "tier",
+        "columns",
+        "ring",
+        "_bucket",
+        "_slot",
+        "_min",
+        "_max",
+        "_sum",
+        "_n",
+    )
+
+    def __init__(self, tier: Tier, columns: int) -> None:
+        self.tier: Tier = tier
+        self.columns: int = columns
+        # Each bucket holds min, max and mean for every metric and column.
+        self.ring: _Ring = _Ring(tier.capacity, 3 * columns)
+        self._bucket: float | None = None
+        # Slot of the current bucket once flushed, updated by later flushes.
+        self._slot: int | None = None
+        self._min: array[float] = array("d", [_NAN]) * columns
+        self._max: array[float] = array("d", [_NAN]) * columns
+        self._sum: array[float] = array("d", [0.0]) * columns
+        self._n: array[int] = array("L", [0]) * columns
+
+    def add(self, timestamp: float, values: Sequence[float]) -> None:
+        bucket = timestamp - timestamp % self.tier.resolution
+        if bucket != self._bucket:
+            self._close()
+            self._bucket = bucket
+        for column, value in enumerate(values):
+            # Skip missing readings, NaN is not equal to itself.
+            if value != value:
+                continue
+            if not self._n[column]:
+                self._min[column] = self._max[column] = value
+            else:
+                self._min[column] = min(self._min[column], value)
+                self._max[column] = max(self._max[column], value)
+            self._sum[column] += value
+            self._n[column] += 1
+
+    def flush(self) -> None:
+        """Write the current bucket, which keeps filling until the next one."""
+        if self._bucket is None:
+            return
+        means = [
+            total / n if n else _NAN
+            for total, n in zip(self._sum, self._n, strict=True)
+        ]
+        values = [*self._min, *self._max, *means]
+        if self._slot is None:
+            self._slot = self.ring.append(self._bucket, values)
+        else:
+            self.ring.write(self._slot, self._bucket, values)
+
+    def _close(self) -> None:
+        self.flush()
+        self._bucket = self._slot = None
+        for column in range(self.columns):
+            self._min[column] = self._max[column] = _NAN
+            self._sum[column] = 0.0
+            self._n[column] = 0
+
+
+class PowerHistory:
+    """Fixed memory history of power readings for a WattBox.
+
+    The last `capacity` raw readings are kept for the total and every outlet,
+    and are also downsampled into the min / max / mean buckets of each tier.
+    All storage is allocated up front.
+    """
+
+    def __init__(
+        self,
+        number_outlets: int,
+        capacity: int = 3600,
+        tiers: Sequence[Tier] = DEFAULT_TIERS,
+    ) -> None:
+        self.outlets: int = number_outlets
+        self.columns: int = len(METRICS) * (number_outlets + 1)
+        self.raw: _Ring = _Ring(capacity, self.columns)
+        self.tiers: dict[float, _TierBuffer] = {
+            tier.resolution: _TierBuffer(tier, self.columns) for tier in tiers
+        }
+
+    def _column(self, metric: str, outlet: int) -> int:
+        if not 0 <= outlet <= self.outlets:
+            raise KeyError(f"Outlet ({outlet}) is not in the history.")
+        return METRICS.index(metric) * (self.outlets + 1) + outlet
+
+    def record(self, timestamp: float, values: Sequence[float]) -> None:
+        """Record one reading, `values` laid out by metric then outlet."""
+        self.raw.append(timestamp, values)
+        for tier in self.tiers.values():
+            tier.add(timestamp, values)
+
+    def record_wattbox(
+        self, wattbox: BaseWattBox, timestamp: float | None = None
+    ) -> None:
+        store = wattbox.outlet_store
+        outlets = range(1, self.outlets + 1)
+        values: list[float] = []
+        for field, total in (
+            ("power_value", wattbox.power_value),
+            ("current_value", wattbox.current_value),
+            ("voltage_value", wattbox.voltage_value),
+        ):
+            row = [float(total)]
+            if store is not None:
+                # Already a column, and NaN where there is no value.
+                row.extend(getattr(store, field)[1 : self.outlets + 1])
+            else:
+                row.extend(
+                    _outlet_value(wattbox.outlets.get(index), field)
+                    for index in outlets
+                )
+            row.extend([_NAN] * (self.outlets + 1 - len(row)))
+            values.extend(row)
+        self.record(time.time() if timestamp is None else timestamp, values)
+
+    def samples(
+        self, outlet: int = 0, metric: str = "power", since: float | None = None
+    ) -> list[Sample]:
+        """Raw readings, oldest first. Outlet 0 is the WattBox total."""
+        column = self._column(metric, outlet)
+        ring = self.raw
+        return [
+            Sample(ring.timestamps[slot], ring.values[slot * ring.width + column])
+            for slot in ring.slots(since)
+        ]
+
+    def buckets(
+        self,
+        resolution: float,
+        outlet: int = 0,
+        metric: str = "power",
+        since: float | None = None,
+    ) -> list[Bucket]:
+        """Buckets of the tier with `resolution`, oldest first.
+
+        These are the completed buckets, and the current one once flushed.
+        """
+        column = self._column(metric, outlet)
+        ring = self.tiers[resolution].ring
+        return [
+            Bucket(
+                ring.timestamps[slot],
+                ring.values[offset + column],
+                ring.values[offset + self.columns + column],
+                ring.values[offset + 2 * self.columns + column],
+            )
+            for slot in ring.slots(since)
+            for offset in (slot * ring.width,)
+        ]
+
+    def flush(self) -> None:
+        """Make the current bucket of every tier queryable.
+
+        It keeps filling, and is updated in place by any later flush.
+        """
+        for tier in self.tiers.values():
+            tier.flush()
@@ -1,183 +1,448 @@
 from __future__ import annotations
 
+import contextvars
 import logging
-
-import httpx
-from bs4 import BeautifulSoup
-
-from .base import BaseWattBox, Commands, Outlet, _async_create_wattbox, _create_wattbox
+import re
+import time
+import warnings
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+from typing import TYPE_CHECKING
+
+from .base import (
+    BaseWattBox,
+    Commands,
+    MissingExtraError,
+    Outlet,
+    UpdateCache,
+    _async_create_wattbox,
+    _create_wattbox,
+    async_guarded,
+    async_publishes_changes,
+    coalesces_updates,
+    guarded,
+    publishes_changes,
+)
+from .cache import DeviceInfo, DeviceInfoCache
+from .metrics import MetricsSink
+from .resilience import ResilienceSettings, request_timeout
+
+try:
+    import httpx
+except ImportError as err:
+    raise MissingExtraError("http", "httpx") from err
+
+if TYPE_CHECKING:
+    import asyncio
 
 logger = logging.getLogger("pywattbox.http")
 
+# The tokens of `wattbox_info.xml`, matched one after another from the start,
+# so the whole document is read in a single scan without building a tree.
+_INFO_TOKEN = re.compile(
+    rb"""
+    (?P<text>[^<]+)
+    |<(?P<leaf>[A-Za-z_][\w.:-]*)(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*\s*>
+        (?P<leaf_text>[^<]*)</(?P=leaf)\s*>
+    |<(?P<close>/)?(?P<tag>[A-Za-z_][\w.:-]*)
+        (?P<attrs>(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*)\s*(?P<empty>/)?>
+    |<!\[CDATA\[(?P<cdata>.*?)\]\]>
+    |<!--.*?-->
+    |<\?.*?\?>
+    |<!DOCTYPE[^>]*>
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+
+
+def parse_info_xml(content: bytes) -> dict[str, str]:
+    """Read `wattbox_info.xml` into a mapping of tag name to text.
+
+    Only the first occurrence of a tag is kept, and its text includes that of
+    any children, as BeautifulSoup gave it. Attributes are ignored and CDATA
+    sections are read as text. Raises `ValueError` if it is not well formed.
+    """
+    info: dict[str, str] = {}
+    texts: list[str] = []
+    # Tag, index into `texts` it starts at and whether it is the first one.
+    open_tags: list[tuple[bytes, int, bool]] = []
+    seen_root = False
+    position = 0
+    length = len(content)
+    while position < length:
+        match = _INFO_TOKEN.match(content, position)
+        if match is None:
+            raise ValueError(f"Invalid wattbox_info.xml at byte {position}.")
+        position = match.end()
+        text, leaf, leaf_text, close, tag, _, empty, cdata = match.groups()
+        if leaf is not None:
+            # The common case, an element with only text in it.
+            if not open_tags:
+                if seen_root:
+                    raise ValueError("More than one root in wattbox_info.xml.")
+                seen_root = True
+            value = leaf_text.decode("utf-8", "replace")
+            if "&" in value:
+                value = unescape(value)
+            texts.append(value)
+            if (key := leaf.decode()) not in info:
+                info[key] = value
+        elif text is not None or cdata is not None:
+            if not open_tags:
+                if cdata is not None or text.strip():
+                    raise ValueError("Text outside the root of wattbox_info.xml.")
+                continue
+            if cdata is not None:
+                texts.append(cdata.decode("utf-8", "replace"))
+            else:
+                value = text.decode("utf-8", "replace")
+                texts.append(unescape(value) if "&" in value else value)
+        elif tag is None:
+            # A comment, processing instruction or doctype.
+            continue
+        elif close is not None:
+            if empty is not None or match.group("attrs"):
+                raise ValueError(f"Invalid closing tag {tag!r} in wattbox_info.xml.")
+            if not open_tags or open_tags[-1][0] != tag:
+                raise ValueError(f"Unexpected closing tag {tag!r} in wattbox_info.xml.")
+            _, start, first = open_tags.pop()
+            if first:
+                info[tag.decode()] = "".join(texts[start:])
+        else:
+            if not open_tags:
+                if seen_root:
+                    raise ValueError("More than one root in wattbox_info.xml.")
+                seen_root = True
+            key = tag.decode()
+            # Reserved now, so the first in document order is kept.
+            first = key not in info
+            if first:
+                info[key] = ""
+            if empty is None:
+                open_tags.append((tag, len(texts), first))
+    if open_tags or not seen_root:
+        raise ValueError("Incomplete wattbox_info.xml.")
+    return info
+
+
+def _info(response: httpx.Response | Mapping[str, str]) -> Mapping[str, str]:
+    if isinstance(response, httpx.Response):
+        return parse_info_xml(response.content)
+    return response
+
+
+def _close_async_client(
+    client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None
+) -> None:
+    """Close `client` from sync code, in the event loop it was made in.
+
+    Its connections belong to that loop, so the close is scheduled while the
+    loop runs and run to completion while it does not. Once the loop is
+    closed they cannot be released cleanly any more.
+    """
+    import asyncio
+
+    if loop is not None and loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        return
+    try:
+        if loop is None or loop.is_closed():
+            asyncio.run(client.aclose())
+        else:
+            loop.run_until_complete(client.aclose())
+    except Exception as err:
+        logger.debug("Closing the async client failed: %r", err)
+
 
 class HttpWattBox(BaseWattBox):
-    def __init__(self, host: str, user: str, password: str, port: int = 80) -> None:
-        super().__init__(host, user, password, port)
+    __slots__ = (
+        "base_host",
+        "command_concurrency",
+        "client",
+        "_async_client",
+        "_async_loop",
+    )
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        port: int = 80,
+        command_concurrency: int = 4,
+        metrics: MetricsSink | None = None,
+        update_cache: UpdateCache | None = None,
+        resilience: ResilienceSettings | None = None,
+    ) -> None:
+        super().__init__(host, user, password, port, metrics, update_cache, resilience)
         self.base_host: str = f"http://{host}:{port}"
+        # Most `control.cgi` requests in flight at once for `send_commands`.
+        self.command_concurrency: int = command_concurrency
 
         # This only supports http, so there is no reason to load the certs.
-        # Create and re-use a single client rather than a new one every request.
-        self.async_client: httpx.AsyncClient = httpx.AsyncClient(verify=False)
+        # Create and re-use a single client of each kind rather than a new one
+        # every request, keeping connections alive between polls.
+        self.client: httpx.Client = httpx.Client(
+            auth=(user, password), verify=False, timeout=self.request_timeout
+        )
+        # Only made once used, so sync use never needs an event loop to close.
+        self._async_client: httpx.AsyncClient | None = None
+        # The event loop the async client was made in, which its connections use.
+        self._async_loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            import asyncio
+
+            try:
+                self._async_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._async_loop = None
+            self._async_client = httpx.AsyncClient(
+                auth=(self.user, self.password),
+                verify=False,
+                timeout=self.request_timeout,
+            )
+        return self._async_client
+
+    # Requests, timed and checked
+    def _get(
+        self, path: str, params: Mapping[str, int] | None = None
+    ) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = self.client.get(
+                f"{self.base_host}/{path}",
+                params=params,
+                timeout=request_timeout(self.request_timeout),
+            )
+        except httpx.HTTPError:
+            self.metrics.error(self.host, path)
+            raise
+        return self._checked(path, response, start)
+
+    async def _async_get(
+        self, path: str, params: Mapping[str, int] | None = None
+    ) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await self.async_client.get(
+                f"{self.base_host}/{path}",
+                params=params,
+                timeout=request_timeout(self.request_timeout),
+            )
+        except httpx.HTTPError:
+            self.metrics.error(self.host, path)
+            raise
+        return self._checked(path, response, start)
+
+    def _checked(
+        self, path: str, response: httpx.Response, start: float
+    ) -> httpx.Response:
+        self.metrics.request(
+            self.host, path, time.perf_counter() - start, len(response.content)
+        )
+        logger.debug(f"    Status: {response.status_code}")
+        if response.is_error:
+            self.metrics.error(self.host, path)
+        response.raise_for_status()
+        return response
+
+    def _parse(self, response: httpx.Response, initial: bool = False) -> None:
+        start = time.perf_counter()
+        info = parse_info_xml(response.content)
+        if initial:
+            self.parse_initial(info)
+        self.parse_update(info)
+        self.metrics.parse(
+            self.host, "initial" if initial else "update", time.perf_counter() - start
+        )
 
     # Get Initial Data
+    @guarded("update_budget")
+    @publishes_changes
     def get_initial(self) -> None:
         logger.debug("Get Initial")
-        response = httpx.get(
-            f"{self.base_host}/wattbox_info.xml",
-            auth=(self.user, self.password),
-        )
-        logger.debug(f"    Status: {response.status_code}")
-        response.raise_for_status()
-        self.parse_initial(response)
-        self.parse_update(response)
+        self._parse(self._get("wattbox_info.xml"), initial=True)
 
+    @async_guarded("update_budget")
+    @async_publishes_changes
     async def async_get_initial(self) -> None:
         logger.debug("Async Get Initial")
-        response = await self.async_client.get(
-            f"{self.base_host}/wattbox_info.xml",
-            auth=(self.user, self.password),
-        )
-        logger.debug(f"    Status: {response.status_code}")
-        response.raise_for_status()
-        self.parse_initial(response)
-        self.parse_update(response)
+        self._parse(await self._async_get("wattbox_info.xml"), initial=True)
 
     # Parse Initial Data
-    def parse_initial(self, response: httpx.Response) -> None:
+    def parse_initial(self, response: httpx.Response | Mapping[str, str]) -> None:
         logger.debug("Parse Initial")
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(response.content, "xml")
-        logger.debug(soup)
+        info = _info(response)
 
         # Set these values once, should never change
-        if soup.hardware_version is not None:
-            self.hardware_version = soup.hardware_version.text
-        if soup.hasUPS is not None:
-            self.has_ups = soup.hasUPS.text == "1"
-        if soup.host_name is not None:
-            self.hostname = soup.host_name.text
-        if soup.serial_number is not None:
-            self.serial_number = soup.serial_number.text
+        if (hardware_version := info.get("hardware_version")) is not None:
+            self._set("hardware_version", hardware_version)
+        if (has_ups := info.get("hasUPS")) is not None:
+            self._set("has_ups", has_ups == "1")
+        if (hostname := info.get("host_name")) is not None:
+            self._set("hostname", hostname)
+        if (serial_number := info.get("serial_number")) is not None:
+            self._set("serial_number", serial_number)
 
         # Some hardware versions have plugs that are always on, so using the
         # hardware version doesn't work well. Just split the outlets.
         # Additional logic shouldn't ever get used, but there just in case
-        if soup.outlet_status is not None:
-            self.number_outlets = len(soup.outlet_status.text.split(","))
+        if (outlet_status := info.get("outlet_status")) is not None:
+            self._set("number_outlets", len(outlet_status.split(",")))
         elif self.hardware_version is not None:
-            self.number_outlets = int(self.hardware_version.split("-")[-1])
+            self._set("number_outlets", int(self.hardware_version.split("-")[-1]))
         else:
-            self.number_outlets = 0
+            self._set("number_outlets", 0)
 
         # Initialize outlets
-        self.outlets = {i: Outlet(i, self) for i in range(1, self.number_outlets + 1)}
+        self.outlets = self._create_outlets()
+        self.master_outlet = MasterSwitch(self)
+
+    def apply_device_info(self, info: DeviceInfo) -> None:
+        super().apply_device_info(info)
         self.master_outlet = MasterSwitch(self)
 
     # Get Update Data
+    @guarded("update_budget")
+    @publishes_changes
     def update(self) -> None:
         logger.debug("Update")
-        response = httpx.get(
-            f"{self.base_host}/wattbox_info.xml",
-            auth=(self.user, self.password),
-        )
-        logger.debug(f"    Status: {response.status_code}")
-        response.raise_for_status()
-        self.parse_update(response)
+        self._parse(self._get("wattbox_info.xml"))
 
+    @coalesces_updates
+    @async_guarded("update_budget")
+    @async_publishes_changes
     async def async_update(self) -> None:
         logger.debug("Async Update")
-        response = await self.async_client.get(
-            f"{self.base_host}/wattbox_info.xml",
-            auth=(self.user, self.password),
-        )
-        logger.debug(f"    Status: {response.status_code}")
-        response.raise_for_status()
-        self.parse_update(response)
+        self._parse(await self._async_get("wattbox_info.xml"))
 
     # Parse Update Data
-    def parse_update(self, response: httpx.Response) -> None:
+    def parse_update(self, response: httpx.Response | Mapping[str, str]) -> None:
         logger.debug("Parse Update")
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(response.content, "xml")
-        logger.debug(soup)
+        info = _info(response)
+        self.verify_device_info(
+            info.get("serial_number"),
+            len(outlet_status.split(","))
+            if (outlet_status := info.get("outlet_status")) is not None
+            else None,
+        )
 
         # Status values
-        if soup.audible_alarm is not None:
-            self.audible_alarm = soup.audible_alarm.text == "1"
-        if soup.auto_reboot is not None:
-            self.auto_reboot = soup.auto_reboot.text == "1"
-        if soup.cloud_status is not None:
-            self.cloud_status = soup.cloud_status.text == "1"
-        if soup.mute is not None:
-            self.mute = soup.mute.text == "1"
-        if soup.power_lost is not None:
-            self.power_lost = soup.power_lost.text == "1"
-        if soup.safe_voltage_status is not None:
-            self.safe_voltage_status = soup.safe_voltage_status.text == "1"
+        if (audible_alarm := info.get("audible_alarm")) is not None:
+            self._set("audible_alarm", audible_alarm == "1")
+        if (auto_reboot := info.get("auto_reboot")) is not None:
+            self._set("auto_reboot", auto_reboot == "1")
+        if (cloud_status := info.get("cloud_status")) is not None:
+            self._set("cloud_status", cloud_status == "1")
+        if (mute := info.get("mute")) is not None:
+            self._set("mute", mute == "1")
+        if (power_lost := info.get("power_lost")) is not None:
+            self._set("power_lost", power_lost == "1")
+        if (safe_voltage_status := info.get("safe_voltage_status")) is not None:
+            self._set("safe_voltage_status", safe_voltage_status == "1")
 
         # Power values
-        if soup.power_value is not None:
-            self.power_value = int(soup.power_value.text)
+        if (power_value := info.get("power_value")) is not None:
+            self._set("power_value", int(power_value))
         # Api returns these two as tenths
-        if soup.current_value is not None:
-            self.current_value = int(soup.current_value.text) / 10
-        if soup.voltage_value is not None:
-            self.voltage_value = int(soup.voltage_value.text) / 10
+        if (current_value := info.get("current_value")) is not None:
+            self._set("current_value", int(current_value) / 10)
+        if (voltage_value := info.get("voltage_value")) is not None:
+            self._set("voltage_value", int(voltage_value) / 10)
+        self._power_fresh = True
 
         # Battery values
         if self.has_ups:
-            if soup.battery_charge is not None:
-                self.battery_charge = int(soup.battery_charge.text)
-            if soup.battery_health is not None:
-                self.battery_health = soup.battery_health.text == "1"
-            if soup.battery_load is not None:
-                self.battery_load = int(soup.battery_load.text)
-            if soup.battery_test is not None:
-                self.battery_test = soup.battery_test.text == "1"
-            if soup.est_run_time is not None:
-                self.est_run_time = int(soup.est_run_time.text)
+            if (battery_charge := info.get("battery_charge")) is not None:
+                self._set("battery_charge", int(battery_charge))
+            if (battery_health := info.get("battery_health")) is not None:
+                self._set("battery_health", battery_health == "1")
+            if (battery_load := info.get("battery_load")) is not None:
+                self._set("battery_load", int(battery_load))
+            if (battery_test := info.get("battery_test")) is not None:
+                self._set("battery_test", battery_test == "1")
+            if (est_run_time := info.get("est_run_time")) is not None:
+                self._set("est_run_time", int(est_run_time))
 
         # Outlets
-        if soup.outlet_method is not None:
-            for i, s in enumerate(soup.outlet_method.text.split(","), start=1):
-                self.outlets[i].method = s == "1"
+        if (outlet_method := info.get("outlet_method")) is not None:
+            for i, s in enumerate(outlet_method.split(","), start=1):
+                self.outlets[i]._set("method", s == "1")
 
-        if soup.outlet_name is not None:
-            for i, s in enumerate(soup.outlet_name.text.split(","), start=1):
-                self.outlets[i].name = s
+        if (outlet_name := info.get("outlet_name")) is not None:
+            for i, s in enumerate(outlet_name.split(","), start=1):
+                self.outlets[i]._set("name", s)
 
-        if soup.outlet_status is not None:
-            for i, s in enumerate(soup.outlet_status.text.split(","), start=1):
-                self.outlets[i].status = s == "1"
+        if (outlet_status := info.get("outlet_status")) is not None:
+            for i, s in enumerate(outlet_status.split(","), start=1):
+                self.outlets[i]._set("status", s == "1")
 
-        # Master switch is on if all those outlets are on
+        self.update_master_status()
+
+    # Master switch is on if all those outlets are on
+    def update_master_status(self) -> None:
         if self.master_outlet is not None:
             # Gather statuses for outlets that have method on
             statuses: list[bool | None] = [
                 outlet.status for outlet in self.outlets.values() if outlet.method
             ]
-            self.master_outlet.status = all(statuses)
+            self.master_outlet._set("status", all(statuses))
 
     # Send command
+    @guarded("command_budget")
     def send_command(self, outlet: int, command: Commands) -> None:
         logger.debug("Send Command")
-        response = httpx.get(
-            f"{self.base_host}/control.cgi",
-            params={"outlet": outlet, "command": command.value},
-            auth=(self.user, self.password),
-        )
-        logger.debug(f"    Status: {response.status_code}")
-        response.raise_for_status()
+        self._get("control.cgi", {"outlet": outlet, "command": command.value})
+        self.invalidate()
 
+    @async_guarded("command_budget")
     async def async_send_command(self, outlet: int, command: Commands) -> None:
         logger.debug("Async Send Command")
-        response = await self.async_client.get(
-            f"{self.base_host}/control.cgi",
-            params={"outlet": outlet, "command": command.value},
-            auth=(self.user, self.password),
+        await self._async_get(
+            "control.cgi", {"outlet": outlet, "command": command.value}
         )
-        logger.debug(f"    Status: {response.status_code}")
-        response.raise_for_status()
+        self.invalidate()
+
+    # Send commands to many outlets at once, then update once.
+    @guarded("command_budget")
+    def send_commands(self, commands: Mapping[int, Commands]) -> None:
+        logger.debug("Send Commands")
+        if not commands:
+            return
+        with ThreadPoolExecutor(
+            max_workers=min(self.command_concurrency, len(commands))
+        ) as executor:
+            # Each in a copy of this context, so they share its deadline.
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, self.send_command, outlet, command
+                )
+                for outlet, command in commands.items()
+            ]
+            # Consume the results so any error is raised here.
+            for future in futures:
+                future.result()
+        self.update()
+
+    @async_guarded("command_budget")
+    async def async_send_commands(self, commands: Mapping[int, Commands]) -> None:
+        logger.debug("Async Send Commands")
+        if not commands:
+            return
+        import asyncio
+
+        semaphore = asyncio.Semaphore(self.command_concurrency)
+
+        async def send(outlet: int, command: Commands) -> None:
+            async with semaphore:
+                await self.async_send_command(outlet, command)
+
+        await asyncio.gather(*(send(*item) for item in commands.items()))
+        await self.async_update()
 
     # Verify command is master eligible
     def check_master_command(self, command: Commands) -> None:
@@ -186,23 +451,38 @@ class HttpWattBox(BaseWattBox):
                 f"Command ({command}) can only be `Commands.ON` or `Commands.OFF`."
             )
 
+    def master_commands(self, command: Commands) -> dict[int, Commands]:
+        self.check_master_command(command)
+        return {
+            outlet.index: command
+            for outlet in self.outlets.values()
+            if outlet.method and outlet.status != command
+        }
+
     # Simulates pressing the master switch.
     # Will send the command to all outlets with master switch enabled.
     def send_master_command(self, command: Commands) -> None:
         logger.debug("Send Master Command(s)")
-        self.check_master_command(command)
-        for outlet in self.outlets.values():
-            if outlet.method and outlet.status != command:
-                self.send_command(outlet.index, command)
-        logger.debug("Send Master Command(s)")
+        self.send_commands(self.master_commands(command))
 
     async def async_send_master_command(self, command: Commands) -> None:
-        logger.debug("Send Master Command(s)")
-        self.check_master_command(command)
-        for outlet in self.outlets.values():
-            if outlet.method and outlet.status != command:
-                await self.async_send_command(outlet.index, command)
-        logger.debug("Send Master Command(s)")
+        logger.debug("Async Send Master Command(s)")
+        await self.async_send_commands(self.master_commands(command))
+
+    # Close the clients
+    def close(self) -> None:
+        logger.debug("Close")
+        self.client.close()
+        if self._async_client is not None:
+            _close_async_client(self._async_client, self._async_loop)
+            self._async_client = self._async_loop = None
+
+    async def async_close(self) -> None:
+        logger.debug("Async Close")
+        self.client.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = self._async_loop = None
 
     # String Representation
     def __str__(self) -> str:
@@ -210,18 +490,52 @@ class HttpWattBox(BaseWattBox):
 
 
 def create_http_wattbox(
-    host: str, user: str, password: str, port: int = 80
+    host: str,
+    user: str,
+    password: str,
+    port: int = 80,
+    command_concurrency: int = 4,
+    metrics: MetricsSink | None = None,
+    update_cache: UpdateCache | None = None,
+    info_cache: DeviceInfoCache | None = None,
+    resilience: ResilienceSettings | None = None,
 ) -> HttpWattBox:
     return _create_wattbox(
-        HttpWattBox, host=host, user=user, password=password, port=port
+        HttpWattBox,
+        host=host,
+        user=user,
+        password=password,
+        port=port,
+        command_concurrency=command_concurrency,
+        metrics=metrics,
+        update_cache=update_cache,
+        info_cache=info_cache,
+        resilience=resilience,
     )
 
 
 async def async_create_http_wattbox(
-    host: str, user: str, password: str, port: int = 80
+    host: str,
+    user: str,
+    password: str,
+    port: int = 80,
+    command_concurrency: int = 4,
+    metrics: MetricsSink | None = None,
+    update_cache: UpdateCache | None = None,
+    info_cache: DeviceInfoCache | None = None,
+    resilience: ResilienceSettings | None = None,
 ) -> HttpWattBox:
     return await _async_create_wattbox(
-        HttpWattBox, host=host, user=user, password=password, port=port
+        HttpWattBox,
+        host=host,
+        user=user,
+        password=password,
+        port=port,
+        command_concurrency=command_concurrency,
+        metrics=metrics,
+        update_cache=update_cache,
+        info_cache=info_cache,
+        resilience=resilience,
     )
 
 
@@ -231,6 +545,8 @@ class MasterSwitch(Outlet):
     Only works with HTTP API.
     """
 
+    __slots__ = ()
+
     # Override to tell it that it only works on WattBox and not BaseWattBox
     wattbox: HttpWattBox
 
@@ -247,5 +563,14 @@ class MasterSwitch(Outlet):
     def turn_off(self) -> None:
         self.wattbox.send_master_command(Commands.OFF)
 
-    async def async_turn_of(self) -> None:
+    async def async_turn_off(self) -> None:
         await self.wattbox.async_send_master_command(Commands.OFF)
+
+    async def async_turn_of(self) -> None:
+        """Deprecated, use `async_turn_off`."""
+        warnings.warn(
+            "async_turn_of is deprecated, use async_turn_off",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        await self.async_turn_off()
@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Final
+
+from .base import (
+    Commands,
+    MissingExtraError,
+    UpdateCache,
+    _async_create_wattbox,
+    _create_wattbox,
+    async_guarded,
+    async_publishes_changes,
+    coalesces_updates,
+    guarded,
+    publishes_changes,
+)
+from .cache import DeviceInfo, DeviceInfoCache
+from .driver.connection import ConnectionSettings
+from .http_wattbox import HttpWattBox
+from .ip_wattbox import CONTROL_MESSAGES, IpWattBox, PowerSampling, Refresh
+from .metrics import MetricsSink
+from .resilience import CircuitBreaker, ResilienceSettings
+
+try:
+    import httpx
+except ImportError as err:
+    raise MissingExtraError("http", "httpx") from err
+
+if TYPE_CHECKING:
+    from scrapli.response import Response
+
+logger = logging.getLogger("pywattbox.hybrid")
+
+# Values copied from the IP WattBox after a full IP update.
+_IP_DEVICE_FIELDS: Final[tuple[str, ...]] = (
+    "auto_reboot",
+    "current_value",
+    "power_value",
+    "voltage_value",
+    "safe_voltage_status",
+    "battery_charge",
+    "battery_load",
+    "battery_health",
+    "power_lost",
+    "est_run_time",
+    "audible_alarm",
+    "mute",
+)
+
+
+class HybridWattBox(HttpWattBox):
+    """HTTP for bulk status and commands, the Integration Protocol for the rest.
+
+    An update is a single `wattbox_info.xml` fetch plus, on models that report
+    it, the per outlet power over IP. Messages only IP has are sent with
+    `send_control`. If HTTP is unavailable updates and commands fall back to
+    IP, and if IP is unavailable only the HTTP values are updated. Each
+    transport has its own `CircuitBreaker`, so one that is down is skipped
+    and only probed now and then. While both are down `CircuitOpenError` is
+    raised.
+    """
+
+    __slots__ = ("ip", "http_breaker", "ip_breaker")
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        port: int = 80,
+        ip_port: int = 22,
+        transport: str | None = None,
+        pipelined: bool = True,
+        command_concurrency: int = 4,
+        metrics: MetricsSink | None = None,
+        update_cache: UpdateCache | None = None,
+        resilience: ResilienceSettings | None = None,
+        connection: ConnectionSettings | None = None,
+        power_sampling: PowerSampling | None = None,
+    ) -> None:
+        super().__init__(
+            host,
+            user,
+            password,
+            port,
+            command_concurrency,
+            metrics,
+            update_cache,
+            resilience,
+        )
+        # Only used for its transport, the values it reads are copied over.
+        self.ip: IpWattBox = IpWattBox(
+            host,
+            user,
+            password,
+            ip_port,
+            transport,
+            pipelined,
+            command_refresh=Refresh.NONE,
+            metrics=self.metrics,
+            connection=connection,
+            resilience=resilience,
+            power_sampling=power_sampling,
+        )
+        # Whether each transport is up, whatever `resilience` is.
+        settings = resilience or ResilienceSettings()
+        self.http_breaker: CircuitBreaker = CircuitBreaker(host, settings)
+        self.ip_breaker: CircuitBreaker = CircuitBreaker(host, settings)
+
+    def _http_fallback(self, err: httpx.HTTPError) -> None:
+        logger.debug("%s: HTTP failed, falling back to IP: %r", self.host, err)
+
+    # Copy what the IP WattBox read
+    def _copy_outlet_power(self) -> None:
+        for index, outlet in self.outlets.items():
+            if (source := self.ip.outlets.get(index)) is not None:
+                outlet._set("power_value", source.power_value)
+                outlet._set("current_value", source.current_value)
+                outlet._set("voltage_value", source.voltage_value)
+                outlet.power_read_at = source.power_read_at
+
+    def _share_statuses(self) -> None:
+        """Give the IP WattBox the statuses read over HTTP, which it samples by."""
+        for index, outlet in self.outlets.items():
+            if (target := self.ip.outlets.get(index)) is not None:
+                target.status = outlet.status
+
+    def _copy_from_ip(self) -> None:
+        for field in _IP_DEVICE_FIELDS:
+            self._set(field, getattr(self.ip, field))
+        self._power_fresh = True
+        for index, outlet in self.outlets.items():
+            if (source := self.ip.outlets.get(index)) is not None:
+                outlet._set("name", source.name)
+                outlet._set("status", source.status)
+        self._copy_outlet_power()
+        self.update_master_status()
+
+    def apply_device_info(self, info: DeviceInfo) -> None:
+        super().apply_device_info(info)
+        self.ip.apply_device_info(info)
+
+    def _initial_from_ip(self) -> None:
+        self.apply_device_info(self.ip.device_info())
+        # Read from the WattBox just now, so nothing to verify.
+        self._unverified_info = False
+        self._copy_from_ip()
+
+    # Get Initial Data
+    @guarded("update_budget")
+    @publishes_changes
+    def get_initial(self) -> None:
+        logger.debug("Get Initial")
+        if self.http_breaker.available:
+            try:
+                with self.http_breaker.attempt():
+                    response = self._get("wattbox_info.xml")
+            except httpx.HTTPError as err:
+                self._http_fallback(err)
+            else:
+                self._parse(response, initial=True)
+                self.ip.apply_device_info(self.device_info())
+                return
+        with self.ip_breaker.attempt():
+            self.ip.get_initial()
+            self.ip.update()
+        self._initial_from_ip()
+
+    @async_guarded("update_budget")
+    @async_publishes_changes
+    async def async_get_initial(self) -> None:
+        logger.debug("Async Get Initial")
+        if self.http_breaker.available:
+            try:
+                with self.http_breaker.attempt():
+                    response = await self._async_get("wattbox_info.xml")
+            except httpx.HTTPError as err:
+                self._http_fallback(err)
+            else:
+                self._parse(response, initial=True)
+                self.ip.apply_device_info(self.device_info())
+                return
+        with self.ip_breaker.attempt():
+            await self.ip.async_get_initial()
+            await self.ip.async_update()
+        self._initial_from_ip()
+
+    # Get Update Data
+    def _outlet_power(self) -> bool:
+        """Read the per outlet power over IP, if the model and IP allow it."""
+        if not self.ip.outlet_power_status or not self.ip_breaker.available:
+            return False
+        self._share_statuses()
+        try:
+            with self.ip_breaker.attempt():
+                requests = self.ip.outlet_power_requests
+                self.ip.parse_outlet_power_statuses(self.ip.send_requests(requests))
+        except Exception as err:
+            logger.debug("%s: IP failed: %r", self.host, err)
+            return False
+        return True
+
+    @guarded("update_budget")
+    @publishes_changes
+    def update(self) -> None:
+        logger.debug("Update")
+        if self.http_breaker.available:
+            try:
+                with self.http_breaker.attempt():
+                    response = self._get("wattbox_info.xml")
+            except httpx.HTTPError as err:
+                self._http_fallback(err)
+            else:
+                self._parse(response)
+                if self._outlet_power():
+                    self._copy_outlet_power()
+                return
+        with self.ip_breaker.attempt():
+            self.ip.update()
+        self._copy_from_ip()
+
+    async def _async_http_info(self) -> httpx.Response | None:
+        if not self.http_breaker.available:
+            return None
+        try:
+            with self.http_breaker.attempt():
+                return await self._async_get("wattbox_info.xml")
+        except httpx.HTTPError as err:
+            self._http_fallback(err)
+            return None
+
+    async def _async_outlet_power(self) -> bool:
+        if not self.ip.outlet_power_status or not self.ip_breaker.available:
+            return False
+        # Read at once with `wattbox_info.xml`, so by the last update's statuses.
+        self._share_statuses()
+        try:
+            with self.ip_breaker.attempt():
+                requests = self.ip.outlet_power_requests
+                self.ip.parse_outlet_power_statuses(
+                    await self.ip.async_send_requests(requests)
+                )
+        except Exception as err:
+            logger.debug("%s: IP failed: %r", self.host, err)
+            return False
+        return True
+
+    @coalesces_updates
+    @async_guarded("update_budget")
+    @async_publishes_changes
+    async def async_update(self) -> None:
+        logger.debug("Async Update")
+        # Both transports at once, so the update costs a single round trip.
+        response, outlet_power = await asyncio.gather(
+            self._async_http_info(), self._async_outlet_power()
+        )
+        if response is not None:
+            self._parse(response)
+            if outlet_power:
+                self._copy_outlet_power()
+            return
+        with self.ip_breaker.attempt():
+            await self.ip.async_update()
+        self._copy_from_ip()
+
+    # Send command
+    def _ip_command_message(self, outlet: int, command: Commands) -> str:
+        if command in (Commands.AUTO_REBOOT_ON, Commands.AUTO_REBOOT_OFF):
+            return CONTROL_MESSAGES.AUTO_REBOOT.value.format(
+                state=int(command is Commands.AUTO_REBOOT_ON)
+            )
+        return CONTROL_MESSAGES.OUTLET_SET.value.format(
+            outlet=outlet, action=command.name, delay=0
+        )
+
+    @guarded("command_budget")
+    def send_command(self, outlet: int, command: Commands) -> None:
+        logger.debug("Send Command")
+        if self.http_breaker.available:
+            try:
+                with self.http_breaker.attempt():
+                    super().send_command(outlet, command)
+            except httpx.HTTPError as err:
+                self._http_fallback(err)
+            else:
+                return
+        with self.ip_breaker.attempt():
+            self.ip.driver._send_command(self._ip_command_message(outlet, command))
+        self.invalidate()
+
+    @async_guarded("command_budget")
+    async def async_send_command(self, outlet: int, command: Commands) -> None:
+        logger.debug("Async Send Command")
+        if self.http_breaker.available:
+            try:
+                with self.http_breaker.attempt():
+                    await super().async_send_command(outlet, command)
+            except httpx.HTTPError as err:
+                self._http_fallback(err)
+            else:
+                return
+        with self.ip_breaker.attempt():
+            await self.ip.async_driver._send_command(
+                self._ip_command_message(outlet, command)
+            )
+        self.invalidate()
+
+    # Messages only the Integration Protocol has, e.g. `CONTROL_MESSAGES.REBOOT`.
+    @guarded("command_budget")
+    def send_control(self, message: CONTROL_MESSAGES, **fields: Any) -> Response:
+        logger.debug("Send Control: %s", message)
+        with self.ip_breaker.attempt():
+            response = self.ip.driver._send_command(message.value.format(**fields))
+        self.invalidate()
+        return response
+
+    @async_guarded("command_budget")
+    async def async_send_control(
+        self, message: CONTROL_MESSAGES, **fields: Any
+    ) -> Response:
+        logger.debug("Async Send Control: %s", message)
+        with self.ip_breaker.attempt():
+            response = await self.ip.async_driver._send_command(
+                message.value.format(**fields)
+            )
+        self.invalidate()
+        return response
+
+    # Close both transports
+    def close(self) -> None:
+        super().close()
+        self.ip.close()
+
+    async def async_close(self) -> None:
+        await super().async_close()
+        await self.ip.async_close()
+
+
+def create_hybrid_wattbox(
+    host: str,
+    user: str,
+    password: str,
+    port: int = 80,
+    ip_port: int = 22,
+    transport: str | None = None,
+    pipelined: bool = True,
+    command_concurrency: int = 4,
+    metrics: MetricsSink | None = None,
+    update_cache: UpdateCache | None = None,
+    info_cache: DeviceInfoCache | None = None,
+    resilience: ResilienceSettings | None = None,
+    connection: ConnectionSettings | None = None,
+    power_sampling: PowerSampling | None = None,
+) -> HybridWattBox:
+    return _create_wattbox(
+        HybridWattBox,
+        host=host,
+        user=user,
+        password=password,
+        port=port,
+        ip_port=ip_port,
+        transport=transport,
+        pipelined=pipelined,
+        command_concurrency=command_concurrency,
+        metrics=metrics,
+        update_cache=update_cache,
+        info_cache=info_cache,
+        resilience=resilience,
+        connection=connection,
+        power_sampling=power_sampling,
+    )
+
+
+async def async_create_hybrid_wattbox(
+    host: str,
+    user: str,
+    password: str,
+    port: int = 80,
+    ip_port: int = 22,
+    transport: str | None = None,
+    pipelined: bool = True,
+    command_concurrency: int = 4,
+    metrics: MetricsSink | None = None,
+    update_cache: UpdateCache | None = None,
+    info_cache: DeviceInfoCache | None = None,
+    resilience: ResilienceSettings | None = None,
+    connection: ConnectionSettings | None = None,
+    power_sampling: PowerSampling | None = None,
+) -> HybridWattBox:
+    return await _async_create_wattbox(
+        HybridWattBox,
+        host=host,
+        user=user,
+        password=password,
+        port=port,
+        ip_port=ip_port,
+        transport=transport,
+        pipelined=pipelined,
+        command_concurrency=command_concurrency,
+        metrics=metrics,
+        update_cache=update_cache,
+        info_cache=info_cache,
+        resilience=resilience,
+        connection=connection,
+        power_sampling=power_sampling,
+    )
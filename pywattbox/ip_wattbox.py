@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+import heapq
 import logging
-from collections.abc import Iterable
+import time
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Collection,
+    Iterable,
+    Mapping,
+    Sequence,
+)
 from enum import Enum
 from typing import (
+    TYPE_CHECKING,
     Any,
     Final,
     NamedTuple,
@@ -11,12 +21,34 @@ from typing import (
     Union,
 )
 
-from scrapli.exceptions import ScrapliTransportPluginError
-from scrapli.response import Response
+from .base import (
+    BaseWattBox,
+    Commands,
+    MissingExtraError,
+    Outlet,
+    UpdateCache,
+    UpdateCategory,
+    _async_create_wattbox,
+    _create_wattbox,
+    async_guarded,
+    async_publishes_changes,
+    coalesces_updates,
+    guarded,
+    publishes_changes,
+)
+from .cache import DeviceInfo, DeviceInfoCache, StaleDeviceInfoError
+from .driver.connection import ConnectionManager, ConnectionSettings, backoff_delay
+from .metrics import MetricsSink
+from .resilience import ResilienceSettings
+
+# The drivers, and scrapli with them, are only imported once they are needed.
+if TYPE_CHECKING:
+    import asyncio
+
+    from scrapli.response import Response
 
-from .base import BaseWattBox, Commands, Outlet, _async_create_wattbox, _create_wattbox
-from .driver.async_driver import WattBoxAsyncDriver
-from .driver.sync_driver import WattBoxDriver
+    from .driver.async_driver import WattBoxAsyncDriver
+    from .driver.sync_driver import WattBoxDriver
 
 logger = logging.getLogger("pywattbox.ip")
 
@@ -94,14 +126,117 @@ class UpdateBaseResponses(NamedTuple):
     outlet_status: Response
 
 
+# Requests needed for each category, per outlet power is added separately.
+CATEGORY_REQUESTS: Final[dict[UpdateCategory, tuple[REQUEST_MESSAGES, ...]]] = {
+    UpdateCategory.POWER: (REQUEST_MESSAGES.POWER_STATUS,),
+    UpdateCategory.STATUS: (
+        REQUEST_MESSAGES.AUTO_REBOOT,
+        REQUEST_MESSAGES.OUTLET_STATUS,
+    ),
+    UpdateCategory.NAMES: (REQUEST_MESSAGES.OUTLET_NAME,),
+    UpdateCategory.UPS: (REQUEST_MESSAGES.UPS_STATUS,),
+}
+
 _Responses = TypeVar("_Responses", bound=Union[InitialResponses, UpdateBaseResponses])
 
 
+class Refresh(Enum):
+    """What to re-read from the WattBox after a command."""
+
+    # A complete `update`.
+    FULL = "full"
+    # Only what a command can change: outlet status, total power and the
+    # power of the commanded outlet(s).
+    TARGETED = "targeted"
+    # Remember the outlet(s) and refresh them on the next `refresh` call.
+    DEFERRED = "deferred"
+    NONE = "none"
+
+
+class WattBoxEvent(NamedTuple):
+    """A state change pushed by the WattBox, e.g. `~OutletStatus=1,0,1`.
+
+    A full reconciliation poll is reported with the message `RECONCILE` and an
+    empty result.
+    """
+
+    message: str
+    result: str
+
+
+RECONCILE: Final[str] = "Reconcile"
+
+
+class PowerSampling(NamedTuple):
+    """Which outlets to read the power of on each update.
+
+    The defaults read every outlet on every update. Outlets not read keep
+    their last values, see `Outlet.power_read_at` for how fresh they are.
+    """
+
+    # Outlets read on every update, whatever else is set.
+    priority: frozenset[int] = frozenset()
+    # Most of the other outlets read per update, those read longest ago first,
+    # so they are all read in turn. None to read all of them.
+    per_update: int | None = None
+    # Seconds between reads of an outlet that is off, None to never read one.
+    off_interval: float | None = 0.0
+
+
+def _read_at(outlet: Outlet) -> float:
+    read_at = outlet.power_read_at
+    return float("-inf") if read_at is None else read_at
+
+
 class DriverUnavailableError(Exception):
     pass
 
 
+# Extra that installs each scrapli transport plugin.
+_TRANSPORT_EXTRAS: Final[dict[str, str]] = {"ssh2": "ssh2", "asyncssh": "ip"}
+
+
+def _driver_unavailable(transport: str) -> DriverUnavailableError:
+    extra = _TRANSPORT_EXTRAS.get(transport, "ip")
+    return DriverUnavailableError(
+        f"The `{transport}` transport is not available, install it with the"
+        f" `{extra}` extra: `pip install pywattbox[{extra}]`"
+    )
+
+
+def _has_outlet_power(hardware_version: str | None) -> bool:
+    """Whether the model reports per outlet power, the 150 and 250 do not."""
+    return hardware_version is not None and not (
+        "150" in hardware_version or "250" in hardware_version
+    )
+
+
+def _result(response: Response | str) -> str:
+    return response if isinstance(response, str) else response.result
+
+
+def _request_values(requests: Iterable[REQUEST_MESSAGES | str]) -> list[str]:
+    return [
+        request.value if isinstance(request, REQUEST_MESSAGES) else request
+        for request in requests
+    ]
+
+
 class IpWattBox(BaseWattBox):
+    __slots__ = (
+        "pipelined",
+        "command_refresh",
+        "pending_refresh",
+        "outlet_power_status",
+        "power_sampling",
+        "connection",
+        "async_connection",
+        "_driver",
+        "_async_driver",
+        "_conninfo",
+        "_transport",
+    )
+
     def __init__(
         self,
         host: str,
@@ -109,12 +244,32 @@ class IpWattBox(BaseWattBox):
         password: str,
         port: int = 22,
         transport: str | None = None,
+        pipelined: bool = False,
+        command_refresh: Refresh = Refresh.FULL,
+        metrics: MetricsSink | None = None,
+        connection: ConnectionSettings | None = None,
+        update_cache: UpdateCache | None = None,
+        resilience: ResilienceSettings | None = None,
+        power_sampling: PowerSampling | None = None,
     ) -> None:
-        super().__init__(host, user, password, port)
+        super().__init__(host, user, password, port, metrics, update_cache, resilience)
+
+        # Write each batch of requests at once rather than one round trip each.
+        self.pipelined: bool = pipelined
+        # Default refresh after `send_command`, can be overridden per command.
+        self.command_refresh: Refresh = command_refresh
+        # Outlets commanded with `Refresh.DEFERRED` and not yet refreshed.
+        self.pending_refresh: set[int] = set()
 
         self.battery_test = None
         self.cloud_status = None
         self.outlet_power_status: bool = False
+        # Which outlets to read the power of on each update.
+        self.power_sampling: PowerSampling = power_sampling or PowerSampling()
+
+        # State, keepalive, idle close and backoff of the session of each driver.
+        self.connection: ConnectionManager = ConnectionManager(host, connection)
+        self.async_connection: ConnectionManager = ConnectionManager(host, connection)
 
         self._driver: WattBoxDriver | None = None
         self._async_driver: WattBoxAsyncDriver | None = None
@@ -124,6 +279,9 @@ class IpWattBox(BaseWattBox):
             "auth_username": user,
             "auth_password": password,
             "port": port,
+            "timeout_socket": self.request_timeout,
+            "timeout_transport": self.request_timeout,
+            "timeout_ops": self.request_timeout,
         }
 
         if transport is None:
@@ -138,30 +296,50 @@ class IpWattBox(BaseWattBox):
     @property
     def driver(self) -> WattBoxDriver:
         if not self._driver:
+            try:
+                from scrapli.exceptions import ScrapliTransportPluginError
+            except ImportError as err:
+                raise MissingExtraError("ip", "scrapli") from err
+            from .driver.sync_driver import WattBoxDriver
+
+            transport = "ssh2" if self._transport == "ssh" else "telnet"
             try:
                 self._driver = WattBoxDriver(
                     **self._conninfo,
-                    transport="ssh2" if self._transport == "ssh" else "telnet",
+                    transport=transport,
+                    metrics=self.metrics,
+                    connection=self.connection,
                 )
             except ScrapliTransportPluginError as err:
-                raise DriverUnavailableError from err
+                raise _driver_unavailable(transport) from err
         return self._driver
 
     @property
     def async_driver(self) -> WattBoxAsyncDriver:
         if not self._async_driver:
+            try:
+                from scrapli.exceptions import ScrapliTransportPluginError
+            except ImportError as err:
+                raise MissingExtraError("ip", "scrapli") from err
+            from .driver.async_driver import WattBoxAsyncDriver
+
+            transport = "asyncssh" if self._transport == "ssh" else "asynctelnet"
             try:
                 self._async_driver = WattBoxAsyncDriver(
                     **self._conninfo,
-                    transport="asyncssh" if self._transport == "ssh" else "asynctelnet",
+                    transport=transport,
+                    metrics=self.metrics,
+                    connection=self.async_connection,
                 )
             except ScrapliTransportPluginError as err:
-                raise DriverUnavailableError from err
+                raise _driver_unavailable(transport) from err
         return self._async_driver
 
     def send_requests(
         self, requests: Iterable[REQUEST_MESSAGES | str]
     ) -> list[Response]:
+        if self.pipelined:
+            return self.driver._send_commands(_request_values(requests))
         responses: list[Response] = []
         for request in requests:
             responses.append(
@@ -174,6 +352,8 @@ class IpWattBox(BaseWattBox):
     async def async_send_requests(
         self, requests: Iterable[REQUEST_MESSAGES | str]
     ) -> list[Response]:
+        if self.pipelined:
+            return await self.async_driver._send_commands(_request_values(requests))
         responses: list[Response] = []
         for request in requests:
             responses.append(
@@ -186,24 +366,32 @@ class IpWattBox(BaseWattBox):
     def parse_initial(self, responses: InitialResponses) -> None:
         logger.debug("Parse Initial")
         # TODO: Add if failed logic?
-        self.hardware_version = responses.hardware_version.result
-        if "150" not in self.hardware_version and "250" not in self.hardware_version:
-            self.outlet_power_status = True
-        self.firmware_version = responses.firmware_version.result
-        self.has_ups = responses.has_ups.result == "1"
-        self.hostname = responses.hostname.result
-        self.serial_number = responses.serial_number.result
-        self.number_outlets = (
-            int(count) if (count := responses.number_outlets.result) else 0
+        self._set("hardware_version", responses.hardware_version.result)
+        self.outlet_power_status = _has_outlet_power(self.hardware_version)
+        self._set("firmware_version", responses.firmware_version.result)
+        self._set("has_ups", responses.has_ups.result == "1")
+        self._set("hostname", responses.hostname.result)
+        self._set("serial_number", responses.serial_number.result)
+        self._set(
+            "number_outlets",
+            (int(count) if (count := responses.number_outlets.result) else 0),
         )
         # The index for outlet within WattBox starts at 1.
-        self.outlets = {i: Outlet(i, self) for i in range(1, self.number_outlets + 1)}
+        self.outlets = self._create_outlets()
+
+    def apply_device_info(self, info: DeviceInfo) -> None:
+        super().apply_device_info(info)
+        self.outlet_power_status = _has_outlet_power(info.hardware_version)
 
+    @guarded("update_budget")
+    @publishes_changes
     def get_initial(self) -> None:
         logger.debug("Get Initial")
         responses = InitialResponses(*self.send_requests(INITIAL_REQUESTS))
         self.parse_initial(responses)
 
+    @async_guarded("update_budget")
+    @async_publishes_changes
     async def async_get_initial(self) -> None:
         logger.debug("Async Get Initial")
         responses = InitialResponses(
@@ -214,78 +402,310 @@ class IpWattBox(BaseWattBox):
 
     def parse_update_base(self, responses: UpdateBaseResponses) -> None:
         logger.debug("Parse Update Base")
-        # auto reboot
-        self.auto_reboot = responses.auto_reboot.result == "1"
-        # power status
-        power_status = responses.power_status.result.split(",")
-        self.current_value = float(power_status[0])
-        self.power_value = float(power_status[1])
-        self.voltage_value = float(power_status[2])
+        self.parse_auto_reboot(responses.auto_reboot)
+        self.parse_power_status(responses.power_status)
+        self.parse_outlet_name(responses.outlet_name)
+        self.parse_outlet_status(responses.outlet_status)
+
+    def parse_auto_reboot(self, response: Response | str) -> None:
+        self._set("auto_reboot", _result(response) == "1")
+
+    def parse_power_status(self, response: Response | str) -> None:
+        power_status = _result(response).split(",")
+        self._set("current_value", float(power_status[0]))
+        self._set("power_value", float(power_status[1]))
+        self._set("voltage_value", float(power_status[2]))
         # The light is green and shows as green in the web UI, but strangely
         # the value is "0" in this API call.
-        self.safe_voltage_status = power_status[3] == "0"
-        # outlet_name
-        for i, s in enumerate(responses.outlet_name.result.split(","), start=1):
-            self.outlets[i].name = s.lstrip("{").rstrip("}")
-        # outlet_status
-        for i, s in enumerate(responses.outlet_status.result.split(","), start=1):
-            self.outlets[i].status = s == "1"
-
-    def parse_ups_status(self, response: Response) -> None:
+        self._set("safe_voltage_status", power_status[3] == "0")
+        self._power_fresh = True
+
+    def parse_outlet_name(self, response: Response | str) -> None:
+        for i, s in enumerate(_result(response).split(","), start=1):
+            self.outlets[i]._set("name", s.lstrip("{").rstrip("}"))
+
+    def parse_outlet_status(self, response: Response | str) -> None:
+        for i, s in enumerate(_result(response).split(","), start=1):
+            self.outlets[i]._set("status", s == "1")
+
+    def parse_ups_status(self, response: Response | str) -> None:
         logger.debug("Parse UPS Status")
-        ups_status = response.result.split(",")
-        self.battery_charge = int(ups_status[0])
-        self.battery_load = int(ups_status[1])
-        self.battery_health = ups_status[2] == "Good"
-        self.power_lost = ups_status[3] == "True"
-        self.est_run_time = int(ups_status[4])
-        self.audible_alarm = ups_status[5] == "True"
-        self.mute = ups_status[6] == "True"
-
-    def parse_outlet_power_statuses(self, responses: Iterable[Response]) -> None:
+        ups_status = _result(response).split(",")
+        self._set("battery_charge", int(ups_status[0]))
+        self._set("battery_load", int(ups_status[1]))
+        self._set("battery_health", ups_status[2] == "Good")
+        self._set("power_lost", ups_status[3] == "True")
+        self._set("est_run_time", int(ups_status[4]))
+        self._set("audible_alarm", ups_status[5] == "True")
+        self._set("mute", ups_status[6] == "True")
+
+    def parse_ups_connection(self, response: Response | str) -> None:
+        self._set("has_ups", _result(response) == "1")
+
+    def parse_outlet_power_status(self, response: Response | str) -> None:
+        index, power, current, voltage = _result(response).split(",")
+        outlet = self.outlets[int(index)]
+        outlet._set("power_value", float(power))
+        outlet._set("current_value", float(current))
+        outlet._set("voltage_value", float(voltage))
+        outlet.power_read_at = time.monotonic()
+        self._power_fresh = True
+
+    def parse_outlet_power_statuses(self, responses: Iterable[Response | str]) -> None:
         logger.debug("Parse Outlet Statuses")
         for response in responses:
-            index, power, current, voltage = response.result.split(",")
-            # The index in the python list is off by 1 from the WattBox index.
-            outlet = self.outlets[int(index)]
-            outlet.power_value = float(power)
-            outlet.current_value = float(current)
-            outlet.voltage_value = float(voltage)
+            self.parse_outlet_power_status(response)
+
+    def parse_message(self, message: str, result: str) -> bool:
+        """Apply the result of a message, by name, to the state.
+
+        `message` is the bare name shared by `?` requests and unsolicited `~`
+        notifications, e.g. `OutletStatus`. Returns False if it is not a
+        message that carries state.
+        """
+        parser = _MESSAGE_PARSERS.get(message)
+        if parser is None:
+            return False
+        parser(self, result)
+        return True
+
+    def sampled_outlets(self) -> list[int]:
+        """Indexes of the outlets to read the power of, by `power_sampling`."""
+        sampling = self.power_sampling
+        off_before = (
+            None
+            if sampling.off_interval is None
+            else time.monotonic() - sampling.off_interval
+        )
+        sampled: list[int] = []
+        others: list[Outlet] = []
+        for outlet in self.outlets.values():
+            if outlet.index in sampling.priority:
+                sampled.append(outlet.index)
+            elif outlet.status is False and (
+                off_before is None or _read_at(outlet) > off_before
+            ):
+                continue
+            else:
+                others.append(outlet)
+        if sampling.per_update is not None and len(others) > sampling.per_update:
+            others = heapq.nsmallest(sampling.per_update, others, key=_read_at)
+        sampled.extend(outlet.index for outlet in others)
+        return sorted(sampled)
+
+    @property
+    def outlet_power_requests(self) -> tuple[str, ...]:
+        if not self.outlet_power_status:
+            return ()
+        return tuple(
+            REQUEST_MESSAGES.OUTLET_POWER_STATUS.value.format(outlet=index)
+            for index in self.sampled_outlets()
+        )
 
     @property
     def update_requests(self) -> tuple[REQUEST_MESSAGES | str, ...]:
         return (
             *UPDATE_BASE_REQUESTS,
             REQUEST_MESSAGES.UPS_STATUS,
+            *self.outlet_power_requests,
+            # Only to check the serial number of cached info.
+            *((REQUEST_MESSAGES.SERVICE_TAG,) if self._unverified_info else ()),
+        )
+
+    def category_requests(
+        self, categories: Collection[UpdateCategory]
+    ) -> tuple[str, ...]:
+        return (
             *(
-                (
-                    REQUEST_MESSAGES.OUTLET_POWER_STATUS.value.format(
-                        outlet=(outlet.index)
-                    )
-                    for outlet in self.outlets.values()
-                )
-                if self.outlet_power_status
-                else ()
+                request.value
+                for category, requests in CATEGORY_REQUESTS.items()
+                if category in categories
+                for request in requests
             ),
+            *(self.outlet_power_requests if UpdateCategory.POWER in categories else ()),
         )
 
-    def update(self) -> None:
-        logger.debug("Update")
-        responses = self.send_requests(self.update_requests)
+    @guarded("update_budget")
+    @publishes_changes
+    def update_categories(self, categories: Collection[UpdateCategory]) -> None:
+        logger.debug("Update Categories: %s", categories)
+        if requests := self.category_requests(categories):
+            self.parse_responses(requests, self.send_requests(requests))
+
+    @async_guarded("update_budget")
+    @async_publishes_changes
+    async def async_update_categories(
+        self, categories: Collection[UpdateCategory]
+    ) -> None:
+        logger.debug("Async Update Categories: %s", categories)
+        if requests := self.category_requests(categories):
+            self.parse_responses(requests, await self.async_send_requests(requests))
+
+    def parse_update(self, responses: Sequence[Response]) -> None:
+        """Parse the responses to `update_requests`."""
+        start = time.perf_counter()
+        if self._unverified_info:
+            *update, service_tag = responses
+            outlet_status = UpdateBaseResponses(*update[0:4]).outlet_status
+            self.verify_device_info(
+                _result(service_tag), len(_result(outlet_status).split(","))
+            )
+            try:
+                self._parse_update(update)
+            except Exception as err:
+                # Requests the cached model answers but this one does not.
+                raise StaleDeviceInfoError(
+                    self.host, "hardware_version", self.hardware_version, err
+                ) from err
+        else:
+            self._parse_update(responses)
+        self.metrics.parse(self.host, "update", time.perf_counter() - start)
+
+    def _parse_update(self, responses: Sequence[Response]) -> None:
         self.parse_update_base(UpdateBaseResponses(*responses[0:4]))
         self.parse_ups_status(responses[4])
         if self.outlet_power_status:
             self.parse_outlet_power_statuses(responses[5:])
 
+    @guarded("update_budget")
+    @publishes_changes
+    def update(self) -> None:
+        logger.debug("Update")
+        self.parse_update(self.send_requests(self.update_requests))
+
+    @coalesces_updates
+    @async_guarded("update_budget")
+    @async_publishes_changes
     async def async_update(self) -> None:
         logger.debug("Async Update")
-        responses = await self.async_send_requests(self.update_requests)
-        self.parse_update_base(UpdateBaseResponses(*responses[0:4]))
-        self.parse_ups_status(responses[4])
-        if self.outlet_power_status:
-            self.parse_outlet_power_statuses(responses[5:])
+        self.parse_update(await self.async_send_requests(self.update_requests))
 
-    def send_command(self, outlet: int, command: Commands) -> None:
+    async def async_listen(
+        self,
+        reconcile_interval: float | None = 300.0,
+        read_timeout: float = 0.25,
+    ) -> AsyncIterator[WattBoxEvent]:
+        """Apply and yield unsolicited status changes as they arrive.
+
+        Keeps the session open and waits for `~` notifications, applying each
+        one to the state before it is yielded. Every `reconcile_interval`
+        seconds a full `async_update` is run in case anything was missed.
+        Commands can still be sent while listening. If the session drops or
+        times out, listening backs off as set by `connection`, reopens it and
+        reconciles, until it succeeds.
+        """
+        logger.debug("Async Listen")
+        import asyncio
+
+        from scrapli.exceptions import ScrapliException
+
+        loop = asyncio.get_running_loop()
+        last_reconcile = loop.time()
+        # Consecutive failures, each followed by a reconciliation attempt.
+        failures = 0
+        while True:
+            reconcile = failures > 0 or (
+                reconcile_interval is not None
+                and loop.time() - last_reconcile >= reconcile_interval
+            )
+            try:
+                if reconcile:
+                    await self.async_update()
+                else:
+                    lines = await self.async_driver._read_notifications(read_timeout)
+            except (OSError, ScrapliException) as err:
+                failures += 1
+                delay = backoff_delay(self.async_connection.settings, failures)
+                logger.warning(
+                    "%s: Listening failed, retrying in %.1fs: %r",
+                    self.host,
+                    delay,
+                    err,
+                )
+                await asyncio.sleep(delay)
+                continue
+            if reconcile:
+                failures = 0
+                last_reconcile = loop.time()
+                yield WattBoxEvent(RECONCILE, "")
+                continue
+            for line in lines:
+                message, _, result = line[1:].decode().partition("=")
+                try:
+                    applied = self.parse_message(message, result)
+                except (IndexError, KeyError, ValueError):
+                    logger.warning("Unable to parse notification: %s", line)
+                    continue
+                if applied:
+                    self.publish_changes()
+                    yield WattBoxEvent(message, result)
+                else:
+                    logger.debug("Unhandled notification: %s", line)
+
+    def refresh_requests(self, outlets: Iterable[int]) -> tuple[str, ...]:
+        return (
+            REQUEST_MESSAGES.OUTLET_STATUS.value,
+            REQUEST_MESSAGES.POWER_STATUS.value,
+            *(
+                (
+                    REQUEST_MESSAGES.OUTLET_POWER_STATUS.value.format(outlet=outlet)
+                    for outlet in sorted(outlets)
+                    if outlet in self.outlets
+                )
+                if self.outlet_power_status
+                else ()
+            ),
+        )
+
+    def parse_responses(
+        self, requests: Iterable[str], responses: Iterable[Response]
+    ) -> None:
+        start = time.perf_counter()
+        for request, response in zip(requests, responses, strict=True):
+            self.parse_message(request[1:].partition("=")[0], response.result)
+        self.metrics.parse(self.host, "responses", time.perf_counter() - start)
+
+    @guarded("update_budget")
+    @publishes_changes
+    def refresh(self, outlets: Iterable[int] | None = None) -> None:
+        """Re-read only the state commands on `outlets` can change.
+
+        Defaults to the outlets waiting on a `Refresh.DEFERRED` refresh.
+        """
+        logger.debug("Refresh")
+        if not (outlets := self._refresh_outlets(outlets)):
+            return
+        requests = self.refresh_requests(outlets)
+        self.parse_responses(requests, self.send_requests(requests))
+
+    @async_guarded("update_budget")
+    @async_publishes_changes
+    async def async_refresh(self, outlets: Iterable[int] | None = None) -> None:
+        logger.debug("Async Refresh")
+        if not (outlets := self._refresh_outlets(outlets)):
+            return
+        requests = self.refresh_requests(outlets)
+        self.parse_responses(requests, await self.async_send_requests(requests))
+
+    def _refresh_outlets(self, outlets: Iterable[int] | None) -> set[int]:
+        if outlets is None:
+            outlets = self.pending_refresh
+        outlets = set(outlets)
+        self.pending_refresh -= outlets
+        return outlets
+
+    def _after_command(
+        self, outlets: Iterable[int], refresh: Refresh | None
+    ) -> Refresh:
+        refresh = refresh or self.command_refresh
+        if refresh is Refresh.DEFERRED:
+            self.pending_refresh.update(outlets)
+        return refresh
+
+    @guarded("command_budget")
+    def send_command(
+        self, outlet: int, command: Commands, refresh: Refresh | None = None
+    ) -> None:
         logger.debug("Send Command")
         if not self.driver:
             raise DriverUnavailableError
@@ -294,9 +714,17 @@ class IpWattBox(BaseWattBox):
                 outlet=outlet, action=command.name, delay=0
             )
         )
-        self.update()
-
-    async def async_send_command(self, outlet: int, command: Commands) -> None:
+        self.invalidate()
+        refresh = self._after_command((outlet,), refresh)
+        if refresh is Refresh.FULL:
+            self.update()
+        elif refresh is Refresh.TARGETED:
+            self.refresh((outlet,))
+
+    @async_guarded("command_budget")
+    async def async_send_command(
+        self, outlet: int, command: Commands, refresh: Refresh | None = None
+    ) -> None:
         logger.debug("Async Send Command")
         if not self.async_driver:
             raise DriverUnavailableError
@@ -305,22 +733,175 @@ class IpWattBox(BaseWattBox):
                 outlet=outlet, action=command.name, delay=0
             )
         )
-        await self.async_update()
+        self.invalidate()
+        refresh = self._after_command((outlet,), refresh)
+        if refresh is Refresh.FULL:
+            await self.async_update()
+        elif refresh is Refresh.TARGETED:
+            await self.async_refresh((outlet,))
+
+    def outlet_set_messages(self, commands: Mapping[int, Commands]) -> list[str]:
+        return [
+            CONTROL_MESSAGES.OUTLET_SET.value.format(
+                outlet=outlet, action=command.name, delay=0
+            )
+            for outlet, command in commands.items()
+        ]
+
+    def _check_command_responses(self, responses: Iterable[Response]) -> None:
+        for response in responses:
+            if response.failed:
+                logger.warning("Command failed: %s", response.channel_input)
+
+    # All the commands are written to the channel as a single batch, followed
+    # by a single refresh.
+    @guarded("command_budget")
+    def send_commands(
+        self, commands: Mapping[int, Commands], refresh: Refresh | None = None
+    ) -> None:
+        logger.debug("Send Commands")
+        if not commands:
+            return
+        self._check_command_responses(
+            self.driver._send_commands(self.outlet_set_messages(commands))
+        )
+        self.invalidate()
+        refresh = self._after_command(commands, refresh)
+        if refresh is Refresh.FULL:
+            self.update()
+        elif refresh is Refresh.TARGETED:
+            self.refresh(commands)
+
+    @async_guarded("command_budget")
+    async def async_send_commands(
+        self, commands: Mapping[int, Commands], refresh: Refresh | None = None
+    ) -> None:
+        logger.debug("Async Send Commands")
+        if not commands:
+            return
+        self._check_command_responses(
+            await self.async_driver._send_commands(self.outlet_set_messages(commands))
+        )
+        self.invalidate()
+        refresh = self._after_command(commands, refresh)
+        if refresh is Refresh.FULL:
+            await self.async_update()
+        elif refresh is Refresh.TARGETED:
+            await self.async_refresh(commands)
+
+    def maintain_connection(self) -> None:
+        """Send a keepalive, close when idle or reopen the sync session.
+
+        Only does what is due by the `ConnectionSettings`, call it periodically.
+        """
+        self.connection.maintain(self.driver)
+
+    async def async_maintain_connection(
+        self, stop: asyncio.Event | None = None
+    ) -> None:
+        """Maintain the async session until `stop` is set."""
+        import asyncio
+
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            await self.async_connection.async_maintain(self.async_driver)
+            try:
+                await asyncio.wait_for(
+                    stop.wait(), self.async_connection.seconds_until_due()
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def close(self) -> None:
+        logger.debug("Close")
+        if self._driver is not None and self._driver.isalive():
+            self._driver.close()
+        self.connection.closed()
+
+    async def async_close(self) -> None:
+        logger.debug("Async Close")
+        self.close()
+        if self._async_driver is not None and self._async_driver.isalive():
+            await self._async_driver.close()
+        self.async_connection.closed()
 
     # String Representation
     def __str__(self) -> str:
         return f"{self.hostname} ({self.host}): {self.hardware_version}"
 
 
-def create_ip_wattbox(host: str, user: str, password: str, port: int = 22) -> IpWattBox:
+_MESSAGE_PARSERS: Final[dict[str, Callable[[IpWattBox, str], None]]] = {
+    "AutoReboot": IpWattBox.parse_auto_reboot,
+    "OutletName": IpWattBox.parse_outlet_name,
+    "OutletPowerStatus": IpWattBox.parse_outlet_power_status,
+    "OutletStatus": IpWattBox.parse_outlet_status,
+    "PowerStatus": IpWattBox.parse_power_status,
+    "UPSConnection": IpWattBox.parse_ups_connection,
+    "UPSStatus": IpWattBox.parse_ups_status,
+}
+
+
+def create_ip_wattbox(
+    host: str,
+    user: str,
+    password: str,
+    port: int = 22,
+    transport: str | None = None,
+    pipelined: bool = False,
+    command_refresh: Refresh = Refresh.FULL,
+    metrics: MetricsSink | None = None,
+    connection: ConnectionSettings | None = None,
+    update_cache: UpdateCache | None = None,
+    info_cache: DeviceInfoCache | None = None,
+    resilience: ResilienceSettings | None = None,
+    power_sampling: PowerSampling | None = None,
+) -> IpWattBox:
     return _create_wattbox(
-        IpWattBox, host=host, user=user, password=password, port=port
+        IpWattBox,
+        host=host,
+        user=user,
+        password=password,
+        port=port,
+        transport=transport,
+        pipelined=pipelined,
+        command_refresh=command_refresh,
+        metrics=metrics,
+        connection=connection,
+        update_cache=update_cache,
+        info_cache=info_cache,
+        resilience=resilience,
+        power_sampling=power_sampling,
     )
 
 
 async def async_create_ip_wattbox(
-    host: str, user: str, password: str, port: int = 22
+    host: str,
+    user: str,
+    password: str,
+    port: int = 22,
+    transport: str | None = None,
+    pipelined: bool = False,
+    command_refresh: Refresh = Refresh.FULL,
+    metrics: MetricsSink | None = None,
+    connection: ConnectionSettings | None = None,
+    update_cache: UpdateCache | None = None,
+    info_cache: DeviceInfoCache | None = None,
+    resilience: ResilienceSettings | None = None,
+    power_sampling: PowerSampling | None = None,
 ) -> IpWattBox:
     return await _async_create_wattbox(
-        IpWattBox, host=host, user=user, password=password, port=port
+        IpWattBox,
+        host=host,
+        user=user,
+        password=password,
+        port=port,
+        transport=transport,
+        pipelined=pipelined,
+        command_refresh=command_refresh,
+        metrics=metrics,
+        connection=connection,
+        update_cache=update_cache,
+        info_cache=info_cache,
+        resilience=resilience,
+        power_sampling=power_sampling,
     )
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from collections.abc import Sequence
+from typing import Final
+
+# Upper bounds, in seconds, of the latency and parse time histogram buckets.
+LATENCY_BUCKETS: Final[tuple[float, ...]] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class MetricsSink:
+    """Receives request metrics from a WattBox and its drivers.
+
+    Every hook does nothing, subclass and override the ones of interest.
+    Metrics are tagged by host and command, which is the `?` / `!` message for
+    the Integration Protocol and the path for HTTP. Each command of a
+    pipelined batch is reported on its own.
+    """
+
+    __slots__ = ()
+
+    def request(self, host: str, command: str, seconds: float, bytes_read: int) -> None:
+        """A request completed, successfully or not."""
+
+    def error(self, host: str, command: str) -> None:
+        """A request got an `#Error` reply, an HTTP error status or failed."""
+
+    def reread(self, host: str, command: str) -> None:
+        """A reply was split across reads, so it was read again.
+
+        Not counted for a reply that simply follows its echo in a later read.
+        """
+
+    def reconnect(self, host: str) -> None:
+        """A dropped session was opened again."""
+
+    def parse(self, host: str, name: str, seconds: float) -> None:
+        """Replies were parsed into the state."""
+
+    def coalesced(self, host: str) -> None:
+        """An update was served by the last one or one in flight."""
+
+
+# The default sink, shared as it holds no state.
+NULL_METRICS: Final[MetricsSink] = MetricsSink()
+
+
+class Histogram:
+    """Counts of observations in fixed buckets."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.bounds: tuple[float, ...] = tuple(bounds)
+        # The last count is for observations above every bound.
+        self.counts: list[int] = [0] * (len(self.bounds) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q` quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+_Key = tuple[str, str]
+
+
+class InMemoryMetrics(MetricsSink):
+    """Keep every metric in memory, keyed by `(host, command)`.
+
+    Safe to share between WattBoxes and threads.
+    """
+
+    __slots__ = (
+        "_lock",
+        "bounds",
+        "latency",
+        "bytes_read",
+        "errors",
+        "rereads",
+        "reconnects",
+        "parse_time",
+        "coalesced_updates",
+    )
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self.bounds: tuple[float, ...] = tuple(bounds)
+        self.latency: dict[_Key, Histogram] = {}
+        self.bytes_read: dict[_Key, int] = {}
+        self.errors: dict[_Key, int] = {}
+        self.rereads: dict[_Key, int] = {}
+        self.reconnects: dict[str, int] = {}
+        # Keyed by `(host, name)` of what was parsed.
+        self.parse_time: dict[_Key, Histogram] = {}
+        self.coalesced_updates: dict[str, int] = {}
+
+    def _histogram(self, histograms: dict[_Key, Histogram], key: _Key) -> Histogram:
+        if (histogram := histograms.get(key)) is None:
+            histogram = histograms[key] = Histogram(self.bounds)
+        return histogram
+
+    def request(self, host: str, command: str, seconds: float, bytes_read: int) -> None:
+        key = (host, command)
+        with self._lock:
+            self._histogram(self.latency, key).observe(seconds)
+            self.bytes_read[key] = self.bytes_read.get(key, 0) + bytes_read
+
+    def error(self, host: str, command: str) -> None:
+        key = (host, command)
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def reread(self, host: str, command: str) -> None:
+        key = (host, command)
+        with self._lock:
+            self.rereads[key] = self.rereads.get(key, 0) + 1
+
+    def reconnect(self, host: str) -> None:
+        with self._lock:
+            self.reconnects[host] = self.reconnects.get(host, 0) + 1
+
+    def parse(self, host: str, name: str, seconds: float) -> None:
+        with self._lock:
+            self._histogram(self.parse_time, (host, name)).observe(seconds)
+
+    def coalesced(self, host: str) -> None:
+        with self._lock:
+            self.coalesced_updates[host] = self.coalesced_updates.get(host, 0) + 1
+
+    def slowest(self, count: int = 10, q: float = 0.95) -> list[tuple[_Key, float]]:
+        """The `(host, command)` pairs with the highest `q` quantile latency."""
+        with self._lock:
+            latencies = [(key, h.quantile(q)) for key, h in self.latency.items()]
+        return sorted(latencies, key=lambda item: item[1], reverse=True)[:count]
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import contextvars
+import logging
+import random
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from enum import Enum
+from typing import NamedTuple
+
+logger = logging.getLogger("pywattbox.resilience")
+
+
+class ResilienceSettings(NamedTuple):
+    # Seconds a whole update may take, shared by all of its requests.
+    update_budget: float | None = 15.0
+    # Seconds a command, and the refresh after it, may take.
+    command_budget: float | None = 15.0
+    # Seconds a single request may take, None for the transport default.
+    request_timeout: float | None = None
+    # Consecutive failures before the circuit opens, None to never open it.
+    failure_threshold: int | None = 3
+    # Seconds before the first probe of an open circuit, doubled after each
+    # failed probe.
+    probe_initial: float = 5.0
+    probe_max: float = 300.0
+    probe_multiplier: float = 2.0
+    # Fraction of each probe delay randomly added or removed.
+    probe_jitter: float = 0.2
+
+
+class DeadlineExceededError(TimeoutError):
+    """The budget of an update or command ran out."""
+
+
+class CircuitOpenError(ConnectionError):
+    """Not sending requests, the WattBox failed too often."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"{host}: Circuit open, probing in {retry_in:.1f}s.")
+        self.retry_in: float = retry_in
+
+
+class Deadline:
+    """The point in time a budget runs out."""
+
+    __slots__ = ("at", "clock")
+
+    def __init__(
+        self, seconds: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.clock: Callable[[], float] = clock
+        self.at: float = clock() + seconds
+
+    def remaining(self) -> float:
+        return self.at - self.clock()
+
+
+# Deadline of the update or command being run, shared by every request in it.
+current_deadline: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar(
+    "pywattbox_deadline", default=None
+)
+
+
+def request_timeout(default: float) -> float:
+    """`default`, or less if the current deadline is sooner.
+
+    Raises `DeadlineExceededError` once it has passed.
+    """
+    if (deadline := current_deadline.get()) is None:
+        return default
+    if (remaining := deadline.remaining()) <= 0:
+        raise DeadlineExceededError("Deadline exceeded before the request was sent.")
+    return min(default, remaining)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    # Failing, requests are refused until the next probe.
+    OPEN = "open"
+    # A single probe is in flight, other requests are refused.
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop sending requests to a WattBox that keeps failing.
+
+    After `failure_threshold` consecutive failures requests are refused with
+    `CircuitOpenError` until a probe is due. The next request is then let
+    through as the probe, closing the circuit if it succeeds and backing off
+    further if not.
+    """
+
+    __slots__ = ("host", "settings", "clock", "state", "failures", "opens", "retry_at")
+
+    def __init__(
+        self,
+        host: str,
+        settings: ResilienceSettings,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host: str = host
+        self.settings: ResilienceSettings = settings
+        self.clock: Callable[[], float] = clock
+        self.state: CircuitState = CircuitState.CLOSED
+        # Consecutive failures, and consecutive opens since last closed.
+        self.failures: int = 0
+        self.opens: int = 0
+        self.retry_at: float = float("-inf")
+
+    def allow(self) -> None:
+        """Raise `CircuitOpenError` unless a request may be sent now."""
+        if self.state is CircuitState.CLOSED:
+            return
+        now = self.clock()
+        if self.state is CircuitState.OPEN and now >= self.retry_at:
+            logger.debug("%s: Probing", self.host)
+            self.state = CircuitState.HALF_OPEN
+            return
+        raise CircuitOpenError(self.host, max(0.0, self.retry_at - now))
+
+    @property
+    def available(self) -> bool:
+        """Whether `allow` would let a request through, without probing."""
+        if self.state is CircuitState.CLOSED:
+            return True
+        return self.state is CircuitState.OPEN and self.clock() >= self.retry_at
+
+    @contextmanager
+    def attempt(self) -> Iterator[None]:
+        """Let a request through, recording whether it succeeded.
+
+        Raises `CircuitOpenError` if it is not allowed. A `ValueError` means
+        the WattBox answered, anything else raised counts as a failure,
+        including cancellation, so a probe is always resolved.
+        """
+        self.allow()
+        try:
+            yield
+        except ValueError:
+            self.succeeded()
+            raise
+        except BaseException as err:
+            self.failed(err)
+            raise
+        self.succeeded()
+
+    def succeeded(self) -> None:
+        if self.state is not CircuitState.CLOSED:
+            logger.info("%s: Circuit closed", self.host)
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opens = 0
+
+    def failed(self, err: BaseException) -> None:
+        self.failures += 1
+        threshold = self.settings.failure_threshold
+        if self.state is CircuitState.HALF_OPEN or (
+            threshold is not None and self.failures >= threshold
+        ):
+            self._open(err)
+
+    def _open(self, err: BaseException) -> None:
+        settings = self.settings
+        self.opens += 1
+        delay = min(
+            settings.probe_max,
+            settings.probe_initial * settings.probe_multiplier ** (self.opens - 1),
+        )
+        delay *= 1 + random.uniform(-1, 1) * settings.probe_jitter
+        self.retry_at = self.clock() + delay
+        self.state = CircuitState.OPEN
+        logger.info("%s: Circuit open (%r), probing in %.1fs", self.host, err, delay)
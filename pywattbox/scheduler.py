@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Mapping
+from typing import Final
+
+from .base import BaseWattBox, UpdateCategory
+
+logger = logging.getLogger("pywattbox.scheduler")
+
+# Seconds between polls of each category.
+DEFAULT_INTERVALS: Final[Mapping[UpdateCategory, float]] = {
+    UpdateCategory.POWER: 2.0,
+    UpdateCategory.STATUS: 10.0,
+    UpdateCategory.NAMES: 3600.0,
+    UpdateCategory.UPS: 30.0,
+}
+
+# Seconds between polls while something has recently changed or is alarming.
+DEFAULT_FAST_INTERVALS: Final[Mapping[UpdateCategory, float]] = {
+    UpdateCategory.POWER: 1.0,
+    UpdateCategory.STATUS: 2.0,
+    UpdateCategory.UPS: 5.0,
+}
+
+
+class PollScheduler:
+    """Poll each category of a WattBox on its own interval.
+
+    After an outlet changes state, or while `power_lost` or an unsafe voltage
+    is reported, the `fast_intervals` are used until `fast_duration` seconds
+    have passed without either. UPS values are only polled when the WattBox
+    has a UPS.
+    """
+
+    def __init__(
+        self,
+        wattbox: BaseWattBox,
+        intervals: Mapping[UpdateCategory, float] = DEFAULT_INTERVALS,
+        fast_intervals: Mapping[UpdateCategory, float] = DEFAULT_FAST_INTERVALS,
+        fast_duration: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.wattbox: BaseWattBox = wattbox
+        self.intervals: dict[UpdateCategory, float] = {
+            **DEFAULT_INTERVALS,
+            **intervals,
+        }
+        self.fast_intervals: dict[UpdateCategory, float] = dict(fast_intervals)
+        self.fast_duration: float = fast_duration
+        self.clock: Callable[[], float] = clock
+
+        self.last_polled: dict[UpdateCategory, float] = {}
+        self.fast_until: float = 0.0
+
+    @property
+    def fast(self) -> bool:
+        return self.clock() < self.fast_until
+
+    @property
+    def categories(self) -> tuple[UpdateCategory, ...]:
+        return tuple(
+            category
+            for category in UpdateCategory
+            if category is not UpdateCategory.UPS or self.wattbox.has_ups
+        )
+
+    def interval(self, category: UpdateCategory) -> float:
+        interval = self.intervals[category]
+        if self.fast and category in self.fast_intervals:
+            return min(interval, self.fast_intervals[category])
+        return interval
+
+    def next_due(self, category: UpdateCategory) -> float:
+        if (last := self.last_polled.get(category)) is None:
+            return float("-inf")
+        return last + self.interval(category)
+
+    def due(self) -> set[UpdateCategory]:
+        now = self.clock()
+        return {
+            category for category in self.categories if self.next_due(category) <= now
+        }
+
+    def seconds_until_due(self) -> float:
+        now = self.clock()
+        return max(
+            0.0, min(self.next_due(category) for category in self.categories) - now
+        )
+
+    def _polled(self, categories: set[UpdateCategory]) -> None:
+        now = self.clock()
+        for category in categories:
+            self.last_polled[category] = now
+        # The delta published by the update that was just run.
+        delta = self.wattbox.last_delta
+        changed = any("status" in fields for fields in delta.outlets.values())
+        alarm = self.wattbox.power_lost or not self.wattbox.safe_voltage_status
+        if changed or alarm:
+            logger.debug("%s: Changed or alarming, polling faster", self.wattbox.host)
+            self.fast_until = now + self.fast_duration
+
+    def poll(self) -> set[UpdateCategory]:
+        """Poll the categories that are due, returning them."""
+        if categories := self.due():
+            logger.debug("%s: Poll %s", self.wattbox.host, categories)
+            self.wattbox.update_categories(categories)
+            self._polled(categories)
+        return categories
+
+    async def async_poll(self) -> set[UpdateCategory]:
+        if categories := self.due():
+            logger.debug("%s: Async Poll %s", self.wattbox.host, categories)
+            await self.wattbox.async_update_categories(categories)
+            self._polled(categories)
+        return categories
+
+    async def async_run(self, stop: asyncio.Event | None = None) -> None:
+        """Poll until `stop` is set. Errors are logged and retried when next due."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                await self.async_poll()
+            except Exception:
+                logger.exception("%s: Poll failed", self.wattbox.host)
+                # Treat a failed poll as done so it is retried on the interval.
+                now = self.clock()
+                for category in self.due():
+                    self.last_polled[category] = now
+            try:
+                await asyncio.wait_for(stop.wait(), self.seconds_until_due())
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,562 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import logging
+import random
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any, Final
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger("pywattbox.simulator")
+
+LOGIN_PROMPT: Final[bytes] = b"Please Login to Continue\nUsername: "
+PASSWORD_PROMPT: Final[bytes] = b"Password: "
+LOGGED_IN: Final[bytes] = b"Successfully Logged In!\n"
+
+# HTTP `control.cgi` command values, see `Commands`.
+_HTTP_ACTIONS: Final[dict[int, str]] = {
+    0: "OFF",
+    1: "ON",
+    3: "RESET",
+    4: "AUTO_REBOOT_ON",
+    5: "AUTO_REBOOT_OFF",
+}
+
+
+class SimulatedWattBox:
+    """State of a simulated WattBox and the replies to each API."""
+
+    def __init__(
+        self,
+        outlets: int = 8,
+        has_ups: bool = False,
+        model: str | None = None,
+        hostname: str = "WattBox",
+        serial_number: str = "ST000000000000",
+        firmware_version: str = "2.4.0.0",
+        seed: int | None = None,
+    ) -> None:
+        self.random: random.Random = random.Random(seed)
+        self.hardware_version: str = model or f"WB-800VPS-IPVM-{outlets}"
+        self.firmware_version: str = firmware_version
+        self.hostname: str = hostname
+        self.serial_number: str = serial_number
+        self.has_ups: bool = has_ups
+        self.auto_reboot: bool = False
+        self.voltage: float = 120.0
+        self.safe_voltage: bool = True
+        self.power_lost: bool = False
+        self.battery_charge: int = 100
+        self.est_run_time: int = 60
+        self.names: list[str] = [f"Outlet {i}" for i in range(1, outlets + 1)]
+        self.status: list[bool] = [True] * outlets
+        self.method: list[bool] = [True] * outlets
+        # Watts drawn by each outlet while it is on.
+        self.loads: list[float] = [
+            round(self.random.uniform(5.0, 150.0), 1) for _ in range(outlets)
+        ]
+        # Called with each unsolicited `~` line after a state change.
+        self.listeners: list[Callable[[str], None]] = []
+
+    @property
+    def outlet_power_status(self) -> bool:
+        return "150" not in self.hardware_version and "250" not in self.hardware_version
+
+    def outlet_power(self, index: int) -> tuple[float, float, float]:
+        """Power, current and voltage of an outlet, with a little noise."""
+        if not self.status[index - 1]:
+            return 0.0, 0.0, self.voltage
+        power = max(0.0, self.loads[index - 1] * self.random.uniform(0.97, 1.03))
+        return power, power / self.voltage, self.voltage
+
+    def total_power(self) -> tuple[float, float, float]:
+        power = sum(
+            self.outlet_power(index)[0] for index in range(1, len(self.status) + 1)
+        )
+        return power, power / self.voltage, self.voltage
+
+    def set_outlet(self, index: int, action: str) -> bool:
+        if not 1 <= index <= len(self.status):
+            return False
+        if action == "ON":
+            self.status[index - 1] = True
+        elif action == "OFF":
+            self.status[index - 1] = False
+        elif action == "TOGGLE":
+            self.status[index - 1] = not self.status[index - 1]
+        elif action == "RESET":
+            # A real reset turns the outlet back on after a delay.
+            self.status[index - 1] = True
+        else:
+            return False
+        self.notify(f"~OutletStatus={self._statuses()}")
+        return True
+
+    def notify(self, line: str) -> None:
+        for listener in self.listeners:
+            listener(line)
+
+    def _statuses(self) -> str:
+        return ",".join("1" if status else "0" for status in self.status)
+
+    # HTTP API
+    def info_xml(self) -> bytes:
+        power, current, voltage = self.total_power()
+        values: dict[str, Any] = {
+            "host_name": self.hostname,
+            "hardware_version": self.hardware_version,
+            "serial_number": self.serial_number,
+            "site_ip": "",
+            "connect_status": 1,
+            "auto_reboot": int(self.auto_reboot),
+            "cloud_status": 1,
+            "outlet_name": ",".join(self.names),
+            "outlet_status": self._statuses(),
+            "outlet_method": ",".join("1" if m else "0" for m in self.method),
+            "led_status": 0,
+            "safe_voltage_status": int(self.safe_voltage),
+            "voltage_value": round(voltage * 10),
+            "current_value": round(current * 10),
+            "power_value": round(power),
+            "hasUPS": int(self.has_ups),
+        }
+        if self.has_ups:
+            values.update(
+                {
+                    "audible_alarm": int(self.power_lost),
+                    "battery_charge": self.battery_charge,
+                    "battery_health": 1,
+                    "battery_load": min(100, round(power / 10)),
+                    "battery_test": 0,
+                    "est_run_time": self.est_run_time,
+                    "mute": 0,
+                    "power_lost": int(self.power_lost),
+                }
+            )
+        body = "".join(
+            f"<{tag}>{escape(str(v))}</{tag}>\n" for tag, v in values.items()
+        )
+        return f'<?xml version="1.0"?>\n<request>\n{body}</request>\n'.encode()
+
+    def control(self, outlet: int, command: int) -> bool:
+        action = _HTTP_ACTIONS.get(command)
+        if action is None:
+            return False
+        if action.startswith("AUTO_REBOOT"):
+            self.auto_reboot = action == "AUTO_REBOOT_ON"
+            return True
+        return self.set_outlet(outlet, action)
+
+    # Integration Protocol
+    def answer(self, message: str) -> str:
+        """Reply to a `?` request or `!` control message."""
+        name, _, argument = message.partition("=")
+        if message.startswith("?"):
+            result = self._request(name[1:], argument)
+            return "#Error" if result is None else f"{name}={result}"
+        if message.startswith("!"):
+            return "OK" if self._control(name[1:], argument) else "#Error"
+        return "#Error"
+
+    def _request(self, name: str, argument: str) -> str | None:
+        if name == "Firmware":
+            return self.firmware_version
+        if name == "Hostname":
+            return self.hostname
+        if name == "ServiceTag":
+            return self.serial_number
+        if name == "Model":
+            return self.hardware_version
+        if name == "OutletCount":
+            return str(len(self.status))
+        if name == "OutletStatus":
+            return self._statuses()
+        if name == "OutletName":
+            return ",".join(f"{{{name}}}" for name in self.names)
+        if name == "AutoReboot":
+            return "1" if self.auto_reboot else "0"
+        if name == "PowerStatus":
+            power, current, voltage = self.total_power()
+            # The WattBox reports "0" while the voltage is safe.
+            safe = "0" if self.safe_voltage else "1"
+            return f"{current:.2f},{power:.2f},{voltage:.2f},{safe}"
+        if name == "OutletPowerStatus":
+            if not self.outlet_power_status or not argument.isdigit():
+                return None
+            index = int(argument)
+            if not 1 <= index <= len(self.status):
+                return None
+            power, current, voltage = self.outlet_power(index)
+            return f"{index},{power:.2f},{current:.2f},{voltage:.2f}"
+        if name == "UPSConnection":
+            return "1" if self.has_ups else "0"
+        if name == "UPSStatus":
+            power = self.total_power()[0]
+            lost = str(self.power_lost)
+            return (
+                f"{self.battery_charge},{min(100, round(power / 10))},Good,"
+                f"{lost},{self.est_run_time},{lost},False"
+            )
+        return None
+
+    def _control(self, name: str, argument: str) -> bool:
+        arguments = argument.split(",")
+        if name == "OutletSet":
+            if len(arguments) < 2 or not arguments[0].isdigit():
+                return False
+            return self.set_outlet(int(arguments[0]), arguments[1])
+        if name == "OutletNameSet":
+            if len(arguments) != 2 or not arguments[0].isdigit():
+                return False
+            index = int(arguments[0])
+            if not 1 <= index <= len(self.names):
+                return False
+            self.names[index - 1] = arguments[1]
+            return True
+        if name == "OutletNameSetAll":
+            if len(arguments) != len(self.names):
+                return False
+            self.names = arguments
+            return True
+        if name == "AutoReboot":
+            self.auto_reboot = argument == "1"
+            return True
+        # Accepted without changing the simulated state.
+        return name in (
+            "OutletPowerOnDelaySet",
+            "OutletModeSet",
+            "OutletRebootSet",
+            "AutoRebootTimeoutSet",
+            "Reboot",
+            "ScheduleAdd",
+            "HostAdd",
+        )
+
+
+_Handler = Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]]
+
+
+class WattBoxSimulator:
+    """Serve a `SimulatedWattBox` over HTTP, telnet and optionally SSH.
+
+    Every simulator binds its own ephemeral ports, so hundreds can run in a
+    single event loop for load testing.
+
+    `latency` and `jitter` (seconds) delay every reply. `error_rate` is the
+    chance a reply is an error, and `timeout_rate` the chance it is never sent
+    at all. While `offline`, new connections are closed straight away.
+    """
+
+    def __init__(
+        self,
+        wattbox: SimulatedWattBox | None = None,
+        user: str = "wattbox",
+        password: str = "wattbox",
+        host: str = "127.0.0.1",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        ssh: bool = False,
+    ) -> None:
+        self.wattbox: SimulatedWattBox = wattbox or SimulatedWattBox()
+        self.user: str = user
+        self.password: str = password
+        self.host: str = host
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.error_rate: float = error_rate
+        self.timeout_rate: float = timeout_rate
+        self.offline: bool = False
+        self.ssh: bool = ssh
+
+        self.http_port: int = 0
+        self.telnet_port: int = 0
+        self.ssh_port: int = 0
+        self._servers: list[Any] = []
+        # Open HTTP and telnet connections, closed by `stop`.
+        self._connections: dict[asyncio.StreamWriter, asyncio.Task[Any]] = {}
+
+    async def start(self) -> None:
+        http = await asyncio.start_server(
+            self._tracked(self._handle_http), self.host, 0
+        )
+        telnet = await asyncio.start_server(
+            self._tracked(self._handle_telnet), self.host, 0
+        )
+        self._servers.extend((http, telnet))
+        self.http_port = http.sockets[0].getsockname()[1]
+        self.telnet_port = telnet.sockets[0].getsockname()[1]
+        if self.ssh:
+            ssh = await _start_ssh_server(self)
+            self._servers.append(ssh)
+            self.ssh_port = ssh.sockets[0].getsockname()[1]
+        logger.debug(
+            "Started: http %s, telnet %s, ssh %s",
+            self.http_port,
+            self.telnet_port,
+            self.ssh_port,
+        )
+
+    async def stop(self) -> None:
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+        await self.disconnect()
+
+    async def disconnect(self) -> None:
+        """Close every open HTTP and telnet connection, as if the network dropped."""
+        for writer in self._connections:
+            writer.close()
+        await asyncio.gather(*self._connections.values(), return_exceptions=True)
+
+    def _tracked(self, handler: _Handler) -> _Handler:
+        async def handle(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            task = asyncio.current_task()
+            assert task is not None
+            self._connections[writer] = task
+            try:
+                await handler(reader, writer)
+            finally:
+                del self._connections[writer]
+
+        return handle
+
+    async def __aenter__(self) -> WattBoxSimulator:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.stop()
+
+    async def _delay(self) -> bool:
+        """Wait out the latency, returning False if the reply should be dropped."""
+        delay = self.latency
+        if self.jitter:
+            delay += self.wattbox.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self.wattbox.random.random() >= self.timeout_rate
+
+    def _failed(self) -> bool:
+        return self.wattbox.random.random() < self.error_rate
+
+    # HTTP
+    async def _handle_http(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        if self.offline:
+            writer.close()
+            return
+        try:
+            while request := await _read_http_request(reader):
+                target, headers = request
+                if not await self._delay():
+                    # Hold the connection open without ever answering.
+                    await reader.read()
+                    break
+                status, body = self._http_response(target, headers)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: text/xml\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    'WWW-Authenticate: Basic realm="WattBox"\r\n\r\n'.encode()
+                    + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _http_response(self, target: str, headers: dict[str, str]) -> tuple[str, bytes]:
+        expected = base64.b64encode(f"{self.user}:{self.password}".encode()).decode()
+        if headers.get("authorization") != f"Basic {expected}":
+            return "401 Unauthorized", b""
+        if self._failed():
+            return "500 Internal Server Error", b""
+        url = urlsplit(target)
+        if url.path == "/wattbox_info.xml":
+            return "200 OK", self.wattbox.info_xml()
+        if url.path == "/control.cgi":
+            query = parse_qs(url.query)
+            try:
+                outlet = int(query["outlet"][0])
+                command = int(query["command"][0])
+            except (KeyError, ValueError):
+                return "400 Bad Request", b""
+            if self.wattbox.control(outlet, command):
+                return "200 OK", b""
+            return "400 Bad Request", b""
+        return "404 Not Found", b""
+
+    # Integration Protocol
+    async def _handle_telnet(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        if self.offline:
+            writer.close()
+            return
+        try:
+            writer.write(LOGIN_PROMPT)
+            user = (await reader.readline()).strip().decode()
+            writer.write(PASSWORD_PROMPT)
+            password = (await reader.readline()).strip().decode()
+            if (user, password) != (self.user, self.password):
+                writer.write(b"Invalid Login\n")
+                return
+            writer.write(LOGGED_IN)
+            await self._session(reader.readline, writer.write, echo=False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _session(
+        self,
+        readline: Callable[[], Any],
+        write: Callable[[bytes], Any],
+        echo: bool,
+    ) -> None:
+        # The device for the whole session, even if `wattbox` is replaced.
+        wattbox = self.wattbox
+
+        def listener(line: str) -> None:
+            write(f"{line}\n".encode())
+
+        wattbox.listeners.append(listener)
+        try:
+            while line := await readline():
+                message = (line if isinstance(line, str) else line.decode()).strip()
+                if not message:
+                    continue
+                # Over SSH the WattBox echoes each message before replying.
+                if echo:
+                    write(f"{message}\n".encode())
+                if message == "!Exit":
+                    break
+                if not await self._delay():
+                    continue
+                reply = "#Error" if self._failed() else wattbox.answer(message)
+                write(f"{reply}\n".encode())
+        finally:
+            wattbox.listeners.remove(listener)
+
+
+async def _read_http_request(
+    reader: asyncio.StreamReader,
+) -> tuple[str, dict[str, str]] | None:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    target = request_line.decode().split(" ")[1]
+    headers: dict[str, str] = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        key, _, value = line.decode().partition(":")
+        headers[key.strip().lower()] = value.strip()
+    if length := int(headers.get("content-length", 0)):
+        await reader.readexactly(length)
+    return target, headers
+
+
+_SSH_HOST_KEY: Any = None
+
+
+async def _start_ssh_server(simulator: WattBoxSimulator) -> Any:
+    try:
+        import asyncssh
+    except ImportError as err:  # pragma: no cover
+        raise RuntimeError("SSH simulation requires `asyncssh`.") from err
+
+    global _SSH_HOST_KEY
+    if _SSH_HOST_KEY is None:
+        # One key for every simulator, generating them is slow.
+        _SSH_HOST_KEY = asyncssh.generate_private_key("ssh-ed25519")
+
+    class Server(asyncssh.SSHServer):
+        def begin_auth(self, username: str) -> bool:
+            return True
+
+        def password_auth_supported(self) -> bool:
+            return True
+
+        def validate_password(self, username: str, password: str) -> bool:
+            return (username, password) == (simulator.user, simulator.password)
+
+    async def process(proc: Any) -> None:
+        if simulator.offline:
+            proc.exit(1)
+            return
+        proc.stdout.write(LOGGED_IN)
+        try:
+            await simulator._session(proc.stdin.readline, proc.stdout.write, echo=True)
+        except (ConnectionError, asyncssh.Error):
+            pass
+        finally:
+            proc.exit(0)
+
+    return await asyncssh.create_server(
+        Server,
+        simulator.host,
+        0,
+        server_host_keys=[_SSH_HOST_KEY],
+        process_factory=process,
+        encoding=None,
+        line_editor=False,
+    )
+
+
+async def start_simulators(count: int, **kwargs: Any) -> list[WattBoxSimulator]:
+    """Start `count` simulators, each on its own ports."""
+    simulators = [WattBoxSimulator(**kwargs) for _ in range(count)]
+    await asyncio.gather(*(simulator.start() for simulator in simulators))
+    return simulators
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    simulators = await start_simulators(
+        args.count,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        ssh=args.ssh,
+    )
+    for index, simulator in enumerate(simulators):
+        simulator.wattbox = SimulatedWattBox(
+            outlets=args.outlets, has_ups=args.ups, hostname=f"WattBox-{index}"
+        )
+        print(
+            f"{simulator.host} http={simulator.http_port} "
+            f"telnet={simulator.telnet_port} ssh={simulator.ssh_port}",
+            flush=True,
+        )
+    await asyncio.Event().wait()
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run simulated WattBoxes.")
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--outlets", type=int, default=8)
+    parser.add_argument("--ups", action="store_true")
+    parser.add_argument("--ssh", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
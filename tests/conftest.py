@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+import pytest
+
+from pywattbox.simulator import WattBoxSimulator
+
+USER = PASSWORD = "wattbox"
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def simulator() -> AsyncIterator[WattBoxSimulator]:
+    async with WattBoxSimulator(user=USER, password=PASSWORD) as simulator:
+        yield simulator
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from pywattbox.cache import DeviceInfo, DeviceInfoCache
+from pywattbox.http_wattbox import async_create_http_wattbox
+from pywattbox.ip_wattbox import async_create_ip_wattbox
+from pywattbox.simulator import SimulatedWattBox, WattBoxSimulator
+
+from .conftest import PASSWORD, USER
+
+pytestmark = pytest.mark.anyio
+
+
+def _cache(tmp_path: Path, simulator: WattBoxSimulator) -> DeviceInfoCache:
+    """A cache of the simulated WattBox, with a hostname only the cache has."""
+    device = simulator.wattbox
+    cache = DeviceInfoCache(tmp_path / "devices.json")
+    cache.put(
+        DeviceInfo(
+            simulator.host,
+            device.serial_number,
+            device.hardware_version,
+            device.firmware_version,
+            device.has_ups,
+            "Cached",
+            len(device.status),
+        )
+    )
+    return cache
+
+
+async def test_ip_cache_hit_skips_initial(
+    tmp_path: Path, simulator: WattBoxSimulator
+) -> None:
+    cache = _cache(tmp_path, simulator)
+    wattbox = await async_create_ip_wattbox(
+        simulator.host,
+        USER,
+        PASSWORD,
+        simulator.telnet_port,
+        transport="telnet",
+        pipelined=True,
+        info_cache=cache,
+    )
+    assert wattbox.hostname == "Cached"
+    assert wattbox.outlets[1].power_value is not None
+    # Verified once, later updates do not ask again.
+    assert "?ServiceTag" not in wattbox.update_requests
+    await wattbox.async_update()
+    await wattbox.async_close()
+
+
+@pytest.mark.parametrize(
+    "device",
+    [
+        SimulatedWattBox(serial_number="ST111111111111"),
+        # Same serial and outlet count, but no per outlet power.
+        SimulatedWattBox(model="WB-250-IPW-8"),
+    ],
+    ids=["serial", "model"],
+)
+async def test_ip_swapped_device_is_read_again(
+    tmp_path: Path, simulator: WattBoxSimulator, device: SimulatedWattBox
+) -> None:
+    cache = _cache(tmp_path, simulator)
+    simulator.wattbox = device
+    wattbox = await async_create_ip_wattbox(
+        simulator.host,
+        USER,
+        PASSWORD,
+        simulator.telnet_port,
+        transport="telnet",
+        pipelined=True,
+        info_cache=cache,
+    )
+    assert wattbox.hostname == device.hostname
+    assert wattbox.serial_number == device.serial_number
+    assert wattbox.hardware_version == device.hardware_version
+    assert cache.get(simulator.host) == wattbox.device_info()
+    await wattbox.async_close()
+
+
+async def test_http_swapped_device_is_read_again(
+    tmp_path: Path, simulator: WattBoxSimulator
+) -> None:
+    cache = _cache(tmp_path, simulator)
+    simulator.wattbox = SimulatedWattBox(serial_number="ST111111111111")
+    wattbox = await async_create_http_wattbox(
+        simulator.host, USER, PASSWORD, simulator.http_port, info_cache=cache
+    )
+    assert wattbox.serial_number == "ST111111111111"
+    assert cache.get(simulator.host) == wattbox.device_info()
+    await wattbox.async_close()
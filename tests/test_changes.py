@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pytest
+
+from pywattbox.base import Change
+from pywattbox.cache import DeviceInfo
+from pywattbox.http_wattbox import HttpWattBox
+from pywattbox.ip_wattbox import IpWattBox
+from pywattbox.simulator import WattBoxSimulator
+
+from .conftest import PASSWORD, USER
+
+INFO = DeviceInfo("host", "ST1", "WB-800VPS-IPVM-4", "2.4.0.0", False, "WattBox", 4)
+
+
+def _ip_wattbox() -> IpWattBox:
+    wattbox = IpWattBox("host", USER, PASSWORD, 23)
+    wattbox.apply_device_info(INFO)
+    wattbox.parse_message("OutletStatus", "1,1,1,1")
+    wattbox.publish_changes()
+    return wattbox
+
+
+def test_parsed_changes_are_published() -> None:
+    wattbox = _ip_wattbox()
+    changes: list[Change] = []
+    wattbox.subscribe(changes.append, fields=("status",), outlets=(2,))
+
+    wattbox.parse_message("OutletStatus", "1,0,1,0")
+    wattbox.parse_message("PowerStatus", "1.00,120.00,120.00,0")
+    delta = wattbox.publish_changes()
+    assert set(delta.outlets) == {2, 4}
+    assert delta.outlets[2]["status"] == Change("status", True, False, 2)
+    assert delta.device["power_value"] == Change("power_value", 0.0, 120.0)
+    assert changes == [Change("status", True, False, 2)]
+
+
+def test_unchanged_and_reverted_values_are_not_published() -> None:
+    wattbox = _ip_wattbox()
+    wattbox.parse_message("OutletStatus", "1,1,1,1")
+    assert not wattbox.publish_changes()
+
+    wattbox.parse_message("OutletStatus", "0,1,1,1")
+    wattbox.parse_message("OutletStatus", "1,1,1,1")
+    assert not wattbox.publish_changes()
+
+
+def test_plain_assignment_is_not_a_change() -> None:
+    wattbox = _ip_wattbox()
+    wattbox.power_value = 10.0
+    wattbox.outlets[1].status = False
+    assert not wattbox.publish_changes()
+
+
+@pytest.mark.anyio
+async def test_http_update_delta(simulator: WattBoxSimulator) -> None:
+    wattbox = HttpWattBox(simulator.host, USER, PASSWORD, simulator.http_port)
+    await wattbox.async_get_initial()
+    await wattbox.async_update()
+    simulator.wattbox.status[0] = False
+    await wattbox.async_update()
+    delta = wattbox.last_delta
+    assert delta.outlets[1] == {"status": Change("status", True, False, 1)}
+    # The master switch is no longer on, as not every outlet is.
+    assert delta.outlets[0] == {"status": Change("status", True, False, 0)}
+    await wattbox.async_close()
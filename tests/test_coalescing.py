@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+from collections.abc import Mapping
+
+import httpx
+import pytest
+
+from pywattbox.base import Commands, UpdateCache
+from pywattbox.http_wattbox import HttpWattBox
+from pywattbox.simulator import WattBoxSimulator
+
+from .conftest import PASSWORD, USER
+
+pytestmark = pytest.mark.anyio
+
+
+class CountingWattBox(HttpWattBox):
+    __slots__ = ("requests",)
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)  # type: ignore[arg-type]
+        self.requests: list[str] = []
+
+    async def _async_get(
+        self, path: str, params: Mapping[str, int] | None = None
+    ) -> httpx.Response:
+        self.requests.append(path)
+        return await super()._async_get(path, params)
+
+
+def _wattbox(
+    simulator: WattBoxSimulator, update_cache: UpdateCache | None = None
+) -> CountingWattBox:
+    return CountingWattBox(
+        simulator.host,
+        USER,
+        PASSWORD,
+        simulator.http_port,
+        update_cache=update_cache,
+    )
+
+
+async def test_concurrent_updates_send_one_request(
+    simulator: WattBoxSimulator,
+) -> None:
+    wattbox = _wattbox(simulator)
+    await wattbox.async_get_initial()
+    wattbox.requests.clear()
+    simulator.latency = 0.05
+    await asyncio.gather(*(wattbox.async_update() for _ in range(5)))
+    assert wattbox.requests == ["wattbox_info.xml"]
+    # Once it is done, the next one sends its own.
+    await wattbox.async_update()
+    assert len(wattbox.requests) == 2
+    await wattbox.async_close()
+
+
+async def test_cancelled_caller_does_not_cancel_others(
+    simulator: WattBoxSimulator,
+) -> None:
+    wattbox = _wattbox(simulator)
+    await wattbox.async_get_initial()
+    wattbox.requests.clear()
+    simulator.latency = 0.1
+    first = asyncio.ensure_future(wattbox.async_update())
+    second = asyncio.ensure_future(wattbox.async_update())
+    await asyncio.sleep(0.02)
+    first.cancel()
+    simulator.wattbox.status[0] = False
+    await second
+    assert first.cancelled()
+    assert wattbox.requests == ["wattbox_info.xml"]
+    assert wattbox.outlets[1].status is False
+    await wattbox.async_close()
+
+
+async def test_update_cache_serves_recent_update(
+    simulator: WattBoxSimulator,
+) -> None:
+    wattbox = _wattbox(simulator, UpdateCache(ttl=60.0))
+    await wattbox.async_get_initial()
+    await wattbox.async_update()
+    await wattbox.async_update()
+    assert wattbox.requests.count("wattbox_info.xml") == 2
+    # A command makes the next update send a request.
+    await wattbox.async_send_command(1, Commands.OFF)
+    await wattbox.async_update()
+    assert wattbox.requests.count("wattbox_info.xml") == 3
+    assert wattbox.outlets[1].status is False
+    await wattbox.async_close()
+
+
+def test_sync_import_does_not_import_asyncio() -> None:
+    code = (
+        "import sys, pywattbox.base, pywattbox.http_wattbox, pywattbox.ip_wattbox;"
+        " assert 'asyncio' not in sys.modules, 'asyncio imported'"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from pywattbox.energy import (
+    CHECKPOINT_VERSION,
+    EnergyCheckpoint,
+    EnergyMeter,
+    Integration,
+)
+
+NAN = float("nan")
+
+
+@pytest.mark.parametrize(
+    ("method", "wh"), [(Integration.LEFT, 100.0), (Integration.TRAPEZOID, 150.0)]
+)
+def test_integration_methods(method: Integration, wh: float) -> None:
+    meter = EnergyMeter("host", 1, method, max_gap=None)
+    meter.add(1, 0.0, 100.0)
+    meter.add(1, 3600.0, 200.0)
+    assert meter.total(1) == pytest.approx(wh)
+
+
+def test_repeated_missing_and_gapped_readings() -> None:
+    meter = EnergyMeter("host", 1, Integration.LEFT, max_gap=600.0)
+    meter.add(1, 0.0, 60.0)
+    # Not read again, so nothing to integrate.
+    meter.add(1, 0.0, 60.0)
+    meter.add(1, 60.0, 60.0)
+    assert meter.total(1) == pytest.approx(1.0)
+    # A missing reading breaks the integration until the next two readings.
+    meter.add(1, 120.0, NAN)
+    meter.add(1, 180.0, 60.0)
+    assert meter.total(1) == pytest.approx(1.0)
+    # An outage longer than `max_gap` is left out and counted.
+    meter.add(1, 3780.0, 60.0)
+    assert meter.total(1) == pytest.approx(1.0)
+    assert meter.gaps[1] == 1
+    meter.add(1, 3840.0, 60.0)
+    assert meter.total(1) == pytest.approx(2.0)
+
+    meter.reset(1)
+    assert meter.total(1) == 0.0
+    assert meter.gaps[1] == 0
+    with pytest.raises(KeyError):
+        meter.total(2)
+
+
+def test_checkpoint_restores_totals(tmp_path: Path) -> None:
+    path = tmp_path / "energy.json"
+    checkpoint = EnergyCheckpoint(path, interval=3600.0)
+    meter = EnergyMeter("host", 2, Integration.LEFT, checkpoint=checkpoint)
+    meter.add(0, 0.0, 120.0)
+    meter.add(0, 60.0, 120.0)
+    meter.reset(2)
+    # Not due yet, so only written on `save`.
+    assert not path.exists()
+    checkpoint.save()
+
+    restored = EnergyMeter("host", 2, checkpoint=EnergyCheckpoint(path))
+    assert restored.total() == pytest.approx(2.0)
+    assert EnergyMeter("other", 2, checkpoint=EnergyCheckpoint(path)).total() == 0.0
+
+
+def test_checkpoint_of_another_version_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "energy.json"
+    path.write_text(
+        json.dumps({"version": CHECKPOINT_VERSION + 1, "devices": {"host": [1.0]}})
+    )
+    assert EnergyCheckpoint(path).get("host") is None
+    path.write_text("{")
+    assert EnergyCheckpoint(path).get("host") is None
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+
+from pywattbox import exporter as exporter_module
+from pywattbox.exporter import CONTENT_TYPE, WattBoxExporter
+from pywattbox.http_wattbox import HttpWattBox
+from pywattbox.simulator import WattBoxSimulator
+
+from .conftest import PASSWORD, USER
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def exporter(
+    simulator: WattBoxSimulator,
+) -> AsyncIterator[tuple[WattBoxExporter, int]]:
+    simulator.wattbox.names[0] = 'TV "Main"\\Rack\nA'
+    simulator.wattbox.status[1] = False
+    wattbox = HttpWattBox(simulator.host, USER, PASSWORD, simulator.http_port)
+    await wattbox.async_get_initial()
+    exporter = WattBoxExporter([wattbox])
+    await exporter.poll()
+    server = await exporter.start_server("127.0.0.1", 0)
+    async with server:
+        yield exporter, server.sockets[0].getsockname()[1]
+    await exporter.async_close()
+
+
+async def test_scrape(
+    exporter: tuple[WattBoxExporter, int], simulator: WattBoxSimulator
+) -> None:
+    _, port = exporter
+    device = f'host="127.0.0.1",port="{simulator.http_port}"'
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"http://127.0.0.1:{port}/metrics")
+        missing = await client.get(f"http://127.0.0.1:{port}/other")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    assert missing.status_code == 404
+
+    lines = response.text.splitlines()
+    assert "# TYPE wattbox_up gauge" in lines
+    assert f"wattbox_up{{{device}}} 1" in lines
+    assert f"wattbox_voltage_volts{{{device}}} 120" in lines
+    # Quotes, backslashes and newlines in label values are escaped.
+    name = 'name="TV \\"Main\\"\\\\Rack\\nA"'
+    assert f'wattbox_outlet_on{{{device},outlet="1",{name}}} 1' in lines
+    assert f'wattbox_outlet_on{{{device},outlet="2",name="Outlet 2"}} 0' in lines
+    # No UPS, so no battery series.
+    assert "wattbox_battery_charge_percent" not in response.text
+
+
+async def test_slow_client_is_closed(
+    exporter: tuple[WattBoxExporter, int], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _, port = exporter
+    monkeypatch.setattr(exporter_module, "HEADER_TIMEOUT", 0.1)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /metrics HTTP/1.1\r\n")
+    assert await asyncio.wait_for(reader.read(), 2.0) == b""
+    writer.close()
+
+
+async def test_oversized_headers_are_refused(
+    exporter: tuple[WattBoxExporter, int],
+) -> None:
+    _, port = exporter
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    # All read before they are refused, so nothing is left unread.
+    pad = b"X-Pad: " + b"a" * 5000 + b"\r\n"
+    writer.write(b"GET /metrics HTTP/1.1\r\n" + pad + pad)
+    response = await asyncio.wait_for(reader.read(), 2.0)
+    assert response.startswith(b"HTTP/1.1 431 ")
+    writer.close()
+
+
+async def test_close_closes_every_wattbox(
+    exporter: tuple[WattBoxExporter, int],
+) -> None:
+    wattbox_exporter, _ = exporter
+    (wattbox,) = wattbox_exporter.fleet.wattboxes.values()
+    assert isinstance(wattbox, HttpWattBox)
+    await wattbox_exporter.async_close()
+    assert wattbox.client.is_closed
+
+
+async def test_wattboxes_sharing_a_host_are_told_apart(
+    exporter: tuple[WattBoxExporter, int],
+) -> None:
+    wattbox_exporter, _ = exporter
+    async with WattBoxSimulator(user=USER, password=PASSWORD) as other:
+        other.wattbox.voltage = 110.0
+        wattbox = HttpWattBox(other.host, USER, PASSWORD, other.http_port)
+        await wattbox.async_get_initial()
+        wattbox_exporter.add(wattbox)
+        lines = wattbox_exporter.render().decode().splitlines()
+        device = f'host="127.0.0.1",port="{other.http_port}"'
+        assert f"wattbox_voltage_volts{{{device}}} 110" in lines
+        assert len([line for line in lines if line.startswith("wattbox_up{")]) == 2
+
+        wattbox_exporter.remove((wattbox.host, wattbox.port))
+        assert f"wattbox_up{{{device}}} 1" not in wattbox_exporter.render().decode()
+        await wattbox.async_close()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import ClassVar
+
+import pytest
+
+from pywattbox.fleet import DeviceConfig, WattBoxFleet
+from pywattbox.http_wattbox import HttpWattBox
+from pywattbox.simulator import WattBoxSimulator
+
+from .conftest import PASSWORD, USER
+
+pytestmark = pytest.mark.anyio
+
+
+class ClosingWattBox(HttpWattBox):
+    __slots__ = ()
+
+    closed: ClassVar[list[str]] = []
+
+    async def async_close(self) -> None:
+        self.closed.append(self.host)
+        await super().async_close()
+
+
+async def test_create_closes_failed_devices() -> None:
+    ClosingWattBox.closed = []
+    async with (
+        WattBoxSimulator(user=USER, password=PASSWORD) as good,
+        WattBoxSimulator(user=USER, password=PASSWORD, host="127.0.0.2") as slow,
+        WattBoxSimulator(user=USER, password="other", host="127.0.0.3") as denied,
+    ):
+        slow.latency = 2.0
+        fleet = WattBoxFleet(timeout=1.0)
+        results = await fleet.async_create(
+            ClosingWattBox,
+            [
+                DeviceConfig(simulator.host, USER, PASSWORD, simulator.http_port)
+                for simulator in (good, slow, denied)
+            ],
+        )
+    keys = [(simulator.host, simulator.http_port) for simulator in (good, slow, denied)]
+    assert [results[key].ok for key in keys] == [True, False, False]
+    assert list(fleet.wattboxes) == keys[:1]
+    assert sorted(ClosingWattBox.closed) == sorted((slow.host, denied.host))
+    await fleet.async_close()
+
+
+async def test_wattboxes_sharing_a_host_are_kept_apart() -> None:
+    async with (
+        WattBoxSimulator(user=USER, password=PASSWORD) as first,
+        WattBoxSimulator(user=USER, password=PASSWORD) as second,
+    ):
+        second.wattbox.serial_number = "ST000000000002"
+        devices = [
+            DeviceConfig(simulator.host, USER, PASSWORD, simulator.http_port)
+            for simulator in (first, second)
+        ]
+        fleet = WattBoxFleet()
+        results = await fleet.async_create(HttpWattBox, devices)
+        assert all(result.ok for result in results.values())
+        assert {
+            key: wattbox.serial_number for key, wattbox in fleet.wattboxes.items()
+        } == {
+            (first.host, first.http_port): first.wattbox.serial_number,
+            (second.host, second.http_port): second.wattbox.serial_number,
+        }
+
+        # Duplicates are refused rather than replacing the WattBox.
+        duplicate = HttpWattBox(first.host, USER, PASSWORD, first.http_port)
+        with pytest.raises(ValueError):
+            fleet.add(duplicate)
+        with pytest.raises(ValueError):
+            await fleet.async_create(HttpWattBox, devices[:1])
+        with pytest.raises(ValueError):
+            await WattBoxFleet().async_create(HttpWattBox, devices[:1] * 2)
+        assert fleet.wattboxes[first.host, first.http_port] is not duplicate
+        await duplicate.async_close()
+        await fleet.async_close()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import math
+
+from pywattbox.history import Bucket, PowerHistory, Tier
+
+NAN = float("nan")
+
+
+def _history() -> PowerHistory:
+    return PowerHistory(1, capacity=8, tiers=(Tier(60.0, 4),))
+
+
+def _record(history: PowerHistory, timestamp: float, power: float) -> None:
+    history.record(timestamp, [power, power, 1.0, 1.0, 120.0, 120.0])
+
+
+def test_flushed_bucket_is_updated_in_place() -> None:
+    history = _history()
+    _record(history, 0.0, 10.0)
+    _record(history, 10.0, 20.0)
+    history.flush()
+    assert history.buckets(60.0) == [Bucket(0.0, 10.0, 20.0, 15.0)]
+
+    _record(history, 20.0, 60.0)
+    history.flush()
+    history.flush()
+    assert history.buckets(60.0) == [Bucket(0.0, 10.0, 60.0, 30.0)]
+
+    # The next bucket closes the flushed one rather than adding it again.
+    _record(history, 60.0, 5.0)
+    _record(history, 130.0, 7.0)
+    assert history.buckets(60.0) == [
+        Bucket(0.0, 10.0, 60.0, 30.0),
+        Bucket(60.0, 5.0, 5.0, 5.0),
+    ]
+
+
+def test_buckets_wrap_and_skip_missing_readings() -> None:
+    history = _history()
+    for minute in range(6):
+        _record(history, minute * 60.0, float(minute))
+        _record(history, minute * 60.0 + 30.0, NAN)
+    history.flush()
+    buckets = history.buckets(60.0, outlet=1)
+    assert [bucket.start for bucket in buckets] == [120.0, 180.0, 240.0, 300.0]
+    assert [bucket.mean for bucket in buckets] == [2.0, 3.0, 4.0, 5.0]
+    assert history.buckets(60.0, since=240.0)[0].start == 240.0
+    assert len(history.samples()) == 8
+    assert math.isnan(history.samples()[-1].value)
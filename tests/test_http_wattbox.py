@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from pywattbox.base import Commands
+from pywattbox.http_wattbox import HttpWattBox, MasterSwitch
+from pywattbox.resilience import Deadline, ResilienceSettings, current_deadline
+from pywattbox.simulator import WattBoxSimulator
+
+from .conftest import PASSWORD, USER
+
+
+def test_send_commands_share_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    deadlines: list[Deadline | None] = []
+
+    def get(self: HttpWattBox, *args: object, **kwargs: object) -> None:
+        deadlines.append(current_deadline.get())
+
+    monkeypatch.setattr(HttpWattBox, "_get", get)
+    monkeypatch.setattr(HttpWattBox, "update", lambda self: None)
+    wattbox = HttpWattBox(
+        "127.0.0.1", USER, PASSWORD, resilience=ResilienceSettings(command_budget=5.0)
+    )
+    wattbox.send_commands(dict.fromkeys(range(1, 9), Commands.OFF))
+    assert len(deadlines) == 8
+    assert deadlines[0] is not None
+    assert all(deadline is deadlines[0] for deadline in deadlines)
+    wattbox.close()
+
+
+@pytest.mark.anyio
+async def test_master_switch_async_turn_of_is_deprecated(
+    simulator: WattBoxSimulator,
+) -> None:
+    wattbox = HttpWattBox(simulator.host, USER, PASSWORD, simulator.http_port)
+    await wattbox.async_get_initial()
+    assert isinstance(wattbox.master_outlet, MasterSwitch)
+    with pytest.deprecated_call():
+        await wattbox.master_outlet.async_turn_of()
+    assert not any(simulator.wattbox.status)
+    await wattbox.async_close()
+
+
+@pytest.mark.anyio
+async def test_close_closes_both_clients(simulator: WattBoxSimulator) -> None:
+    wattbox = HttpWattBox(simulator.host, USER, PASSWORD, simulator.http_port)
+    await wattbox.async_get_initial()
+    async_client = wattbox.async_client
+    # Called from sync code that runs in the event loop.
+    wattbox.close()
+    assert wattbox.client.is_closed
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert async_client.is_closed
+
+
+@pytest.mark.anyio
+async def test_close_from_another_thread(simulator: WattBoxSimulator) -> None:
+    wattbox = HttpWattBox(simulator.host, USER, PASSWORD, simulator.http_port)
+
+    def run() -> httpx.AsyncClient:
+        # Async use in an event loop of its own, closed once it is idle.
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(wattbox.async_get_initial())
+        async_client = wattbox.async_client
+        wattbox.close()
+        loop.close()
+        return async_client
+
+    async_client = await asyncio.to_thread(run)
+    assert wattbox.client.is_closed
+    assert async_client.is_closed
+
+
+def test_sync_close_leaves_no_async_client() -> None:
+    wattbox = HttpWattBox("127.0.0.1", USER, PASSWORD)
+    wattbox.close()
+    assert wattbox._async_client is None
+
+
+def test_master_switch_keeps_no_instance_dict() -> None:
+    wattbox = HttpWattBox("127.0.0.1", USER, PASSWORD)
+    master = MasterSwitch(wattbox)
+    assert master.name == "Master Switch"
+    assert not hasattr(master, "__dict__")
+    wattbox.close()
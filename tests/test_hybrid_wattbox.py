@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import anyio
+import pytest
+
+from pywattbox.base import Commands
+from pywattbox.hybrid_wattbox import HybridWattBox
+from pywattbox.ip_wattbox import PowerSampling
+from pywattbox.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    DeadlineExceededError,
+    ResilienceSettings,
+)
+from pywattbox.simulator import WattBoxSimulator
+
+from .conftest import PASSWORD, USER
+
+pytestmark = pytest.mark.anyio
+
+# Nothing listens on port 1, so connecting to it fails straight away.
+CLOSED_PORT = 1
+
+
+def _hybrid(
+    simulator: WattBoxSimulator,
+    http_port: int | None = None,
+    ip_port: int | None = None,
+    update_budget: float = 15.0,
+    power_sampling: PowerSampling | None = None,
+) -> HybridWattBox:
+    return HybridWattBox(
+        simulator.host,
+        USER,
+        PASSWORD,
+        simulator.http_port if http_port is None else http_port,
+        simulator.telnet_port if ip_port is None else ip_port,
+        transport="telnet",
+        resilience=ResilienceSettings(
+            update_budget=update_budget,
+            request_timeout=1.0,
+            failure_threshold=1,
+            probe_initial=0.0,
+            probe_jitter=0.0,
+        ),
+        power_sampling=power_sampling,
+    )
+
+
+@pytest.mark.parametrize("sync", [False, True])
+async def test_off_outlets_are_not_sampled(
+    simulator: WattBoxSimulator, sync: bool
+) -> None:
+    simulator.wattbox.status[0] = simulator.wattbox.status[1] = False
+    wattbox = _hybrid(simulator, power_sampling=PowerSampling(off_interval=None))
+    if sync:
+        await anyio.to_thread.run_sync(wattbox.get_initial)
+        await anyio.to_thread.run_sync(wattbox.update)
+    else:
+        await wattbox.async_get_initial()
+        await wattbox.async_update()
+    assert wattbox.ip.outlets[1].status is False
+    assert wattbox.ip.sampled_outlets() == [3, 4, 5, 6, 7, 8]
+    assert wattbox.outlets[1].power_read_at is None
+    assert wattbox.outlets[3].power_read_at is not None
+    if sync:
+        await anyio.to_thread.run_sync(wattbox.close)
+    else:
+        await wattbox.async_close()
+
+
+def _open_for_probe(breaker: CircuitBreaker) -> None:
+    breaker.failed(OSError())
+    assert breaker.state is CircuitState.OPEN
+
+
+async def test_update_reads_outlet_power_over_ip(simulator: WattBoxSimulator) -> None:
+    wattbox = _hybrid(simulator)
+    await wattbox.async_get_initial()
+    await wattbox.async_update()
+    assert wattbox.serial_number == simulator.wattbox.serial_number
+    assert all(outlet.power_value for outlet in wattbox.outlets.values())
+    assert all(outlet.power_read_at for outlet in wattbox.outlets.values())
+    await wattbox.async_close()
+
+
+async def test_falls_back_to_ip_while_http_is_down(
+    simulator: WattBoxSimulator,
+) -> None:
+    wattbox = _hybrid(simulator, http_port=CLOSED_PORT)
+    await wattbox.async_get_initial()
+    await wattbox.async_update()
+    assert wattbox.number_outlets == len(simulator.wattbox.status)
+    assert wattbox.http_breaker.state is CircuitState.OPEN
+
+    await wattbox.async_send_command(2, Commands.OFF)
+    assert simulator.wattbox.status[1] is False
+    await wattbox.async_update()
+    assert wattbox.outlets[2].status is False
+
+    # HTTP is probed again once it is due, and used once it answers.
+    wattbox.base_host = f"http://{simulator.host}:{simulator.http_port}"
+    await wattbox.async_update()
+    assert wattbox.http_breaker.state is CircuitState.CLOSED
+    await wattbox.async_close()
+
+
+async def test_http_only_while_ip_is_down(simulator: WattBoxSimulator) -> None:
+    wattbox = _hybrid(simulator, ip_port=CLOSED_PORT)
+    await wattbox.async_get_initial()
+    await wattbox.async_update()
+    assert wattbox.power_value
+    assert wattbox.ip_breaker.state is CircuitState.OPEN
+    assert wattbox.outlets[1].power_value is None
+    await wattbox.async_close()
+
+
+async def test_sync_falls_back_to_ip(simulator: WattBoxSimulator) -> None:
+    wattbox = _hybrid(simulator, http_port=CLOSED_PORT)
+    await anyio.to_thread.run_sync(wattbox.get_initial)
+    await anyio.to_thread.run_sync(wattbox.update)
+    assert wattbox.number_outlets == len(simulator.wattbox.status)
+    assert wattbox.http_breaker.state is CircuitState.OPEN
+
+    # Both down, with IP not due to be probed yet.
+    wattbox.ip_breaker.failed(OSError())
+    wattbox.ip_breaker.retry_at = float("inf")
+    with pytest.raises(CircuitOpenError):
+        await anyio.to_thread.run_sync(wattbox.update)
+    await anyio.to_thread.run_sync(wattbox.close)
+
+
+async def test_interrupted_http_probe_is_resolved(
+    simulator: WattBoxSimulator,
+) -> None:
+    wattbox = _hybrid(simulator, update_budget=0.2)
+    await wattbox.async_get_initial()
+    _open_for_probe(wattbox.http_breaker)
+    simulator.latency = 0.5
+    with pytest.raises(DeadlineExceededError):
+        await wattbox.async_update()
+    assert wattbox.http_breaker.state is CircuitState.OPEN
+    assert wattbox.ip_breaker.state is CircuitState.OPEN
+
+    # Let the simulator finish the slow replies it is still sending.
+    simulator.latency = 0.0
+    await anyio.sleep(0.5)
+    await wattbox.async_update()
+    assert wattbox.http_breaker.state is CircuitState.CLOSED
+    assert wattbox.ip_breaker.state is CircuitState.CLOSED
+    await wattbox.async_close()
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+from scrapli.exceptions import ScrapliTimeout
+
+from pywattbox.base import Commands
+from pywattbox.driver.connection import ConnectionSettings
+from pywattbox.ip_wattbox import (
+    RECONCILE,
+    REQUEST_MESSAGES,
+    IpWattBox,
+    WattBoxEvent,
+)
+from pywattbox.metrics import InMemoryMetrics
+from pywattbox.resilience import ResilienceSettings
+from pywattbox.simulator import SimulatedWattBox, WattBoxSimulator
+
+from .conftest import PASSWORD, USER
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def ssh_simulator() -> AsyncIterator[WattBoxSimulator]:
+    pytest.importorskip("asyncssh")
+    async with WattBoxSimulator(user=USER, password=PASSWORD, ssh=True) as simulator:
+        yield simulator
+
+
+def _telnet(
+    simulator: WattBoxSimulator,
+    pipelined: bool = False,
+    resilience: ResilienceSettings | None = None,
+    connection: ConnectionSettings | None = None,
+    metrics: InMemoryMetrics | None = None,
+) -> IpWattBox:
+    return IpWattBox(
+        simulator.host,
+        USER,
+        PASSWORD,
+        simulator.telnet_port,
+        transport="telnet",
+        pipelined=pipelined,
+        resilience=resilience,
+        connection=connection,
+        metrics=metrics,
+    )
+
+
+def _check_state(wattbox: IpWattBox, simulator: WattBoxSimulator) -> None:
+    device = simulator.wattbox
+    assert wattbox.hardware_version == device.hardware_version
+    assert wattbox.serial_number == device.serial_number
+    outlets = [wattbox.outlets[index] for index in range(1, len(device.names) + 1)]
+    assert [outlet.name for outlet in outlets] == device.names
+    assert [outlet.status for outlet in outlets] == device.status
+    assert wattbox.outlets[1].power_value is not None
+    assert wattbox.voltage_value == device.voltage
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+async def test_async_telnet(simulator: WattBoxSimulator, pipelined: bool) -> None:
+    wattbox = _telnet(simulator, pipelined)
+    await wattbox.async_get_initial()
+    # The telnet login read the banner, so opening did not wait for another.
+    assert wattbox.async_driver.channel.logged_in
+    await wattbox.async_update()
+    _check_state(wattbox, simulator)
+
+    await wattbox.async_send_command(2, Commands.OFF)
+    assert simulator.wattbox.status[1] is False
+    assert wattbox.outlets[2].status is False
+    await wattbox.async_close()
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+async def test_sync_telnet(simulator: WattBoxSimulator, pipelined: bool) -> None:
+    wattbox = _telnet(simulator, pipelined)
+
+    def run() -> None:
+        wattbox.get_initial()
+        wattbox.update()
+        wattbox.send_command(3, Commands.OFF)
+        wattbox.close()
+
+    await asyncio.to_thread(run)
+    _check_state(wattbox, simulator)
+    assert wattbox.outlets[3].status is False
+
+
+@pytest.mark.parametrize("sync", [False, True])
+async def test_pipelined_commands_are_timed_on_their_own(
+    simulator: WattBoxSimulator, sync: bool
+) -> None:
+    metrics = InMemoryMetrics()
+    wattbox = _telnet(simulator, pipelined=True, metrics=metrics)
+    requests = [REQUEST_MESSAGES.OUTLET_STATUS, REQUEST_MESSAGES.POWER_STATUS]
+    if sync:
+        await asyncio.to_thread(wattbox.send_requests, requests)
+        await asyncio.to_thread(wattbox.close)
+    else:
+        await wattbox.async_send_requests(requests)
+        await wattbox.async_close()
+    keys = {(simulator.host, request.value) for request in requests}
+    assert keys <= set(metrics.latency)
+    assert all(metrics.latency[key].count == 1 for key in keys)
+    assert all(metrics.bytes_read[key] > 0 for key in keys)
+    # Every reply fits in a single read of the loopback session.
+    assert not metrics.rereads
+
+
+async def test_async_ssh(ssh_simulator: WattBoxSimulator) -> None:
+    wattbox = IpWattBox(
+        ssh_simulator.host,
+        USER,
+        PASSWORD,
+        ssh_simulator.ssh_port,
+        transport="ssh",
+        pipelined=True,
+    )
+    await wattbox.async_get_initial()
+    await wattbox.async_update()
+    _check_state(wattbox, ssh_simulator)
+    await wattbox.async_close()
+
+
+async def _next_event(events: AsyncIterator[WattBoxEvent]) -> WattBoxEvent:
+    return await asyncio.wait_for(events.__anext__(), 5.0)
+
+
+async def test_listen_applies_notifications(simulator: WattBoxSimulator) -> None:
+    wattbox = _telnet(simulator)
+    await wattbox.async_get_initial()
+    events = wattbox.async_listen(reconcile_interval=None, read_timeout=0.05)
+    # Start listening, so the session is open before the device changes.
+    listening = asyncio.ensure_future(_next_event(events))
+    await asyncio.sleep(0.2)
+    simulator.wattbox.set_outlet(1, "OFF")
+    event = await listening
+    assert event == WattBoxEvent("OutletStatus", "0,1,1,1,1,1,1,1")
+    assert wattbox.outlets[1].status is False
+    await events.aclose()  # type: ignore[attr-defined]
+    await wattbox.async_close()
+
+
+async def test_listen_recovers_from_dropped_session(
+    simulator: WattBoxSimulator,
+) -> None:
+    wattbox = _telnet(
+        simulator, connection=ConnectionSettings(backoff_initial=0.1, backoff_jitter=0)
+    )
+    await wattbox.async_get_initial()
+    events = wattbox.async_listen(reconcile_interval=None, read_timeout=0.05)
+    listening = asyncio.ensure_future(_next_event(events))
+    await asyncio.sleep(0.2)
+    simulator.wattbox.set_outlet(1, "OFF")
+    assert (await listening).message == "OutletStatus"
+
+    # Missed while the session is down, so only seen by reconciling.
+    await simulator.disconnect()
+    simulator.wattbox.set_outlet(2, "OFF")
+    assert await _next_event(events) == WattBoxEvent(RECONCILE, "")
+    assert wattbox.outlets[2].status is False
+
+    # Notifications arrive on the new session.
+    listening = asyncio.ensure_future(_next_event(events))
+    await asyncio.sleep(0.2)
+    simulator.wattbox.set_outlet(3, "OFF")
+    assert await listening == WattBoxEvent("OutletStatus", "0,0,0,1,1,1,1,1")
+    assert wattbox.outlets[3].status is False
+    await events.aclose()  # type: ignore[attr-defined]
+    await wattbox.async_close()
+
+
+async def test_device_replaced_mid_session(simulator: WattBoxSimulator) -> None:
+    wattbox = _telnet(simulator, pipelined=True)
+    await wattbox.async_get_initial()
+    old = simulator.wattbox
+    simulator.wattbox = SimulatedWattBox(serial_number="ST000000000001")
+    # The open session keeps answering for, and listening to, the old device.
+    await wattbox.async_update()
+    assert wattbox.serial_number == old.serial_number
+    assert len(old.listeners) == 1
+    await wattbox.async_close()
+    await asyncio.sleep(0.1)
+    assert not old.listeners
+
+
+@pytest.mark.parametrize("sync", [False, True])
+async def test_late_reply_is_not_taken_for_the_next_request(
+    simulator: WattBoxSimulator, sync: bool
+) -> None:
+    wattbox = _telnet(simulator, resilience=ResilienceSettings(request_timeout=0.5))
+    requests = [REQUEST_MESSAGES.OUTLET_STATUS]
+
+    async def send() -> str:
+        if sync:
+            responses = await asyncio.to_thread(wattbox.send_requests, requests)
+        else:
+            responses = await wattbox.async_send_requests(requests)
+        return responses[0].result
+
+    assert await send() == "1,1,1,1,1,1,1,1"
+    simulator.latency = 1.0
+    with pytest.raises(ScrapliTimeout):
+        await send()
+    # The late reply has arrived by the time the device changes.
+    await asyncio.sleep(0.8)
+    simulator.latency = 0.0
+    simulator.wattbox.set_outlet(1, "OFF")
+    assert await send() == "0,1,1,1,1,1,1,1"
+    if sync:
+        await asyncio.to_thread(wattbox.close)
+    else:
+        await wattbox.async_close()
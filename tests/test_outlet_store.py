@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from pywattbox.base import Outlet, StoredOutlet
+from pywattbox.cache import DeviceInfo
+from pywattbox.ip_wattbox import IpWattBox
+
+from .conftest import PASSWORD, USER
+
+INFO = DeviceInfo("host", "ST1", "WB-800VPS-IPVM-4", "2.4.0.0", False, "WattBox", 4)
+
+
+def _wattbox() -> IpWattBox:
+    wattbox = IpWattBox("host", USER, PASSWORD, 23)
+    wattbox.apply_device_info(INFO)
+    wattbox.parse_message("OutletStatus", "1,0,1,0")
+    wattbox.parse_message("OutletPowerStatus", "1,60.00,0.50,120.00")
+    return wattbox
+
+
+def test_outlets_are_plain_by_default() -> None:
+    wattbox = _wattbox()
+    assert wattbox.outlet_store is None
+    outlet = wattbox.outlets[1]
+    assert type(outlet) is Outlet
+    assert outlet.power_value == 60.0
+    assert not hasattr(outlet, "__dict__")
+
+
+def test_views_keep_no_instance_dict() -> None:
+    wattbox = _wattbox()
+    wattbox.enable_outlet_store()
+    for outlet in wattbox.outlets.values():
+        assert isinstance(outlet, StoredOutlet)
+        assert not hasattr(outlet, "__dict__")
+        with pytest.raises(AttributeError):
+            outlet.extra = "value"  # type: ignore[attr-defined]
+
+
+def test_enable_outlet_store_moves_values() -> None:
+    wattbox = _wattbox()
+    wattbox.outlets[1].name = "TV"
+    store = wattbox.enable_outlet_store()
+    outlet = wattbox.outlets[1]
+    assert isinstance(outlet, StoredOutlet)
+    assert outlet.name == "TV"
+    assert outlet.power_value == 60.0
+    assert wattbox.outlets[2].status is False
+    assert wattbox.outlets[2].power_value is None
+    assert store.power_value[1] == 60.0
+    assert math.isnan(store.power_value[2])
+    assert list(store.status[1:]) == [1, 0, 1, 0]
+
+    wattbox.parse_message("OutletStatus", "0,0,1,0")
+    assert store.status[1] == 0
+    assert wattbox.outlets[1].status is False
+
+
+def test_outlets_created_again_use_a_new_store() -> None:
+    wattbox = _wattbox()
+    store = wattbox.enable_outlet_store()
+    wattbox.apply_device_info(INFO)
+    assert wattbox.outlet_store is not store
+    assert isinstance(wattbox.outlets[1], StoredOutlet)
+    assert wattbox.outlets[1].power_value is None
+
+
+def test_history_and_energy_with_and_without_store() -> None:
+    for stored in (False, True):
+        wattbox = _wattbox()
+        if stored:
+            wattbox.enable_outlet_store()
+        history = wattbox.enable_history(capacity=4, tiers=())
+        energy = wattbox.enable_energy(max_gap=None)
+        wattbox.parse_message("PowerStatus", "1.00,120.00,120.00,0")
+        wattbox.publish_changes()
+        assert [sample.value for sample in history.samples(1)] == [60.0]
+        assert math.isnan(history.samples(2)[0].value)
+
+        at = wattbox.outlets[1].power_read_at
+        assert at is not None
+        wattbox.parse_message("OutletPowerStatus", "1,60.00,0.50,120.00")
+        wattbox.outlets[1].power_read_at = at + 3600.0
+        wattbox.publish_changes()
+        assert energy.total(1) == pytest.approx(60.0)
+        assert energy.total(2) == 0.0
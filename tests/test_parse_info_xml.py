@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from pywattbox.http_wattbox import parse_info_xml
+from pywattbox.simulator import SimulatedWattBox
+
+# In the layout of the `wattbox_info.xml` of a WB-800VPS-IPVM-18.
+WATTBOX_INFO = (Path(__file__).parent / "data" / "wattbox_info.xml").read_bytes()
+
+
+def _soup_info(content: bytes) -> dict[str, str]:
+    """What the BeautifulSoup lookups parse_info_xml replaced read."""
+    soup = BeautifulSoup(content, "xml")
+    info: dict[str, str] = {}
+    for element in soup.find_all(True):
+        info.setdefault(element.name, element.text)
+    return info
+
+
+def test_wattbox_info_matches_beautifulsoup() -> None:
+    info = parse_info_xml(WATTBOX_INFO)
+    assert info == _soup_info(WATTBOX_INFO)
+    assert info["hardware_version"] == "WB-800VPS-IPVM-18"
+    assert len(info["outlet_status"].split(",")) == 18
+
+
+def test_simulator_info_matches_beautifulsoup() -> None:
+    content = SimulatedWattBox(has_ups=True).info_xml()
+    assert parse_info_xml(content) == _soup_info(content)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b'<request><host_name id="1">WattBox</host_name></request>',
+        b"<request><host_name id='1' lang = \"en\" >WattBox</host_name></request>",
+        b"<request><host_name><![CDATA[Rack <A> & B]]></host_name></request>",
+        b"<request><host_name>Rack <![CDATA[<A>]]> &amp; B</host_name></request>",
+        b"<request><host_name>A &lt;&gt; &#65; &quot;B&quot;</host_name></request>",
+        b'<request><led_status/><mute enabled="0" /></request>',
+        b"<request><host_name>Two\nLines </host_name></request>",
+        b"<request><!-- comment --><mute>1<!-- <mute>0</mute> --></mute></request>",
+        b"<request><ups><mute>1</mute><power_lost>0</power_lost></ups></request>",
+        b"<request><mute>1</mute><mute>0</mute></request>",
+        b"<request><mute><mute>1</mute>0</mute></request>",
+        b"<request><host_name>R\xc3\xa4ck</host_name></request>",
+        b'<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE request>\n'
+        b"<request>\n<mute>0</mute>\n</request>\n",
+        b"<request/>",
+        b"<request>1</request>",
+    ],
+)
+def test_edge_cases_match_beautifulsoup(content: bytes) -> None:
+    assert parse_info_xml(content) == _soup_info(content)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"",
+        b"   \n",
+        b"Unauthorized",
+        b"<request><mute>1</mute>",
+        b"<request><mute>1</power_lost></request>",
+        b"<request><mute>1</mute></request><request></request>",
+        b"<request>1 < 2</request>",
+        b"<request><mute>1</mute></request>trailing",
+        b"<html><body>Error<br></body></html>",
+        b"<request><mute>1</mute x></request>",
+    ],
+)
+def test_invalid_documents_raise(content: bytes) -> None:
+    with pytest.raises(ValueError):
+        parse_info_xml(content)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from pywattbox.driver import PipelinedReplies
+
+COMMANDS = ("?OutletStatus", "!OutletSet=1,OFF,0", "?PowerStatus")
+
+
+def _result(replies: PipelinedReplies, index: int) -> bytes | None:
+    line = replies.lines[index]
+    return None if line is None else line.tobytes()
+
+
+def test_notifications_between_replies() -> None:
+    replies = PipelinedReplies(COMMANDS)
+    replies.feed(b"?OutletStatus=1,1\n~OutletStatus=0,1\nO")
+    assert not replies.done
+    replies.feed(b"K\n~PowerStatus=1.00,120.00,120.00,0\n?PowerStatus=0.50,60.00")
+    assert not replies.done
+    replies.feed(b",120.00,0\n")
+    assert replies.done
+    assert _result(replies, 0) == b"?OutletStatus=1,1"
+    assert _result(replies, 1) == b"OK"
+    assert _result(replies, 2) == b"?PowerStatus=0.50,60.00,120.00,0"
+    assert replies.notifications == [
+        b"~OutletStatus=0,1",
+        b"~PowerStatus=1.00,120.00,120.00,0",
+    ]
+    assert replies.reads == 3
+
+
+def test_echoes_and_stray_lines_are_skipped() -> None:
+    replies = PipelinedReplies(COMMANDS)
+    replies.feed(
+        b"Successfully Logged In!\r\n"
+        b"?OutletStatus\r\n?OutletStatus=1,1\r\n"
+        b"!OutletSet=1,OFF,0\r\nOK\r\n"
+        b"?Other=1\r\n?PowerStatus=0.50,60.00,120.00,0\r\n"
+    )
+    assert replies.done
+    assert _result(replies, 1) == b"OK"
+    assert replies.raw(0) == b"?OutletStatus\n?OutletStatus=1,1"
+    assert not replies.notifications
+
+
+def test_reply_for_another_request_is_not_taken() -> None:
+    # A late `?OutletStatus` reply never answers a `?PowerStatus` request.
+    replies = PipelinedReplies(("?PowerStatus",))
+    replies.feed(b"?OutletStatus=1,1\n")
+    assert not replies.done
+    replies.feed(b"?PowerStatus=0.50,60.00,120.00,0\n")
+    assert _result(replies, 0) == b"?PowerStatus=0.50,60.00,120.00,0"
+
+
+def test_error_goes_to_oldest_pending_command() -> None:
+    replies = PipelinedReplies(COMMANDS)
+    replies.feed(b"#Error\n#Error\n")
+    assert _result(replies, 0) == b"#Error"
+    assert _result(replies, 1) == b"#Error"
+    assert not replies.done
+    # Lines after the last reply are left alone.
+    replies.feed(b"?PowerStatus=0.50,60.00,120.00,0\nOK\n~OutletStatus=0,0\n")
+    assert replies.done
+    assert _result(replies, 2) == b"?PowerStatus=0.50,60.00,120.00,0"
+    assert replies.notifications == [b"~OutletStatus=0,0"]
+
+
+def test_replies_record_when_they_were_read() -> None:
+    replies = PipelinedReplies(COMMANDS)
+    # Echoes, then replies in later reads, as over SSH.
+    replies.feed(b"?OutletStatus\r\n!OutletSet=1,OFF,0\r\n?PowerStatus\r\n")
+    replies.feed(b"?OutletStatus=1,1\r\nO")
+    replies.feed(b"K\r\n")
+    replies.feed(b"?PowerStatus=0.50,60.00,120.00,0\r\n")
+    assert replies.done
+    read_at = [at for at in replies.read_at if at is not None]
+    assert len(read_at) == 3
+    assert read_at == sorted(read_at)
+    # Only `OK` was split across reads, following an echo is no reread.
+    assert replies.split == [False, True, False]
+    assert replies.bytes_read(0) == len(b"?OutletStatus\n?OutletStatus=1,1\n")
+
+
+def test_pending_commands() -> None:
+    replies = PipelinedReplies(COMMANDS)
+    replies.feed(b"?OutletStatus=1,1\n")
+    assert replies.pending == (1, 2)
+    assert replies.read_at[1:] == [None, None]
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from pywattbox.base import Commands
+from pywattbox.http_wattbox import HttpWattBox
+from pywattbox.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    Deadline,
+    DeadlineExceededError,
+    ResilienceSettings,
+    current_deadline,
+    request_timeout,
+)
+from pywattbox.simulator import WattBoxSimulator
+
+from .conftest import PASSWORD, USER
+
+SETTINGS = ResilienceSettings(
+    failure_threshold=2, probe_initial=10.0, probe_max=40.0, probe_jitter=0.0
+)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_after_threshold() -> None:
+    clock = Clock()
+    breaker = CircuitBreaker("host", SETTINGS, clock)
+    breaker.failed(OSError())
+    assert breaker.state is CircuitState.CLOSED
+    breaker.allow()
+    breaker.failed(OSError())
+    assert breaker.state is CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.allow()
+    assert info.value.retry_in == 10.0
+
+
+def test_breaker_success_resets_failures() -> None:
+    breaker = CircuitBreaker("host", SETTINGS, Clock())
+    breaker.failed(OSError())
+    breaker.succeeded()
+    breaker.failed(OSError())
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_breaker_probe_closes_on_success() -> None:
+    clock = Clock()
+    breaker = CircuitBreaker("host", SETTINGS, clock)
+    breaker.failed(OSError())
+    breaker.failed(OSError())
+    clock.now += 10.0
+    breaker.allow()
+    assert breaker.state is CircuitState.HALF_OPEN
+    # Only a single probe at a time.
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.succeeded()
+    assert breaker.state is CircuitState.CLOSED
+    breaker.allow()
+
+
+def test_breaker_failed_probe_backs_off() -> None:
+    clock = Clock()
+    breaker = CircuitBreaker("host", SETTINGS, clock)
+    breaker.failed(OSError())
+    breaker.failed(OSError())
+    for delay in (20.0, 40.0, 40.0):
+        clock.now = breaker.retry_at
+        breaker.allow()
+        breaker.failed(OSError())
+        assert breaker.state is CircuitState.OPEN
+        assert breaker.retry_at - clock.now == delay
+
+
+def test_breaker_never_opens_without_threshold() -> None:
+    breaker = CircuitBreaker("host", SETTINGS._replace(failure_threshold=None))
+    for _ in range(10):
+        breaker.failed(OSError())
+    breaker.allow()
+
+
+def test_breaker_available_has_no_side_effects() -> None:
+    clock = Clock()
+    breaker = CircuitBreaker("host", SETTINGS, clock)
+    breaker.failed(OSError())
+    breaker.failed(OSError())
+    assert not breaker.available
+    clock.now += 10.0
+    assert breaker.available
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_breaker_attempt_resolves_probe() -> None:
+    clock = Clock()
+    breaker = CircuitBreaker("host", SETTINGS, clock)
+    breaker.failed(OSError())
+    breaker.failed(OSError())
+    clock.now += 10.0
+    with pytest.raises(asyncio.CancelledError), breaker.attempt():
+        raise asyncio.CancelledError
+    assert breaker.state is CircuitState.OPEN
+
+    clock.now = breaker.retry_at
+    with breaker.attempt():
+        pass
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_request_timeout_shares_deadline() -> None:
+    assert request_timeout(5.0) == 5.0
+    token = current_deadline.set(Deadline(1.0))
+    try:
+        assert request_timeout(5.0) <= 1.0
+    finally:
+        current_deadline.reset(token)
+    token = current_deadline.set(Deadline(-1.0))
+    try:
+        with pytest.raises(DeadlineExceededError):
+            request_timeout(5.0)
+    finally:
+        current_deadline.reset(token)
+
+
+def _wattbox(
+    simulator: WattBoxSimulator, update_budget: float = 15.0, failure_threshold: int = 1
+) -> HttpWattBox:
+    resilience = ResilienceSettings(
+        update_budget=update_budget,
+        failure_threshold=failure_threshold,
+        probe_initial=0.0,
+        probe_jitter=0.0,
+    )
+    return HttpWattBox(
+        simulator.host, USER, PASSWORD, simulator.http_port, resilience=resilience
+    )
+
+
+def _open_for_probe(breaker: CircuitBreaker) -> None:
+    """Open the circuit with the probe already due."""
+    breaker.failed(OSError())
+    assert breaker.state is CircuitState.OPEN
+
+
+@pytest.mark.anyio
+async def test_guarded_budget_raises_deadline_exceeded(
+    simulator: WattBoxSimulator,
+) -> None:
+    wattbox = _wattbox(simulator, update_budget=0.1, failure_threshold=3)
+    simulator.latency = 0.5
+    with pytest.raises(DeadlineExceededError):
+        await wattbox.async_get_initial()
+    assert wattbox.breaker.failures == 1
+    await wattbox.async_close()
+
+
+@pytest.mark.anyio
+async def test_cancelled_probe_does_not_stay_half_open(
+    simulator: WattBoxSimulator,
+) -> None:
+    wattbox = _wattbox(simulator)
+    _open_for_probe(wattbox.breaker)
+    simulator.latency = 0.5
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(wattbox.async_send_command(1, Commands.OFF), 0.05)
+    assert wattbox.breaker.state is CircuitState.OPEN
+
+    # The next call is let through as a new probe, and closes the circuit.
+    simulator.latency = 0.0
+    await wattbox.async_get_initial()
+    assert wattbox.breaker.state is CircuitState.CLOSED
+    await wattbox.async_close()
+
+
+@pytest.mark.anyio
+async def test_interrupted_sync_probe_does_not_stay_half_open(
+    simulator: WattBoxSimulator, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    class Interrupted(BaseException):
+        pass
+
+    def interrupted(*args: object, **kwargs: object) -> None:
+        raise Interrupted
+
+    wattbox = _wattbox(simulator)
+    _open_for_probe(wattbox.breaker)
+    monkeypatch.setattr(HttpWattBox, "_get", interrupted)
+    with pytest.raises(Interrupted):
+        wattbox.send_command(1, Commands.OFF)
+    assert wattbox.breaker.state is CircuitState.OPEN
+    await wattbox.async_close()